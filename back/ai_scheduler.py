@@ -0,0 +1,133 @@
+import time
+
+import eventlet
+from eventlet.event import Event
+from eventlet.queue import LightQueue, Full
+
+
+class AIQueueFull(Exception):
+    """해당 클라이언트의 대기열이 가득 차 요청을 받을 수 없음 (backpressure)"""
+
+
+class AIRequestTimeout(Exception):
+    """대기 + 실행 시간이 요청 제한 시간을 넘김"""
+
+
+class AICancelled(Exception):
+    """실행 전에 요청이 취소됨 (더 이상 필요 없는 선생성 등)"""
+
+
+# ---------------------
+# AI 요청 스케줄러
+# ---------------------
+# 모든 방이 공유하는 장수(long-lived) green thread 워커 풀입니다.
+# - 클라이언트(API 키)마다 대기열 1개 + 워커 N개 → 클라이언트별 동시 호출 수 상한
+# - 대기열이 가득 차면 즉시 AIQueueFull (호출자에게 부하를 되돌림)
+# - 요청마다 제한 시간 (대기열에서 기다린 시간 포함)
+class AIScheduler:
+    def __init__(self, num_clients, concurrency_per_client=8, max_queue=256, timeout=20.0):
+        self.num_clients = num_clients
+        self.concurrency_per_client = concurrency_per_client
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._queues = [LightQueue(maxsize=max_queue) for _ in range(num_clients)]
+        self._stats = [self._empty_stats() for _ in range(num_clients)]
+        self._started = False
+
+    @staticmethod
+    def _empty_stats():
+        return {
+            'in_flight': 0,
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'cancelled': 0,
+            'max_queue_depth': 0,
+            'total_latency': 0.0,
+        }
+
+    def _ensure_started(self):
+        # 워커는 첫 요청 때 띄움 (import 시점에 허브를 건드리지 않기 위함)
+        if self._started:
+            return
+        self._started = True
+        for client_index in range(self.num_clients):
+            for _ in range(self.concurrency_per_client):
+                eventlet.spawn(self._worker, client_index)
+
+    def submit(self, client_index, fn, *args, timeout=None, is_cancelled=None):
+        # fn(*args)를 client_index 워커에서 실행. 결과는 Event.wait()로 받음
+        # is_cancelled()가 True면 대기열에서 꺼낼 때 실행하지 않고 AICancelled로 끝냄
+        self._ensure_started()
+        stats = self._stats[client_index]
+        deadline = time.monotonic() + (timeout or self.timeout)
+        done = Event()
+        try:
+            self._queues[client_index].put_nowait((fn, args, deadline, is_cancelled, done))
+        except Full:
+            stats['rejected'] += 1
+            raise AIQueueFull(f"AI client {client_index} queue is full ({self.max_queue})")
+        stats['submitted'] += 1
+        stats['max_queue_depth'] = max(stats['max_queue_depth'], self._queues[client_index].qsize())
+        return done
+
+    def _worker(self, client_index):
+        queue = self._queues[client_index]
+        stats = self._stats[client_index]
+        while True:
+            fn, args, deadline, is_cancelled, done = queue.get()
+            if is_cancelled is not None and is_cancelled():
+                stats['cancelled'] += 1
+                done.send_exception(AICancelled("cancelled before running"))
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                stats['timeouts'] += 1
+                done.send_exception(AIRequestTimeout("timed out while queued"))
+                continue
+
+            stats['in_flight'] += 1
+            started = time.monotonic()
+            try:
+                with eventlet.Timeout(remaining, AIRequestTimeout("timed out while running")):
+                    result = fn(*args)
+            except AIRequestTimeout as e:
+                stats['timeouts'] += 1
+                done.send_exception(e)
+            except AICancelled as e:
+                stats['cancelled'] += 1
+                done.send_exception(e)
+            except Exception as e:
+                stats['failed'] += 1
+                done.send_exception(e)
+            else:
+                stats['completed'] += 1
+                done.send(result)
+            finally:
+                stats['in_flight'] -= 1
+                stats['total_latency'] += time.monotonic() - started
+
+    def load(self):
+        # 대기열 점유율 (0.0 ~ 1.0). 가장 많이 밀린 클라이언트 기준 (한 턴이 모든 클라이언트에 요청을 넣으므로)
+        if not self._queues or self.max_queue <= 0:
+            return 0.0
+        return max(queue.qsize() for queue in self._queues) / self.max_queue
+
+    def stats(self):
+        clients = []
+        for client_index, stats in enumerate(self._stats):
+            finished = stats['completed'] + stats['failed'] + stats['timeouts']
+            clients.append({
+                'client': client_index,
+                'queue_depth': self._queues[client_index].qsize(),
+                'avg_latency': stats['total_latency'] / finished if finished else 0.0,
+                **stats,
+            })
+        return {
+            'concurrency_per_client': self.concurrency_per_client,
+            'max_queue': self.max_queue,
+            'timeout': self.timeout,
+            'clients': clients,
+        }
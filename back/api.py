@@ -5,16 +5,35 @@ eventlet.monkey_patch()
 import os
 import random
 import string
-import json
-import concurrent.futures
-from datetime import datetime
+import secrets
+import time
+import uuid
+from functools import partial, wraps
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from models import Room, Player, Seat, Message, wire_json, now_ms
+from lifecycle import LifecycleScheduler
+from room_store import create_room_store
+from ai_scheduler import AIScheduler, AICancelled
+from prompts import build_messages, build_turn_context, build_batch_messages, batch_response_format, parse_batch_answers
+from llm_backends import create_llm_clients, create_response_cache, create_fallback_client
+from client_pool import ClientPool, create_completion
+from journal import create_event_journal
+from message_log import create_message_archive, append_messages, messages_since, archive_room, read_messages
+from metrics import MetricsRegistry, SIZE_BUCKETS, CONTENT_TYPE, instrument_handler
+from rate_limit import RateLimiter, AdmissionController
+from word_bank import load_word_bank, DIFFICULTIES
+from spectators import SpectatorHub, spectator_messages
+from turns import start_turns, current_speaker, next_speaker, is_operator_turn, advance_turn, remove_from_turns
+from voting import (
+    VoteError, voter_names, start_vote, cast_vote, withdraw_vote, all_voted, close_vote,
+    result_message, vote_update, match_vote_target,
+)
+
 
 load_dotenv()
 
@@ -23,38 +42,216 @@ load_dotenv()
 # ---------------------
 app = Flask(__name__, template_folder="templates")
 CORS(app) 
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
+# 💡 [추가] 여러 워커가 같은 방을 서비스할 수 있도록 메시지 큐(예: redis://...) 연결
+# 워커 간 sticky session 없이 쓰려면 클라이언트를 websocket 전송으로 고정하세요.
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    async_mode="eventlet",
+    message_queue=os.getenv("SOCKETIO_MESSAGE_QUEUE") or None,
+    json=wire_json, # 💡 [추가] orjson이 있으면 orjson으로 직렬화
+)
 
 # ---------------------
-# OpenAI 클라이언트
+# LLM 클라이언트
 # ---------------------
-clients = []
-for i in range(1, 5):
-    try:
-        clients.append(OpenAI(api_key=os.getenv(f"GPT_API_KEY_{i}")))
-    except Exception as e:
-        print(f"Error initializing OpenAI client {i}: {e}")
-        class DummyClient:
-            def chat(self): return self
-            def completions(self): return self
-            def create(self, **kwargs): 
-                return {
-                    'choices': [{'message': {'content': f'더미 응답: API 키 오류 (AI {i})'}}]
-                }
-        clients.append(DummyClient())
+# 💡 [수정] LLM_BACKEND=openai|mock 으로 선택. API 키 오류 시에는 로컬 더미 클라이언트로 대체
+# LLM_CACHE_SIZE > 0 이면 정규화한 프롬프트 기준으로 응답을 재사용
+llm_cache = create_response_cache()
+clients = create_llm_clients(4, cache=llm_cache)
+
+# 💡 [추가] 모든 방이 공유하는 AI 요청 스케줄러 (클라이언트별 동시 호출 상한 / 대기열 / 제한 시간)
+AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", "20"))
+# 💡 [추가] AI_STREAMING=1 이면 스트리밍 API로 토큰을 받아 서버에 모으고 진행 상황('aiProgress')을 알림
+AI_STREAMING = os.getenv("AI_STREAMING", "0") == "1"
+# 💡 [추가] AI_BATCH=1 이면 AI 전원의 발언을 structured output 요청 1번으로 생성 (입력 토큰/레이트 리밋 부담 감소)
+# 응답이 깨졌거나 일부 AI가 빠지면 그 AI만 기존처럼 개별 요청. 배치 요청은 스트리밍하지 않음
+AI_BATCH = os.getenv("AI_BATCH", "0") == "1"
+ai_scheduler = AIScheduler(
+    num_clients=len(clients),
+    concurrency_per_client=int(os.getenv("AI_CLIENT_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("AI_QUEUE_SIZE", "256")),
+    timeout=AI_REQUEST_TIMEOUT,
+)
+# 💡 [추가] AI 플레이어를 키에 고정하지 않고 요청마다 가장 상태가 좋은 키로 보냄 (client_pool 참고)
+# 느린 호출은 p95를 넘기면 다른 키로 헤지, 고장 난 키는 서킷을 열어 제외, 모두 안 되면 로컬 대체 클라이언트
+client_pool = ClientPool(
+    clients,
+    ai_scheduler,
+    fallback=create_fallback_client() if os.getenv("AI_FALLBACK", "1") == "1" else None,
+    hedge_delay=float(os.getenv("AI_HEDGE_DELAY", "2.0")),
+    hedge_min_delay=float(os.getenv("AI_HEDGE_MIN_DELAY", "0.2")),
+    max_hedges=int(os.getenv("AI_MAX_HEDGES", "1")),
+    failure_threshold=int(os.getenv("AI_CIRCUIT_FAILURES", "5")),
+    cooldown=float(os.getenv("AI_CIRCUIT_COOLDOWN", "30")),
+)
+
+# ---------------------
+# 메트릭 (/metrics)
+# ---------------------
+# 💡 [추가] 핸들러 처리 시간, 전송 payload 크기/직렬화 시간, AI 클라이언트별 지연/오류/토큰, 방/연결 수
+# METRICS_PAYLOAD_SAMPLE=N 이면 N번 전송 중 1번만 payload를 한 번 더 직렬화해 크기를 잽니다
+# (기본 100: 재는 전송만 인코딩이 두 번이므로, 1로 두면 모든 전송의 직렬화 비용이 두 배)
+metrics = MetricsRegistry(prefix="liar_")
+handler_calls = metrics.counter("handler_calls_total", "Socket.IO handler invocations", ["handler"])
+handler_errors = metrics.counter("handler_errors_total", "Socket.IO handler exceptions", ["handler"])
+handler_seconds = metrics.histogram("handler_seconds", "Socket.IO handler wall time including room lock wait", ["handler"])
+emit_total = metrics.counter("emit_total", "Socket.IO emits by event", ["event"])
+emit_bytes = metrics.histogram("emit_payload_bytes", "JSON size of sampled emit payloads", ["event"], buckets=SIZE_BUCKETS)
+emit_serialize_seconds = metrics.histogram("emit_serialize_seconds", "JSON serialization time of sampled emit payloads", ["event"])
+ai_request_seconds = metrics.histogram("ai_request_seconds", "LLM call latency per client", ["client"])
+ai_requests = metrics.counter("ai_requests_total", "LLM calls per client", ["client"])
+ai_errors = metrics.counter("ai_errors_total", "Failed or timed out LLM calls per client", ["client"])
+ai_tokens = metrics.counter("ai_tokens_total", "LLM token usage per client", ["client", "kind"])
+ai_queue_depth = metrics.gauge("ai_queue_depth", "Queued AI requests per client", ["client"])
+ai_in_flight = metrics.gauge("ai_in_flight", "Running AI requests per client", ["client"])
+ai_circuit_open = metrics.gauge("ai_circuit_open", "1 if the client's circuit breaker is open or half-open", ["client"])
+ai_batch_requests = metrics.counter("ai_batch_requests_total", "Batched AI generations by outcome (complete/partial/invalid/failed)", ["outcome"])
+ai_pool_events = metrics.gauge("ai_pool_events", "Cumulative client pool hedges/failovers/fallbacks", ["kind"])
+connections = metrics.gauge("connections", "Connected Socket.IO clients")
+votes_cast = metrics.counter("votes_cast_total", "Accepted votes by voter kind (human/ai)", ["kind"])
+votes_closed = metrics.counter("votes_closed_total", "Closed votes by reason (complete/timeout)", ["reason"])
+ai_vote_fallbacks = metrics.counter("ai_vote_fallbacks_total", "AI votes picked at random because the LLM answer named nobody")
+rooms_reaped = metrics.counter("rooms_reaped_total", "Idle rooms deleted by the lifecycle scheduler", ["state"])
+spectators = metrics.gauge("spectators", "Spectators connected to this worker")
+METRICS_PAYLOAD_SAMPLE = max(1, int(os.getenv("METRICS_PAYLOAD_SAMPLE", "100")))
+
+def instrumented(name):
+    return instrument_handler(handler_calls, handler_errors, handler_seconds, name)
+
+# ---------------------
+# 요청 속도 제한 / 부하 제어
+# ---------------------
+# 💡 [추가] 토큰 버킷 (초당 RATE개, 최대 BURST개, RATE=0이면 제한 없음)
+# - 연결(sid)별: 모든 클라이언트 이벤트 공통
+# - 연결별 방 생성: create_room 전용 (방 하나 = AI 호출 수십 번)
+# - 방별 메시지: 방 안 사람들의 send_message 합계 (RATE/BURST는 2명 기준, 인원이 많으면 메시지당 비용을 2/사람 수로)
+# AI 대기열 점유율이 AI_ADMISSION_SOFT 이상이면 새 방/선생성을, AI_ADMISSION_HARD 이상이면
+# 진행 중인 게임의 새 AI 턴까지 거절하고 'error' {code: 'overloaded'}를 보냅니다.
+sid_limiter = RateLimiter(
+    rate=float(os.getenv("RATE_LIMIT_SID_RATE", "5")),
+    burst=float(os.getenv("RATE_LIMIT_SID_BURST", "20")),
+)
+create_room_limiter = RateLimiter(
+    rate=float(os.getenv("RATE_LIMIT_CREATE_RATE", "0.2")),
+    burst=float(os.getenv("RATE_LIMIT_CREATE_BURST", "3")),
+)
+room_message_limiter = RateLimiter(
+    rate=float(os.getenv("RATE_LIMIT_ROOM_RATE", "2")),
+    burst=float(os.getenv("RATE_LIMIT_ROOM_BURST", "10")),
+)
+admission = AdmissionController(
+    ai_scheduler.load,
+    soft=float(os.getenv("AI_ADMISSION_SOFT", "0.5")),
+    hard=float(os.getenv("AI_ADMISSION_HARD", "0.9")),
+)
+rate_limited_total = metrics.counter("rate_limited_total", "Socket.IO events rejected by a token bucket", ["event", "scope"])
+admission_rejected = metrics.counter("admission_rejected_total", "AI work rejected because the AI queue is saturated", ["kind"])
+ai_jobs_coalesced = metrics.counter("ai_jobs_coalesced_total", "AI generations merged into a newer job for the same room")
+OVERLOAD_RETRY_AFTER = 2.0
+
+def reject_event(event, code, message, retry_after):
+    emit('error', {'message': message, 'code': code, 'event': event, 'retryAfter': round(retry_after, 2)})
+
+def rate_limited(name, limiter=None, scope='sid'):
+    # 핸들러 데코레이터: request.sid 기준 버킷에서 토큰 하나를 써야 실행 (@instrumented 안쪽에 둠)
+    limiter = limiter or sid_limiter
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            allowed, retry_after = limiter.allow(request.sid)
+            if not allowed:
+                rate_limited_total.inc(event=name, scope=scope)
+                reject_event(name, 'rate_limited', '요청이 너무 많습니다. 잠시 후 다시 시도해주세요.', retry_after)
+                return
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def admit_ai_work(kind):
+    if admission.admit(kind):
+        return True
+    admission_rejected.inc(kind=kind)
+    return False
+
+# 💡 [추가] 클라이언트별 토큰 사용량 (cached_tokens: 제공자 prefix 캐시 적중분). 호출마다 출력하지 않고 /debug/ai, /metrics로 확인
+token_usage = [
+    {'calls': 0, 'prompt_tokens': 0, 'cached_tokens': 0, 'completion_tokens': 0}
+    for _ in clients
+]
+
+def _usage_field(obj, key):
+    # 구버전 SDK는 스트리밍 usage를 dict 그대로 남겨두므로 속성/키 모두 지원
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+def record_token_usage(client_index, usage):
+    if usage is None or client_index < 0: # 로컬 대체 클라이언트는 집계하지 않음
+        return
+    prompt_tokens = _usage_field(usage, 'prompt_tokens') or 0
+    completion_tokens = _usage_field(usage, 'completion_tokens') or 0
+    details = _usage_field(usage, 'prompt_tokens_details')
+    cached_tokens = (_usage_field(details, 'cached_tokens') or 0) if details else 0
+    stats = token_usage[client_index]
+    stats['calls'] += 1
+    stats['prompt_tokens'] += prompt_tokens
+    stats['cached_tokens'] += cached_tokens
+    stats['completion_tokens'] += completion_tokens
+    ai_tokens.inc(prompt_tokens, client=str(client_index), kind='prompt')
+    ai_tokens.inc(cached_tokens, client=str(client_index), kind='cached')
+    ai_tokens.inc(completion_tokens, client=str(client_index), kind='completion')
 
 # ---------------------
 # 게임 데이터
 # ---------------------
-categories = {
-    "음식": ["사과", "바나나", "딸기", "수박", "포도", "오렌지", "피자", "햄버거", "치킨", "라면", "김밥", "떡볶이", "짜장면", "초밥"],
-    "동물": ["강아지", "고양이", "호랑이", "사자", "코끼리", "기린", "원숭이", "토끼", "거북이", "악어", "펭귄", "북극곰", "판다"],
-    "사물": ["컴퓨터", "스마트폰", "텔레비전", "냉장고", "세탁기", "전자레인지", "책상", "의자", "침대", "시계", "자동차", "자전거"],
-    "장소": ["학교", "병원", "공원", "도서관", "영화관", "백화점", "마트", "경찰서", "소방서", "우체국", "은행", "공항", "지하철역"]
-}
-rooms = {} # 메모리 기반 룸 저장소
+# 💡 [수정] 제시어는 파일(WORD_BANK, 기본 data/words.tsv)에서 읽어 색인해 둔 제시어 뱅크에서 뽑음 (word_bank.py 참고)
+# WORD_DIFFICULTY: 방을 만들 때 난이도를 안 주면 쓸 기본값 (easy | normal | hard)
+word_bank = load_word_bank(
+    os.getenv("WORD_BANK"),
+    recent_size=int(os.getenv("WORD_RECENT_PAIRS", "256")),
+)
+WORD_DIFFICULTY = os.getenv("WORD_DIFFICULTY", "normal")
+# 💡 [수정] 룸 저장소: ROOM_STORE_URL이 없으면 메모리, redis://... 면 Redis 백엔드
+# 세션 역색인(sid -> (room_id, player_id))도 저장소가 함께 관리합니다.
+room_store = create_room_store(os.getenv("ROOM_STORE_URL"))
+metrics.gauge("rooms", "Live rooms in the room store", callback=room_store.count)
+# 💡 [추가] 방마다 최근 MESSAGE_WINDOW개 메시지만 메모리에 두고, 오래된 메시지는 MESSAGE_ARCHIVE로 내보냄
+# (AI 프롬프트가 최근 20개를 쓰므로 창은 그보다 작을 수 없음)
+MESSAGE_WINDOW = max(20, int(os.getenv("MESSAGE_WINDOW", "50")))
+message_archive = create_message_archive(os.getenv("MESSAGE_ARCHIVE"))
+# 💡 [추가] 게임 이벤트 저널: 방 상태 변화를 JOURNAL_DIR에 추가 기록하고, 재시작 시 스냅샷 + 로그로 방을 복구
+# (메모리 저장소 전용. Redis 저장소는 방이 이미 Redis에 남으므로 사용하지 않음)
+journal = None
+if not os.getenv("ROOM_STORE_URL"):
+    journal = create_event_journal(
+        os.getenv("JOURNAL_DIR"),
+        flush_interval=float(os.getenv("JOURNAL_FLUSH_INTERVAL", "0.05")),
+        segment_bytes=int(os.getenv("JOURNAL_SEGMENT_BYTES", str(4 * 1024 * 1024))),
+        snapshot_interval=float(os.getenv("JOURNAL_SNAPSHOT_INTERVAL", "300")),
+        retain=os.getenv("JOURNAL_RETAIN", "0") == "1",
+    )
+# 💡 [추가] GAME_SEED를 주면 제시어/닉네임/진술 순서가 매번 같음 (리플레이 성능 테스트용)
+if os.getenv("GAME_SEED"):
+    random.seed(int(os.getenv("GAME_SEED")))
 PHASES = ['1차 진술', '1차 토론', '2차 진술', '2차 토론', '투표']
 
+# 💡 [추가] 방 인원: 만들 때 maxPlayers(운영자 포함 사람 수) / aiPlayers(AI 수)로 정하고, 아래 상한으로 자름
+# 사람이 정원만큼 모이면 자동으로, 아니면 운영자가 'start_game'을 보내면 시작 (시민이 1명 이상 있어야 함)
+ROOM_MAX_HUMANS = max(2, int(os.getenv("ROOM_MAX_HUMANS", "8")))
+ROOM_MAX_AI = max(1, int(os.getenv("ROOM_MAX_AI", "8")))
+DEFAULT_AI_PLAYERS = 4
+# 💡 [추가] 한 방의 AI 답변을 동시에 몇 개까지 요청할지 (AI 수가 이보다 적으면 AI 수만큼)
+AI_ROOM_PARALLEL = max(1, int(os.getenv("AI_ROOM_PARALLEL", "4")))
+
+# 💡 [추가] AI 성격 정의 (AI가 더 많으면 순서대로 다시 사용)
+AI_PERSONALITIES = [
+    "말이 많고 사교적이며, 다른 사람의 말에 리액션을 잘 해주는 성격",
+    "매우 논리적이고 분석적이며, 발언의 모순점을 지적하는 성격",
+    "소심하고 겁이 많으며, 확신 없이 조심스럽게 말하는 성격",
+    "공격적이고 직설적이며, 강하게 의심을 표출하는 성격"
+]
+
 # 💡 [추가] 프론트에서 가져온 닉네임 리스트
 ANIMAL_NAMES = [
     "날랜 사자", "용맹한 호랑이", "거대한 코끼리", "목이 긴 기린", "느긋한 하마", "줄무늬 얼룩말", "강철 코뿔소", "은밀한 표범", "민첩한 치타",
@@ -69,332 +266,1210 @@ ANIMAL_NAMES = [
 def generate_room_id(length=6):
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
-def get_game_words():
-    topic = random.choice(list(categories.keys()))
-    words = random.sample(categories[topic], 2)
-    return topic, words[0], words[1] # 주제, 라이어 단어, 시민 단어
+def clamp_int(value, default, low, high):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(value, low), high)
+
+def take_name(room):
+    # 💡 [수정] 남은 닉네임 풀에서 하나 (다 쓰면 이미 쓰는 이름을 뺀 전체 풀에서 다시)
+    if not room.available_names:
+        used = {seat.name for seat in room.humans.values()} | {ai.name for ai in room.ai_players}
+        room.available_names = [name for name in ANIMAL_NAMES if name not in used] or ANIMAL_NAMES[:]
+    name = random.choice(room.available_names)
+    room.available_names.remove(name) # 중복 제거
+    return name
+
+def get_game_words(difficulty=None):
+    # 💡 [수정] 데이터 크기와 관계없이 상수 시간 (최근에 나온 짝은 피함)
+    if difficulty not in DIFFICULTIES:
+        difficulty = WORD_DIFFICULTY
+    return word_bank.pick(difficulty) # 주제, 라이어 단어, 시민 단어
+
+def add_messages(room, *messages):
+    # (락 안에서) 메시지 추가 + 창을 넘친 메시지 보관
+    append_messages(room, list(messages), message_archive, MESSAGE_WINDOW)
+
+# ---------------------
+# 세션 역색인 (sid -> (방, 플레이어 ID))
+# ---------------------
+def bind_session(sid, room_id, player_id):
+    room_store.bind_session(sid, room_id, player_id)
+
+def unbind_session(sid):
+    room_store.unbind_session(sid)
+
+def find_session(sid):
+    return room_store.get_session(sid)
+
+def is_bound_to(room_id, player_id):
+    # 💡 [추가] 이 연결(sid)에 묶인 자리가 요청의 (방, 플레이어 ID)와 같은지
+    # 클라이언트가 보낸 userId는 믿지 않음 (관전자 / 다른 방 참가자 / 남의 ID로 보낸 요청은 False)
+    session = find_session(request.sid)
+    return session is not None and tuple(session) == (room_id, player_id)
+
+def reject_unbound(event):
+    emit('error', {'message': '이 방의 참가자가 아닙니다.', 'code': 'not_member', 'event': event})
+
+def check_session_index():
+    # 역색인과 방 상태가 서로 일치하는지 검사 (고아 항목 탐지용)
+    orphaned = []   # 색인에는 있으나 방에 해당 sid가 없는 항목
+    missing = []    # 방에는 sid가 있으나 색인에 없는 항목
+    sessions = dict(room_store.sessions())
+    room_ids = room_store.room_ids()
+    for sid, (room_id, player_id) in sessions.items():
+        room = room_store.get(room_id)
+        seat = room.humans.get(player_id) if room is not None else None
+        if seat is None or seat.sid != sid:
+            orphaned.append({'sid': sid, 'roomId': room_id, 'playerId': player_id})
+    for room_id in room_ids:
+        room = room_store.get(room_id)
+        if room is None:
+            continue
+        for seat in room.humans.values():
+            if seat.sid is not None and sessions.get(seat.sid) != (room_id, seat.id):
+                missing.append({'sid': seat.sid, 'roomId': room_id, 'playerId': seat.id})
+    return {
+        'sessions': len(sessions),
+        'rooms': len(room_ids),
+        'orphaned': orphaned,
+        'missing': missing,
+    }
 
 # 💡 [오류 수정] 헬스 체크를 위한 기본 HTTP 루트 추가
 @app.route('/')
 def index():
     return "Liar Game Server is running."
 
+@app.route('/metrics')
+def metrics_endpoint():
+    # 스케줄러 상태는 수집 시점에 읽어옴
+    for client in ai_scheduler.stats()['clients']:
+        ai_queue_depth.set(client['queue_depth'], client=str(client['client']))
+        ai_in_flight.set(client['in_flight'], client=str(client['client']))
+    pool = client_pool.snapshot()
+    for client in pool['clients']:
+        ai_circuit_open.set(0 if client['state'] == 'closed' else 1, client=str(client['client']))
+    for kind in ('hedges', 'hedge_wins', 'failovers', 'fallbacks'):
+        ai_pool_events.set(pool[kind], kind=kind)
+    return Response(metrics.render(), mimetype=CONTENT_TYPE)
+
+@app.route('/debug/sessions')
+def debug_sessions():
+    return jsonify({
+        **check_session_index(),
+        'lifecycle': lifecycle.snapshot(),
+        'journal': journal.snapshot() if journal else None,
+        'word_bank': word_bank.snapshot(),
+        'spectators': spectator_hub.snapshot(),
+    })
+
+@app.route('/debug/ai')
+def debug_ai():
+    return jsonify({
+        **ai_scheduler.stats(),
+        'pool': client_pool.snapshot(),
+        'prefetch': prefetch_stats,
+        'batch': batch_stats if AI_BATCH else None,
+        'tokens': token_usage,
+        'cache': llm_cache.stats() if llm_cache else None,
+        'admission': admission.snapshot(),
+        'rate_limits': {
+            'sid': sid_limiter.snapshot(),
+            'create_room': create_room_limiter.snapshot(),
+            'room_messages': room_message_limiter.snapshot(),
+        },
+        'room_tasks': len(ai_room_tasks),
+    })
+
 # ---------------------
 # Socket.IO 이벤트 핸들러
 # ---------------------
 @socketio.on('connect')
 def connect():
+    connections.inc()
     print(f"Client connected: {request.sid}")
 
 @socketio.on('disconnect')
-def disconnect():
+@instrumented('disconnect')
+def disconnect(reason=None):
+    connections.dec()
     print(f"Client disconnected: {request.sid}")
-    # 유저가 속한 방 찾아서 퇴장 처리
-    room_id_to_leave = None
-    user_id_to_leave = None
-    for room_id, room in rooms.items():
-        if room.get('operator_sid') == request.sid:
-            room_id_to_leave = room_id
-            user_id_to_leave = room['operator_id']
-            break
-        if room.get('user_sid') == request.sid:
-            room_id_to_leave = room_id
-            user_id_to_leave = room['user_id']
-            break
-    
-    if room_id_to_leave and user_id_to_leave:
-        handle_leave_room({'roomId': room_id_to_leave, 'userId': user_id_to_leave}, is_disconnect=True)
+    leave_spectators()
+    try:
+        _release_connection(request.sid)
+    finally:
+        # 💡 [수정] 속도 제한 버킷은 퇴장 처리가 끝난 뒤에 정리 (데코레이터를 거치면 버킷이 다시 생기므로 내부 함수만 호출)
+        sid_limiter.forget(request.sid)
+        create_room_limiter.forget(request.sid)
+
+def _release_connection(sid):
+    # 유저가 속한 방 찾아서 퇴장 처리 (역색인으로 O(1) 조회)
+    session = find_session(sid)
+    if session is None:
+        return
+
+    room_id_to_leave, player_id = session
+    with room_store.lock(room_id_to_leave):
+        # 💡 [추가] 바로 퇴장시키지 않고 유예 시간 동안 자리를 남겨 둠 (resume_session으로 복귀)
+        if RESUME_GRACE > 0:
+            _hold_seat_locked(room_id_to_leave, player_id, sid)
+        else:
+            _leave_bound_seat_locked(room_id_to_leave, player_id, sid, is_disconnect=True)
+
+def leave_current_room(sid):
+    # 💡 [추가] 이 연결이 이미 다른 방 자리에 묶여 있으면 그 방에서 먼저 나감 (새 방을 만들거나 들어가기 전에 호출)
+    # 역색인은 sid당 하나라서, 그냥 덮어쓰면 이전 방 자리가 색인에서 빠져 끊겨도 풀리지 않음
+    session = find_session(sid)
+    if session is None:
+        return
+    room_id, player_id = session
+    with room_store.lock(room_id):
+        _leave_bound_seat_locked(room_id, player_id, sid, is_disconnect=False)
+
+def _leave_bound_seat_locked(room_id, player_id, sid, is_disconnect):
+    if seat_of(room_store.get(room_id), player_id, sid) is None:
+        unbind_session(sid)
+    else:
+        _leave_room_locked(room_id, player_id, is_disconnect)
+
+# ---------------------
+# 룸 상태 전파 (스냅샷 / 패치)
+# ---------------------
+# 전체 스냅샷('roomState')은 입장/재접속/재동기화 때만 보내고,
+# 나머지 이벤트는 바뀐 필드와 새 메시지만 담은 'roomPatch'를 보냅니다.
+# 'seq'는 패치마다 1씩 증가하며, 클라이언트는 번호가 건너뛰면 'request_sync'로 스냅샷을 다시 받습니다.
+def room_snapshot(room):
+    # 💡 [수정] 전송할 필드만 명시적으로 직렬화 (서버 내부 상태/sid/공개 전 AI 답변은 제외)
+    return room.to_wire()
+
+def reset_room_sync(room):
+    # 현재 상태를 '모두에게 전파된 상태'로 기록
+    room.sync = {
+        'sent_messages': room.message_count,
+        'shadow': room.public_fields(),
+    }
+
+def build_room_patch(room):
+    if room.sync is None:
+        reset_room_sync(room)
+    sync = room.sync
+
+    shadow = sync['shadow']
+    current = room.public_fields() # 매번 새로 만든 값이므로 복사 없이 shadow로 보관
+    changes = {key: value for key, value in current.items() if shadow.get(key) != value}
+    if changes:
+        shadow.update(changes)
+
+    new_messages = messages_since(room, sync['sent_messages'])
+    if not changes and not new_messages:
+        return None
+
+    sync['sent_messages'] = room.message_count
+    room.seq += 1
+    return {
+        'roomId': room.id,
+        'seq': room.seq,
+        'changes': changes,
+        'messages': [message.to_wire() for message in new_messages],
+    }
+
+def emit_measured(event, payload, **kwargs):
+    # 💡 [추가] 전송 횟수 + (샘플링한) payload 크기/직렬화 시간 기록 후 전송
+    emit_total.inc(event=event)
+    if (emit_total.value(event=event) - 1) % METRICS_PAYLOAD_SAMPLE == 0: # 이벤트별 첫 전송부터 N번마다
+        started = time.perf_counter()
+        encoded = wire_json.dumps(payload)
+        emit_serialize_seconds.observe(time.perf_counter() - started, event=event)
+        emit_bytes.observe(len(encoded), event=event)
+    socketio.emit(event, payload, **kwargs)
+
+def emit_room_state(room, to=None):
+    # 전체 스냅샷 전송 (to가 없으면 방 전체)
+    if to is None:
+        reset_room_sync(room)
+        touch_room(room)
+        room_store.save(room)
+        spectator_hub.changed(room)
+    emit_measured('roomState', room_snapshot(room), to=to or room.id)
+
+def commit_room(room, skip_sid=None, event=None):
+    # 💡 [추가] 방 상태 저장 + 마지막 전파 이후 바뀐 부분만 전송
+    # event: 저널에 남길 이벤트 종류 (없으면 패치 내용으로 판단)
+    patch = build_room_patch(room)
+    if patch is not None:
+        touch_room(room)
+        # 재접속한 클라이언트에게 놓친 패치만 보내기 위해 최근 패치를 보관
+        room.patch_log.append(patch)
+        if len(room.patch_log) > RESUME_PATCH_LOG:
+            del room.patch_log[:-RESUME_PATCH_LOG]
+    record_event(room, event or journal_event_type(patch))
+    room_store.save(room)
+    if patch is not None:
+        emit_measured('roomPatch', patch, to=room.id, skip_sid=skip_sid)
+        spectator_hub.changed(room)
+
+# ---------------------
+# 이벤트 저널 기록 / 복구
+# ---------------------
+def journal_event_type(patch):
+    if patch is None:
+        return 'state'
+    changes = patch['changes']
+    if 'phase' in changes:
+        return 'phase_advanced'
+    if 'votes' in changes:
+        return 'vote'
+    if patch['messages']:
+        return 'message'
+    return 'state'
+
+def record_event(room, event_type):
+    # (락 안에서) 지난 기록 이후 바뀐 필드 + 새 메시지만 저널에 추가
+    if journal is not None:
+        journal.record(room, event_type)
+
+def journal_rooms():
+    # 스냅샷용: 방마다 락을 잡고 읽음 (기록 도중의 상태가 섞이지 않도록)
+    for room_id in room_store.room_ids():
+        with room_store.lock(room_id):
+            room = room_store.get(room_id)
+            if room is not None:
+                yield room
+
+def recover_rooms():
+    # 시작 시 저널에서 방 복구. 연결(sid)은 모두 끊긴 상태라 재접속 토큰(resume_session)으로만 돌아올 수 있음
+    if journal is None:
+        return
+    journal.snapshot_source = journal_rooms
+    rooms = journal.recover(MESSAGE_WINDOW)
+    for room in rooms:
+        room.updated_at = now_ms()
+        room.ai_job = None
+        room.prefetch = None
+        reset_room_sync(room)
+        # 💡 [수정] 저널의 sid는 죽은 연결이므로 비워 두고 (색인에도 없음), 유예 시간 안에 재접속하지 않으면 퇴장 처리
+        for seat in room.humans.values():
+            seat.sid = None
+        room_store.create(room)
+        journal.adopt(room)
+        for player_id in room.humans:
+            eventlet.spawn_after(max(RESUME_GRACE, 0), release_seat, room.id, player_id, None)
+        # 생성 중이던 AI 답변은 다시 생성 (운영자 진술이 보류 중이거나 운영자 턴인데 답변이 없는 경우)
+        if room.pending_statement is not None or (is_operator_turn(room) and not room.ai_answers):
+            start_ai_job(room, speculative=False)
+            room_store.save(room)
+        # 💡 [추가] 투표 중이던 방은 마감 타이머를 다시 걸고, 아직 안 낸 AI 표를 다시 생성
+        if room.turn == 'voting':
+            schedule_vote_timer(room)
+            if any(ai.id not in room.votes for ai in room.ai_players):
+                socketio.start_background_task(async_generate_ai_votes, room.id, room.vote_deadline)
+    if rooms:
+        print(f"Recovered {len(rooms)} rooms from journal ({journal.stats['replayed_events']} events)")
+    # 복구한 상태를 새 스냅샷으로 남기고 이전 로그 정리
+    journal.checkpoint()
+
+# ---------------------
+# 재접속 (세션 재개)
+# ---------------------
+# 💡 [추가] 방을 만들거나 들어가면 자리(Seat)별 재접속 토큰을 'session' 이벤트로 보냅니다.
+# 연결이 끊겨도 RESUME_GRACE초 동안 자리를 유지하고, 그 안에 새 연결에서
+# resume_session {roomId, token, lastSeq}를 보내면 새 sid로 다시 묶은 뒤
+# lastSeq 이후의 패치만 다시 보냅니다. (보관된 패치 범위를 벗어나면 전체 스냅샷)
+RESUME_GRACE = float(os.getenv("RESUME_GRACE", "30"))
+RESUME_PATCH_LOG = int(os.getenv("RESUME_PATCH_LOG", "32"))
+
+def issue_resume_token(room, seat):
+    seat.token = secrets.token_urlsafe(16)
+    role = 'operator' if seat.id == room.operator_id else 'user'
+    socketio.emit('session', {'roomId': room.id, 'role': role, 'playerId': seat.id, 'resumeToken': seat.token}, to=seat.sid)
 
-def emit_room_state(room_id):
-    if room_id in rooms:
-        socketio.emit('roomState', rooms[room_id], to=room_id)
+def missed_patches(room, last_seq):
+    # last_seq 이후 패치 목록. 보관 범위를 벗어나면 None (→ 스냅샷)
+    if not isinstance(last_seq, int) or last_seq > room.seq:
+        return None
+    missed = [patch for patch in room.patch_log if patch['seq'] > last_seq]
+    if len(missed) != room.seq - last_seq:
+        return None
+    return missed
+
+def seat_of(room, player_id, sid):
+    # sid가 아직 그 자리의 연결이면 Seat, 아니면 None (재접속했거나 나감). 복구된 자리는 sid=None으로 확인
+    seat = room.humans.get(player_id) if room is not None else None
+    return seat if seat is not None and seat.sid == sid else None
+
+def _hold_seat_locked(room_id, player_id, sid):
+    if seat_of(room_store.get(room_id), player_id, sid) is None:
+        unbind_session(sid)
+        return
+    # 역색인은 그대로 두고 (자리 주인 = 옛 sid), 유예 시간이 지나도 그대로면 퇴장 처리
+    eventlet.spawn_after(RESUME_GRACE, release_seat, room_id, player_id, sid)
+
+def release_seat(room_id, player_id, sid):
+    if not room_store.exists(room_id):
+        unbind_session(sid)
+        return
+    with room_store.lock(room_id):
+        if seat_of(room_store.get(room_id), player_id, sid) is None:
+            return
+        print(f"Resume grace expired: {player_id} of room {room_id}")
+        _leave_room_locked(room_id, player_id, is_disconnect=True)
+
+@socketio.on('resume_session')
+@instrumented('resume_session')
+@rate_limited('resume_session')
+def resume_session(data):
+    room_id = data.get('roomId')
+    token = data.get('token')
+    last_seq = data.get('lastSeq')
+
+    if not room_store.exists(room_id):
+        emit('resumeFailed', {'roomId': room_id, 'message': '방이 이미 종료되었습니다.'})
+        return
+
+    with room_store.lock(room_id):
+        _resume_session_locked(room_id, token, last_seq)
+
+def _resume_session_locked(room_id, token, last_seq):
+    room = room_store.get(room_id)
+    seat = None
+    if room is not None and isinstance(token, str):
+        seat = next((s for s in room.humans.values() if s.token and secrets.compare_digest(s.token, token)), None)
+    if seat is None:
+        emit('resumeFailed', {'roomId': room_id, 'message': '자리가 만료되었습니다. 다시 참가해주세요.'})
+        return
+
+    old_sid = seat.sid
+    if old_sid != request.sid:
+        unbind_session(old_sid)
+        seat.sid = request.sid
+        bind_session(request.sid, room_id, seat.id)
+        room_store.save(room)
+    join_room(room_id)
+    print(f"Session resumed: {seat.id} of room {room_id} ({old_sid} -> {request.sid})")
+
+    # 놓친 패치만 재전송 (보관 범위 밖이면 스냅샷)
+    missed = missed_patches(room, last_seq)
+    if missed is None:
+        emit_room_state(room, to=request.sid)
+    else:
+        for patch in missed:
+            emit_measured('roomPatch', patch, to=request.sid)
+    job = room.ai_job
+    if job is not None and not job['speculative']:
+        emit('aiProcessing', {'status': 'start'})
+    # 💡 [추가] 투표 중 표는 패치 없이 'voteUpdate'로만 나가므로 현재 투표 현황을 한 번 보냄
+    if room.turn == 'voting':
+        emit_measured('voteUpdate', vote_update(room, dict(room.votes)), to=request.sid)
+
+# ---------------------
+# 방 수명 관리 (유휴 방 정리)
+# ---------------------
+# 💡 [추가] 상태가 전파될 때마다 마지막 활동 시각을 갱신하고, 상태별 TTL 동안 활동이 없으면 방을 삭제
+ROOM_TTLS = {
+    'waiting': float(os.getenv("ROOM_TTL_WAITING", "600")), # 게임 시작 전 (또는 시민이 모두 나간 방)
+    'in_progress': float(os.getenv("ROOM_TTL_IN_PROGRESS", "1800")), # 게임 진행 중
+    'finished': float(os.getenv("ROOM_TTL_FINISHED", "300")), # 게임 종료 (투표 마감 후)
+}
+
+def lifecycle_state(room):
+    if room.turn == 'ended':
+        return 'finished'
+    if room.turn == 'waiting' or len(room.humans) < 2:
+        return 'waiting'
+    return 'in_progress'
+
+def touch_room(room):
+    room.updated_at = now_ms()
+    lifecycle.touch(room.id, lifecycle_state(room), room.updated_at / 1000)
+
+def delete_room(room, reason):
+    # (락 안에서) 진행 중인 AI 작업 취소 + 메시지 보관 + 역색인 정리 + 삭제
+    # reason: 관전자에게 보낼 'roomClosed' 사유 ('idle' | 'operator_left')
+    if room.ai_job:
+        cancel_ai_job(room.ai_job['id'])
+    archive_room(room, message_archive)
+    for seat in room.humans.values():
+        unbind_session(seat.sid)
+    if journal is not None:
+        journal.record_deleted(room)
+    room_store.delete(room.id)
+    lifecycle.remove(room.id)
+    lifecycle.remove(vote_timer_key(room.id))
+    room_message_limiter.forget(room.id)
+    spectator_hub.closed(room.id, reason, room)
+
+def reap_room(room_id, state):
+    with room_store.lock(room_id):
+        room = room_store.get(room_id)
+        if room is None:
+            return
+        # 다른 워커에서 활동이 있었을 수 있으므로 저장된 상태로 다시 판정
+        current_state = lifecycle_state(room)
+        last_active = room.updated_at / 1000
+        if last_active + ROOM_TTLS[current_state] > time.time():
+            lifecycle.touch(room.id, current_state, last_active)
+            return
+
+        add_messages(room, Message.system("장시간 활동이 없어 방이 종료되었습니다."))
+        commit_room(room)
+        socketio.emit('roomClosed', {'roomId': room.id, 'reason': 'idle'}, to=room.id)
+        delete_room(room, 'idle')
+    socketio.close_room(room_id)
+    lifecycle.record_reaped(current_state)
+    rooms_reaped.inc(state=current_state)
+    print(f"Room {room_id} reaped after idle ({current_state})")
+
+def on_lifecycle_expire(key, state):
+    # 💡 [추가] 같은 스케줄러에 투표 마감 타이머(('vote', 방 ID) 키)도 걸려 있음
+    if state == 'voting':
+        close_vote_on_timeout(key[1])
+    else:
+        reap_room(key, state)
+
+lifecycle = LifecycleScheduler(ROOM_TTLS, on_lifecycle_expire, seed=room_store.room_ids)
+
+# ---------------------
+# 관전 (읽기 전용)
+# ---------------------
+# 💡 [추가] 'spectate' {roomId}: 자리 없이 방을 지켜봄 (제시어 제외, spectators.py)
+# 관전자에게는 'spectatorState'/'spectatorPatch'(UTF-8 JSON bytes)와 'roomClosed'만 갑니다.
+# SPECTATOR_TICK초 동안의 변경을 모아 패치 하나로 보냄 (0이면 변경마다 바로). 방에 참가 중인 연결은 관전할 수 없음
+SPECTATOR_TICK = max(0.0, float(os.getenv("SPECTATOR_TICK", "0.2")))
+
+def emit_frame(event, frame, to):
+    # 이미 인코딩한 payload는 크기만 기록 (다시 직렬화하지 않음)
+    emit_total.inc(event=event)
+    if isinstance(frame, bytes):
+        emit_bytes.observe(len(frame), event=event)
+    socketio.emit(event, frame, to=to)
+
+spectator_hub = SpectatorHub(room_store.get, emit_frame, socketio.close_room, tick=SPECTATOR_TICK)
+
+@socketio.on('spectate')
+@instrumented('spectate')
+@rate_limited('spectate')
+def spectate(data):
+    room_id = data.get('roomId')
+    room = room_store.get(room_id)
+    if room is None:
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    if find_session(request.sid) is not None:
+        emit('error', {'message': '참가 중인 방이 있으면 관전할 수 없습니다.'})
+        return
+    leave_spectators()
+    frame = spectator_hub.join(request.sid, room)
+    join_room(spectator_hub.channel(room_id))
+    spectators.set(spectator_hub.viewer_count())
+    emit_frame('spectatorState', frame, request.sid)
+
+def leave_spectators():
+    # 이 연결의 관전 종료 (관전하던 방이 없으면 아무것도 안 함)
+    room_id = spectator_hub.leave(request.sid)
+    if room_id is not None:
+        leave_room(spectator_hub.channel(room_id))
+        spectators.set(spectator_hub.viewer_count())
+
+@socketio.on('stop_spectating')
+@instrumented('stop_spectating')
+@rate_limited('stop_spectating')
+def stop_spectating(data=None):
+    leave_spectators()
+
+def is_member(room_id):
+    # 이 연결이 방의 참가자인지 (역색인으로 O(1))
+    session = find_session(request.sid)
+    return session is not None and session[0] == room_id
+
+def is_spectator(room_id):
+    return spectator_hub.room_of(request.sid) == room_id
+
+@socketio.on('request_sync')
+@instrumented('request_sync')
+@rate_limited('request_sync')
+def request_sync(data):
+    # 패치 순서가 어긋난 클라이언트에게만 스냅샷 재전송
+    room_id = data.get('roomId')
+    room = room_store.get(room_id)
+    if room is None:
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    if is_spectator(room_id):
+        emit_frame('spectatorState', spectator_hub.state_frame(room), request.sid)
+        return
+    if not is_member(room_id):
+        return
+    emit_room_state(room, to=request.sid)
+
+@socketio.on('load_messages')
+@instrumented('load_messages')
+@rate_limited('load_messages')
+def load_messages(data):
+    # 💡 [추가] 스크롤백: 전체 번호 before 이전 메시지를 최대 limit개 (창 밖이면 보관소에서 읽음)
+    room_id = data.get('roomId')
+    room = room_store.get(room_id)
+    if room is None:
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    if not is_member(room_id) and not is_spectator(room_id):
+        return
+    before = clamp_int(data.get('before'), room.message_count, 0, room.message_count)
+    limit = clamp_int(data.get('limit'), 50, 1, 100)
+    messages, start = read_messages(room, message_archive, before, limit)
+    if is_spectator(room_id):
+        messages = spectator_messages(room, messages) # 관전자에게는 참가자 ID 대신 별칭
+    emit('messageHistory', {'roomId': room_id, 'start': start, 'messages': messages})
 
 @socketio.on('create_room')
+@instrumented('create_room')
+@rate_limited('create_room')
+@rate_limited('create_room', create_room_limiter, scope='create_room')
 def create_room(data):
     user_id = data.get('userId')
     is_operator = data.get('isOperator', False) # 운영자(라이어)
-    
-    room_id = generate_room_id()
-    while room_id in rooms:
-        room_id = generate_room_id()
+    if not isinstance(user_id, str) or not user_id:
+        emit('error', {'message': '잘못된 사용자 ID입니다.'})
+        return
+    leave_spectators()
 
-    topic, liar_word, citizen_word = get_game_words()
-    
-    # 💡 [수정] 닉네임 생성을 위해 이름 풀 복사
-    available_names = ANIMAL_NAMES[:]
-    
-    # 💡 [수정] 운영자 닉네임 할당
-    operator_name = random.choice(available_names)
-    available_names.remove(operator_name) # 중복 제거
+    # 💡 [추가] AI 대기열이 밀려 있으면 새 게임부터 거절
+    if not admit_ai_work('room'):
+        reject_event('create_room', 'overloaded', '서버가 혼잡합니다. 잠시 후 다시 방을 만들어주세요.', OVERLOAD_RETRY_AFTER)
+        return
+    leave_current_room(request.sid)
     
-    ai_players = []
-    # 💡 [추가] AI 성격 정의
-    personalities = [
-        "말이 많고 사교적이며, 다른 사람의 말에 리액션을 잘 해주는 성격",
-        "매우 논리적이고 분석적이며, 발언의 모순점을 지적하는 성격",
-        "소심하고 겁이 많으며, 확신 없이 조심스럽게 말하는 성격",
-        "공격적이고 직설적이며, 강하게 의심을 표출하는 성격"
-    ]
-
-    for i in range(4):
+    topic, liar_word, citizen_word = get_game_words(data.get('difficulty'))
+
+    # 💡 [추가] 방 인원 (운영자 포함 사람 수 / AI 수)
+    max_humans = clamp_int(data.get('maxPlayers'), 2, 2, ROOM_MAX_HUMANS)
+    ai_count = clamp_int(data.get('aiPlayers'), DEFAULT_AI_PLAYERS, 1, ROOM_MAX_AI)
+
+    # 💡 [수정] dict 대신 슬롯 모델 (models.Room)
+    room = Room(
+        id=None, # 아래에서 저장소에 등록하며 확정
+        topic=topic,
+        liar_word=liar_word,
+        citizen_word=citizen_word,
+        operator_id=user_id, # 운영자가 라이어
+        ai_players=[],
+        phases_config=PHASES,
+        available_names=ANIMAL_NAMES[:], # 💡 [수정] 닉네임 생성을 위해 이름 풀 복사
+        max_humans=max_humans,
+    )
+    # 💡 [수정] 운영자 닉네임 할당 (운영자도 자리 하나)
+    operator = Seat(user_id, take_name(room), sid=request.sid)
+    room.add_seat(operator)
+
+    for i in range(ai_count):
         # 💡 [수정] AI에게도 랜덤 동물 닉네임 할당
-        ai_name = random.choice(available_names)
-        available_names.remove(ai_name) # 중복 제거
-        
-        ai_players.append({
-            "id": f"ai_{i+1}",
-            "name": ai_name, # 💡 [수정] AI 이름 저장
-            "isLiar": False, # AI는 라이어가 아님
-            "personality": personalities[i] # 💡 [추가] 성격 할당
-        })
-
-    rooms[room_id] = {
-        "id": room_id,
-        "topic": topic,
-        "liar_word": liar_word,
-        "citizen_word": citizen_word,
-        "operator_id": user_id, # 운영자가 라이어
-        "operator_sid": request.sid,
-        "operator_name": operator_name, # 💡 [추가] 운영자 닉네임 저장
-        "user_id": None, # 참가자 (아직 없음)
-        "user_sid": None,
-        "user_name": None, # 💡 [추가] 참가자 닉네임 (아직 없음)
-        "ai_players": ai_players, # 💡 [수정] 성격/이름이 포함된 AI 정보
-        "messages": [
-            {
-                'id': f"msg_system_0",
-                'sender': 'system', 
-                'sender_name': '시스템', # 💡 [추가]
-                'text': f"방이 생성되었습니다 (ID: {room_id}). 참가자를 기다립니다.",
-                'timestamp': datetime.now().isoformat()
-            }
-        ],
-        "phase": 0, # '1차 진술'
-        "turn": "user", # 1차 진술은 항상 'user' (참가자) 부터 시작
-        "discussion_turns": 0, # 1차, 2차 구분용
-        "ai_answers": [], # AI 답변 임시 저장소
-        "votes": {},
-        "phases_config": PHASES,
-        "available_names": available_names # 💡 [추가] 남은 닉네임 풀 저장
-    }
+        room.ai_players.append(Player(
+            id=f"ai_{i+1}",
+            name=take_name(room),
+            personality=AI_PERSONALITIES[i % len(AI_PERSONALITIES)], # 💡 [추가] 성격 할당
+            is_liar=False, # AI는 라이어가 아님
+        ))
+
+    welcome = Message.system("")
+    add_messages(room, welcome)
+
+    # 💡 [수정] ID 충돌 시 재시도 (저장소가 원자적으로 판정)
+    while True:
+        room_id = generate_room_id()
+        room.id = room_id
+        welcome.text = f"방이 생성되었습니다 (ID: {room_id}). 참가자를 기다립니다. (정원 {max_humans}명, AI {ai_count}명)"
+        if room_store.create(room):
+            break
+
+    bind_session(request.sid, room_id, user_id)
     join_room(room_id)
-    emit_room_state(room_id)
+    issue_resume_token(room, operator)
+    record_event(room, 'room_created')
+    emit_room_state(room)
+
+def begin_game(room):
+    # (락 안에서) 첫 페이즈 시작: 발언 순서를 만들고 첫 진술 AI 답변을 미리 생성
+    add_messages(room, Message.system(f"게임을 시작합니다. (참가자 {len(room.humans)}명, AI {len(room.ai_players)}명)"))
+    add_messages(room, Message.system(f"--- {PHASES[room.phase]}이 시작되었습니다. ---"))
+    start_turns(room)
+    # 💡 [추가] 첫 페이즈 AI 진술을 시민들이 발언하는 동안 미리 생성
+    if can_prefetch(PHASES[room.phase]) and room.ai_job is None:
+        start_ai_job(room, speculative=True)
+
+def turn_passed(room):
+    # (락 안에서) 발언권이 운영자에게 넘어왔으면 AI 답변 준비 (선생성 결과 사용 / 승격 / 새로 생성)
+    if is_operator_turn(room):
+        use_ai_answers_for_turn(room)
 
 @socketio.on('join_room')
+@instrumented('join_room_event')
+@rate_limited('join_room_event')
 def join_room_event(data):
     room_id = data.get('roomId')
     user_id = data.get('userId')
 
-    if room_id not in rooms:
+    if not room_store.exists(room_id):
         emit('error', {'message': '존재하지 않는 방입니다.'})
         return
+    if not isinstance(user_id, str) or not user_id:
+        emit('error', {'message': '잘못된 사용자 ID입니다.'})
+        return
 
-    room = rooms[room_id]
-    if room['user_id'] is not None:
+    session = find_session(request.sid)
+    if session is not None and session[0] == room_id:
+        emit('error', {'message': '이미 참가 중인 방입니다.', 'code': 'already_in_room', 'event': 'join_room'})
+        return
+
+    leave_spectators() # 💡 [추가] 관전하다가 참가하면 관전 채널에서 빠짐
+    leave_current_room(request.sid)
+    with room_store.lock(room_id):
+        _join_room_locked(room_id, user_id)
+
+def _join_room_locked(room_id, user_id):
+    room = room_store.get(room_id)
+    if room is None:
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    if user_id in room.humans:
+        emit('error', {'message': '이미 참가 중인 방입니다.'})
+        return
+    if len(room.humans) >= room.max_humans:
         emit('error', {'message': '방이 꽉 찼습니다.'})
         return
-        
-    # 💡 [수정] 참가자 닉네임 할당
-    if not room.get('available_names') or len(room['available_names']) == 0: # 혹시 모를 오류 방지
-        room['available_names'] = ANIMAL_NAMES[:]
-        
-    user_name = random.choice(room['available_names'])
-    room['available_names'].remove(user_name) # 중복 제거
+    if room.turn == 'ended':
+        emit('error', {'message': '이미 끝난 게임입니다.'})
+        return
 
-    room['user_id'] = user_id
-    room['user_sid'] = request.sid
-    room['user_name'] = user_name # 💡 [추가] 참가자 닉네임 저장
+    # 💡 [수정] 참가자 닉네임 할당
+    seat = Seat(user_id, take_name(room), sid=request.sid)
+    room.add_seat(seat)
+    bind_session(request.sid, room_id, user_id)
     
     join_room(room_id)
     
-    room['messages'].append({
-        'id': f"msg_system_1",
-        'sender': 'system', 
-        'sender_name': '시스템', # 💡 [추가]
-        'text': f"'{user_name}' 참가자(시민)가 입장했습니다. 게임을 시작합니다.",
-        'timestamp': datetime.now().isoformat()
-    })
-    room['messages'].append({
-        'id': f"msg_system_2",
-        'sender': 'system', 
-        'sender_name': '시스템', # 💡 [추가]
-        'text': f"--- {PHASES[room['phase']]}이 시작되었습니다. ---",
-        'timestamp': datetime.now().isoformat()
-    })
-    
-    emit_room_state(room_id)
+    add_messages(room, Message.system(f"'{seat.name}' 참가자(시민)가 입장했습니다. ({len(room.humans)}/{room.max_humans})"))
+
+    # 💡 [수정] 정원이 차면 바로 시작. 진행 중에 들어오면 이번 페이즈에 아직 운영자 차례가 아닐 때만 운영자 앞에 끼워 넣음
+    event = 'player_joined'
+    if room.turn == 'waiting':
+        if len(room.humans) >= room.max_humans:
+            begin_game(room)
+            event = 'game_started'
+    elif room.turn == 'speaking' and not is_operator_turn(room):
+        room.turn_order.insert(len(room.turn_order) - 1, user_id)
+
+    issue_resume_token(room, seat)
+
+    # 기존 인원에게는 패치, 새 참가자에게는 전체 스냅샷
+    commit_room(room, skip_sid=request.sid, event=event)
+    emit_room_state(room, to=request.sid)
+
+@socketio.on('start_game')
+@instrumented('start_game')
+@rate_limited('start_game')
+def start_game(data):
+    # 💡 [추가] 정원이 차기 전에 운영자가 시작 (시민 1명 이상)
+    room_id = data.get('roomId')
+    user_id = data.get('userId')
+
+    if not room_store.exists(room_id):
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    if not is_bound_to(room_id, user_id):
+        reject_unbound('start_game')
+        return
+
+    with room_store.lock(room_id):
+        _start_game_locked(room_id, user_id)
+
+def _start_game_locked(room_id, user_id):
+    room = room_store.get(room_id)
+    if room is None:
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    if user_id != room.operator_id:
+        emit('error', {'message': '운영자만 게임을 시작할 수 있습니다.'})
+        return
+    if room.turn != 'waiting':
+        emit('error', {'message': '이미 게임이 시작되었습니다.'})
+        return
+    if len(room.humans) < 2:
+        emit('error', {'message': '시민 참가자가 1명 이상 있어야 시작할 수 있습니다.'})
+        return
+    begin_game(room)
+    commit_room(room, event='game_started')
 
 @socketio.on('leave_room')
+@instrumented('handle_leave_room')
+@rate_limited('handle_leave_room')
 def handle_leave_room(data, is_disconnect=False):
     room_id = data.get('roomId')
     user_id = data.get('userId')
     
-    if room_id not in rooms:
+    if not room_store.exists(room_id):
+        return
+    if not is_bound_to(room_id, user_id):
+        reject_unbound('leave_room')
+        return
+
+    with room_store.lock(room_id):
+        _leave_room_locked(room_id, user_id, is_disconnect)
+
+def _leave_room_locked(room_id, user_id, is_disconnect):
+    room = room_store.get(room_id)
+    if room is None:
         return
-        
-    room = rooms[room_id]
     
     # 방 자체를 삭제 (운영자가 나갈 경우)
-    if user_id == room['operator_id']:
-        room['messages'].append({
-            'id': f"msg_system_exit_op",
-            'sender': 'system', 
-            'sender_name': '시스템', # 💡 [추가]
-            'text': f"운영자('{room.get('operator_name')}')가 방을 나갔습니다. 게임이 종료됩니다.",
-            'timestamp': datetime.now().isoformat()
-        })
-        emit_room_state(room_id)
-        # 룸 삭제
-        if room_id in rooms:
-            del rooms[room_id]
+    if user_id == room.operator_id:
+        add_messages(room, Message.system(f"운영자('{room.operator.name}')가 방을 나갔습니다. 게임이 종료됩니다."))
+        commit_room(room)
+        # 룸 삭제 (AI 작업 취소, 메시지 보관, 역색인 정리 포함)
+        delete_room(room, 'operator_left')
             
     # 참가자만 내보내기
-    elif user_id == room['user_id']:
-        user_name = room.get('user_name', '참가자')
+    elif user_id in room.humans:
+        seat = room.humans.pop(user_id)
         # 💡 [수정] 닉네임 반환 로직
-        if room.get('available_names') is not None and user_name in ANIMAL_NAMES:
-             room['available_names'].append(user_name) # 닉네임 반환
+        if seat.name in ANIMAL_NAMES:
+             room.available_names.append(seat.name) # 닉네임 반환
 
-        room['user_id'] = None
-        room['user_sid'] = None
-        room['user_name'] = None
+        unbind_session(seat.sid) # 💡 [추가] 재접속 토큰도 자리와 함께 폐기됨
         
-        room['messages'].append({
-            'id': f"msg_system_exit_user",
-            'sender': 'system', 
-            'sender_name': '시스템', # 💡 [추가]
-            'text': f"참가자('{user_name}')가 방을 나갔습니다.",
-            'timestamp': datetime.now().isoformat()
-        })
+        add_messages(room, Message.system(f"참가자('{seat.name}')가 방을 나갔습니다."))
         if not is_disconnect:
             leave_room(room_id)
-        emit_room_state(room_id)
+        # 💡 [추가] 발언 순서에서 빼고, 그 사람 차례였으면 다음 사람에게 넘김
+        if remove_from_turns(room, user_id):
+            turn_passed(room)
+        # 💡 [추가] 투표 중이면 나간 참가자의 표를 회수하고, 남은 사람이 모두 투표했으면 마감
+        if room.turn == 'voting':
+            withdraw_vote(room, user_id)
+            if all_voted(room):
+                finish_vote_locked(room, 'complete')
+                return
+        commit_room(room, event='player_left')
 
 
 @socketio.on('send_message')
+@instrumented('send_message')
+@rate_limited('send_message')
 def send_message(data):
     room_id = data.get('roomId')
     user_id = data.get('userId')
     text = data.get('text')
 
-    if room_id not in rooms:
+    room = room_store.get(room_id)
+    if room is None:
+        return
+    if not is_bound_to(room_id, user_id):
+        reject_unbound('send_message')
+        return
+
+    # 💡 [추가] 방 단위 메시지 속도 제한 (락을 잡기 전에 거절)
+    allowed, retry_after = room_message_limiter.allow(room_id, cost=2 / max(2, len(room.humans)))
+    if not allowed:
+        rate_limited_total.inc(event='send_message', scope='room')
+        reject_event('send_message', 'rate_limited', '이 방에 메시지가 너무 많습니다. 잠시 후 다시 시도해주세요.', retry_after)
+        return
+
+    with room_store.lock(room_id):
+        _send_message_locked(room_id, user_id, text)
+
+def _send_message_locked(room_id, user_id, text):
+    room = room_store.get(room_id)
+    if room is None:
         return
-        
-    room = rooms[room_id]
-    
-    sender_type = 'unknown'
-    sender_name = 'Unknown' # 💡 [추가]
-    
-    if user_id == room['operator_id']:
-        sender_type = 'operator'
-        sender_name = room.get('operator_name', '운영자') # 💡 [추가]
-    elif user_id == room['user_id']:
-        sender_type = 'user'
-        sender_name = room.get('user_name', '참가자') # 💡 [추가]
-
-    new_message = {
-        'id': f"msg_{datetime.now().isoformat()}_{random.randint(1000, 9999)}",
-        'sender': user_id,
-        'sender_type': sender_type,
-        'sender_name': sender_name, # 💡 [추가]
-        'text': text,
-        'timestamp': datetime.now().isoformat()
-    }
-    
-    phase_name = PHASES[room['phase']]
 
     # --- '진술' 및 '토론' 페이즈 공통 로직 ---
-    current_turn = room.get('turn')
-
-    if current_turn == 'user' and user_id == room['user_id']:
-        # 1. 유저(시민) 메시지 추가
-        room['messages'].append(new_message)
-        # 2. 턴을 운영자(라이어)에게 넘김
-        room['turn'] = 'operator'
-        # 3. AI 답변 생성 (백그라운드)
-        socketio.start_background_task(async_generate_ai_answers, room_id, phase_name)
-        # 4. 상태 전파 (유저 메시지 보임, 턴이 운영자에게 넘어감)
-        emit_room_state(room_id) 
-
-    elif current_turn == 'operator' and user_id == room['operator_id']:
+    # 💡 [수정] 발언 순서(turns.py)상 자기 차례인 사람만 보낼 수 있음
+    seat = room.humans.get(user_id)
+    if seat is None or current_speaker(room) != user_id:
+        return
+
+    if user_id != room.operator_id:
+        # 0. 💡 [추가] 이번 발언으로 운영자 차례가 되어 AI 답변을 새로 생성해야 하는데 AI 대기열이 가득 차 있으면 거절
+        if next_speaker(room) == room.operator_id and not prefetch_usable(room) and not admit_ai_work('turn'):
+            reject_event('send_message', 'overloaded', 'AI가 너무 바쁩니다. 잠시 후 다시 보내주세요.', OVERLOAD_RETRY_AFTER)
+            return
+        # 1. 시민 메시지 추가
+        add_messages(room, Message.create(user_id, seat.name, text, 'user'))
+        # 2. 다음 사람에게 발언권 (마지막 시민이면 운영자)
+        advance_turn(room)
+        # 3. 운영자 차례가 되면 AI 답변 준비 (선생성 결과 사용 / 진행 중이면 승격 / 없으면 백그라운드 생성)
+        turn_passed(room)
+        # 4. 상태 전파 (시민 메시지 보임, 턴이 넘어감)
+        commit_room(room)
+
+    else:
         # 1. 운영자(라이어) 메시지를 '진술' 객체로 만듦
         operator_statement = {
-            'sender': room['operator_id'], 
+            'sender': room.operator_id, 
             'sender_type': 'operator', 
-            'sender_name': room.get('operator_name', '운영자'), # 💡 [수정]
+            'sender_name': seat.name, # 💡 [수정]
             'text': text 
         }
 
         # 2. AI 답변이 준비되었는지 확인
-        if 'ai_answers' not in room or not room['ai_answers']:
-            print(f"Warning: Operator sent message but AI answers are not ready in room {room_id}.")
-            room['messages'].append(new_message) # 💡 [수정] new_message(sender_name 포함) 사용
-            emit_room_state(room_id)
+        # 💡 [수정] 아직 생성 중이면 운영자 진술을 보류해 두었다가, 생성이 끝나는 즉시 섞어서 공개
+        if room.pending_statement:
+            emit('error', {'message': '이미 진술을 제출했습니다. AI 진술을 기다리는 중입니다.'})
+            return
+        if not room.ai_answers:
+            room.pending_statement = operator_statement
+            room.turn = 'reveal'
+            commit_room(room)
             return
 
-        # 3. 운영자 진술(dict) + AI 진술(dict list)
-        all_statements = [operator_statement] + room['ai_answers']
-        random.shuffle(all_statements)
-
-        # 4. 섞인 진술들을 완전한 메시지 객체로 변환
-        shuffled_messages = []
-        for stmt in all_statements:
-            shuffled_messages.append({
-                'id': f"msg_{datetime.now().isoformat()}_{random.randint(1000, 9999)}",
-                'sender': stmt['sender'],
-                'sender_type': stmt['sender_type'],
-                'sender_name': stmt.get('sender_name', 'AI'), # 💡 [수정]
-                'text': stmt['text'],
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        # 5. 섞인 메시지들을 DB에 추가
-        room['messages'].extend(shuffled_messages)
-        room['ai_answers'] = [] # 임시 답변 초기화
-        
-        # 6. 페이즈 진행
-        room['phase'] += 1
-        
-        if room['phase'] < len(PHASES):
-            next_phase_name = PHASES[room['phase']]
-            room['messages'].append({
-                'id': f"msg_system_phase_{room['phase']}",
-                'sender': 'system', 
-                'sender_name': '시스템', # 💡 [추가]
-                'text': f"--- {next_phase_name}이 시작되었습니다. ---",
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            # 다음 페이즈에 따라 턴 설정
-            if '진술' in next_phase_name or '토론' in next_phase_name:
-                room['turn'] = 'user' # '진술'/'토론'은 다시 유저부터
-            else:
-                room['turn'] = 'voting' # '투표' 턴
-        
-        else:
-            # TODO: 모든 페이즈 종료 -> 투표 시작
-            room['turn'] = 'voting'
-            room['messages'].append({
-                'id': f"msg_system_vote",
-                'sender': 'system', 
-                'sender_name': '시스템', # 💡 [추가]
-                'text': f"--- 모든 토론이 종료되었습니다. 투표를 시작합니다. (투표 기능 미구현) ---",
-                'timestamp': datetime.now().isoformat()
-            })
+        # 3~6. 섞어서 공개 + 페이즈 진행
+        reveal_statements(room, operator_statement)
 
         # 7. 최종 상태 전파
-        emit_room_state(room_id)
+        commit_room(room)
+
+
+def reveal_statements(room, operator_statement):
+    # 💡 [추가] 운영자 진술 + AI 진술을 섞어서 공개하고 다음 페이즈로 진행
+    # 3. 운영자 진술(dict) + AI 진술(dict list)
+    all_statements = [operator_statement] + room.ai_answers
+    random.shuffle(all_statements)
+
+    # 4. 섞인 진술들을 완전한 메시지 객체로 변환
+    shuffled_messages = []
+    for stmt in all_statements:
+        shuffled_messages.append(Message.create(
+            stmt['sender'],
+            stmt.get('sender_name', 'AI'), # 💡 [수정]
+            stmt['text'],
+            stmt['sender_type'],
+        ))
+
+    # 5. 섞인 메시지들을 DB에 추가
+    add_messages(room, *shuffled_messages)
+    room.ai_answers = [] # 임시 답변 초기화
+
+    # 6. 페이즈 진행
+    room.phase += 1
+
+    if room.phase < len(PHASES):
+        next_phase_name = PHASES[room.phase]
+        add_messages(room, Message.system(f"--- {next_phase_name}이 시작되었습니다. ---"))
+
+        # 다음 페이즈에 따라 턴 설정
+        if '진술' in next_phase_name or '토론' in next_phase_name:
+            start_turns(room) # 💡 [수정] '진술'/'토론'은 다시 첫 시민부터 (turns.py)
+            # 💡 [추가] 시민들이 입력하는 동안 다음 페이즈 AI 진술을 미리 생성
+            if can_prefetch(next_phase_name):
+                start_ai_job(room, speculative=True)
+            turn_passed(room) # 시민이 모두 나간 방이면 바로 운영자 차례
+        else:
+            begin_voting(room) # 💡 [수정] '투표' 턴
+
+    else:
+        # 💡 [수정] 모든 페이즈 종료 -> 투표 시작
+        add_messages(room, Message.system("--- 모든 토론이 종료되었습니다. ---"))
+        begin_voting(room)
+
+
+# ---------------------
+# 투표
+# ---------------------
+# 💡 [추가] 사람은 'cast_vote'로, AI는 투표 시작 때 한 번에 (동시 요청 / 배치 요청) 생성한 표를 한꺼번에 넣음
+# 표가 들어올 때마다 방 전체 패치 대신 작은 'voteUpdate'만 보내고, 마감할 때 결과를 포함한 패치를 한 번 보냅니다.
+# 마감: 전원이 투표하면 즉시, 아니면 VOTE_TIMEOUT 뒤 수명 관리 스케줄러의 타이머로
+VOTE_TIMEOUT = float(os.getenv("VOTE_TIMEOUT", "60"))
+
+def vote_timer_key(room_id):
+    return ('vote', room_id)
+
+def schedule_vote_timer(room):
+    lifecycle.schedule_at(vote_timer_key(room.id), 'voting', room.vote_deadline / 1000)
+
+def begin_voting(room):
+    # (락 안에서) 투표 시작 + 마감 타이머 + AI 표 생성
+    start_vote(room, now_ms() + int(VOTE_TIMEOUT * 1000))
+    add_messages(room, Message.system(f"--- 라이어로 의심되는 사람에게 투표하세요. ({int(VOTE_TIMEOUT)}초) ---"))
+    schedule_vote_timer(room)
+    socketio.start_background_task(async_generate_ai_votes, room.id, room.vote_deadline)
+
+def publish_votes_locked(room, changed, kind):
+    # (락 안에서) 새로 들어온 표 반영: 전원 투표면 마감, 아니면 저장 + 'voteUpdate'
+    if not changed:
+        return
+    votes_cast.inc(len(changed), kind=kind)
+    if all_voted(room):
+        finish_vote_locked(room, 'complete')
+        return
+    record_event(room, 'vote_cast')
+    touch_room(room)
+    room_store.save(room)
+    emit_measured('voteUpdate', vote_update(room, changed), to=room.id)
+    spectator_hub.changed(room)
+
+def finish_vote_locked(room, reason):
+    close_vote(room, reason)
+    lifecycle.remove(vote_timer_key(room.id))
+    add_messages(room, Message.system(result_message(room)))
+    votes_closed.inc(reason=reason)
+    commit_room(room, event='vote_closed')
+
+def close_vote_on_timeout(room_id):
+    with room_store.lock(room_id):
+        room = room_store.get(room_id)
+        if room is None or room.turn != 'voting':
+            return
+        # 다른 워커가 다시 시작한 투표일 수 있으므로 저장된 마감 시각으로 다시 판정
+        if room.vote_deadline / 1000 > time.time():
+            schedule_vote_timer(room)
+            return
+        finish_vote_locked(room, 'timeout')
+
+@socketio.on('cast_vote')
+@instrumented('cast_vote')
+@rate_limited('cast_vote')
+def cast_vote_event(data):
+    room_id = data.get('roomId')
+    user_id = data.get('userId')
+    target = data.get('target')
+
+    if not room_store.exists(room_id):
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    if not is_bound_to(room_id, user_id):
+        reject_unbound('cast_vote')
+        return
+
+    with room_store.lock(room_id):
+        _cast_vote_locked(room_id, user_id, target)
+
+def _cast_vote_locked(room_id, user_id, target):
+    room = room_store.get(room_id)
+    if room is None:
+        emit('error', {'message': '존재하지 않는 방입니다.'})
+        return
+    # AI 표는 서버만 넣을 수 있음 (사람은 자기 자리로만 투표)
+    if user_id is None or user_id not in room.humans:
+        emit('error', {'message': '투표할 수 없는 사용자입니다.', 'code': 'not_voter', 'event': 'cast_vote'})
+        return
+    try:
+        changed = cast_vote(room, user_id, target)
+    except VoteError as e:
+        emit('error', {'message': str(e), 'code': e.code, 'event': 'cast_vote'})
+        return
+    if changed:
+        publish_votes_locked(room, {user_id: target}, 'human')
 
 
 # ---------------------
 # AI 답변 생성 (백그라운드)
 # ---------------------
-def async_generate_ai_answers(room_id, phase_name):
-    socketio.emit('aiProcessing', {'status': 'start'}, to=room_id)
+# 💡 [추가] AI 작업 관리 (투기적 선생성)
+# 방마다 현재 유효한 작업 하나(room.ai_job: id/phase/version/speculative)만 결과를 반영할 수 있고,
+# 새 작업이 시작되면 이전 작업은 취소(대기 중 요청은 실행 안 함) + 결과 폐기됩니다.
+# 선생성 결과는 room.prefetch에 (phase, version)과 함께 보관했다가 운영자 차례가 될 때 사용합니다.
+ai_jobs = {} # 이 프로세스에서 실행 중인 작업: job_id -> {'visible': 진행 이벤트 전송 여부, 'cancelled': 취소 여부}
+prefetch_stats = {'started': 0, 'hit': 0, 'promoted': 0, 'regenerated': 0, 'discarded': 0}
+# 💡 [추가] 배치 생성 결과 (fallback_answers: 배치에서 빠져 개별 요청으로 만든 답변 수)
+batch_stats = {'complete': 0, 'partial': 0, 'invalid': 0, 'failed': 0, 'fallback_answers': 0}
+
+def can_prefetch(phase_name):
+    # '진술'은 유저의 다음 메시지 없이도 만들 수 있음. '토론'은 유저 발언에 반응해야 하므로 메시지 도착 후 생성
+    return '진술' in phase_name
+
+def start_ai_job(room, speculative):
+    # (락 안에서 호출) 새 작업 등록 + 이전 작업 취소
+    # 💡 [추가] 선생성은 선택 작업이므로 AI 대기열이 밀려 있으면 건너뜀 (운영자 차례가 될 때 생성)
+    if speculative and not admit_ai_work('prefetch'):
+        return None
+    previous = room.ai_job
+    if previous is not None:
+        cancel_ai_job(previous['id'])
+    job = {
+        'id': uuid.uuid4().hex,
+        'phase': room.phase,
+        'version': room.message_count, # 생성에 사용한 대화 기록 버전
+        'speculative': speculative,
+    }
+    room.ai_job = job
+    room.prefetch = None
+    ai_jobs[job['id']] = {'visible': not speculative, 'cancelled': False}
+    if speculative:
+        prefetch_stats['started'] += 1
+    launch_ai_job(room.id, PHASES[room.phase], job['id'])
+    return job
+
+def cancel_ai_job(job_id):
+    flags = ai_jobs.get(job_id)
+    if flags is not None:
+        flags['cancelled'] = True
+
+# 💡 [추가] 방마다 AI 생성은 한 번에 하나만 실행
+# 실행 중인 생성이 있으면 새 작업은 'next' 자리에서 기다리고, 그 사이 또 새 작업이 오면
+# 기다리던 작업은 버리고 최신 것 하나만 남깁니다 (이미 취소된 작업이므로 결과도 쓰이지 않음).
+ai_room_tasks = {} # room_id -> {'running': job_id, 'next': (phase_name, job_id) | None}
+
+def launch_ai_job(room_id, phase_name, job_id):
+    task = ai_room_tasks.get(room_id)
+    if task is not None:
+        if task['next'] is not None:
+            ai_jobs.pop(task['next'][1], None)
+            ai_jobs_coalesced.inc()
+        task['next'] = (phase_name, job_id)
+        return
+    ai_room_tasks[room_id] = {'running': job_id, 'next': None}
+    socketio.start_background_task(run_room_ai_jobs, room_id, phase_name, job_id)
+
+def run_room_ai_jobs(room_id, phase_name, job_id):
+    while True:
+        try:
+            async_generate_ai_answers(room_id, phase_name, job_id)
+        except Exception as e:
+            print(f"Error in AI job {job_id} for room {room_id}: {e}")
+        task = ai_room_tasks[room_id]
+        following, task['next'] = task['next'], None
+        if following is None:
+            del ai_room_tasks[room_id]
+            return
+        phase_name, job_id = following
+        task['running'] = job_id
+
+def prefetch_is_valid(room, job):
+    # 선생성 이후 추가된 메시지가 유저/시스템 메시지뿐이면 그대로 사용 가능
+    if job['phase'] != room.phase or not can_prefetch(PHASES[room.phase]):
+        return False
+    return all(
+        msg.sender == 'system' or msg.sender_type == 'user'
+        for msg in messages_since(room, job['version'])
+    )
+
+def prefetch_usable(room):
+    # 선생성 작업(완료 또는 진행 중)을 이번 턴에 그대로 쓸 수 있는지
+    job = room.ai_job
+    return job is not None and job['speculative'] and prefetch_is_valid(room, job)
+
+def use_ai_answers_for_turn(room):
+    # (락 안에서, 운영자 차례가 될 때) 선생성 결과 사용 → 진행 중이면 승격 → 둘 다 아니면 새로 생성
+    job = room.ai_job
+    if prefetch_usable(room):
+        prefetch, room.prefetch = room.prefetch, None
+        if prefetch is not None and prefetch['id'] == job['id']:
+            room.ai_answers = prefetch['answers']
+            room.ai_job = None
+            prefetch_stats['hit'] += 1
+            return
+        job['speculative'] = False
+        flags = ai_jobs.get(job['id'])
+        if flags is not None:
+            flags['visible'] = True
+        prefetch_stats['promoted'] += 1
+        socketio.emit('aiProcessing', {'status': 'start'}, to=room.id)
+        return
+
+    if job is not None and job['speculative']:
+        prefetch_stats['regenerated'] += 1
+    start_ai_job(room, speculative=False)
+
+def store_ai_answers(room_id, job_id, answers):
+    # 💡 [추가] AI 답변 저장 (answers가 None이면 생성 실패). 운영자 진술이 보류 중이면 바로 섞어서 공개
+    with room_store.lock(room_id):
+        room = room_store.get(room_id)
+        if room is None:
+            return
+        job = room.ai_job
+        if job is None or job['id'] != job_id:
+            prefetch_stats['discarded'] += 1 # 이미 새 작업으로 교체됨
+            return
+
+        if job['speculative']:
+            if answers is None:
+                room.ai_job = None # 실패한 선생성은 버리고 운영자 차례가 될 때 다시 생성
+            else:
+                room.prefetch = {'id': job_id, 'phase': job['phase'], 'version': job['version'], 'answers': answers}
+            room_store.save(room)
+            return
+
+        room.ai_job = None
+        if answers is None:
+            answers = [
+                {
+                    'sender': ai.id,
+                    'sender_type': 'ai',
+                    'sender_name': ai.name,
+                    'text': f"(AI {ai.name} 답변 생성 오류)"
+                }
+                for ai in room.ai_players
+            ]
+        room.ai_answers = answers
+        pending, room.pending_statement = room.pending_statement, None
+        if pending is not None:
+            reveal_statements(room, pending)
+            commit_room(room, event='ai_answers_committed')
+        else:
+            record_event(room, 'ai_answers_committed')
+            room_store.save(room)
+
+def request_batch_answers(room_id, ai_players, phase_name, turn_context, max_tokens_per_ai, is_cancelled):
+    # 💡 [추가] AI 전원 답변을 JSON 요청 1번으로 → {ai_id: 텍스트}. 실패/형식 오류면 빈 dict (호출 측이 AI별 요청으로 대체)
+    # 검증은 풀 밖에서 (형식 오류가 키 상태에 반영되지 않도록)
+    def generate_batch(client_index, client, should_stop):
+        client_label = str(client_index) if client_index >= 0 else 'fallback'
+        ai_requests.inc(client=client_label)
+        started = time.perf_counter()
+        try:
+            response, headers = create_completion(
+                client,
+                model="gpt-4o-mini",
+                messages=build_batch_messages(ai_players, phase_name, turn_context),
+                max_tokens=max_tokens_per_ai * len(ai_players) + 50,
+                timeout=AI_REQUEST_TIMEOUT,
+                response_format=batch_response_format(ai_players),
+            )
+            client_pool.observe_headers(client_index, headers)
+            record_token_usage(client_index, getattr(response, 'usage', None))
+            return response.choices[0].message.content
+        except Exception:
+            ai_errors.inc(client=client_label)
+            raise
+        finally:
+            ai_request_seconds.observe(time.perf_counter() - started, client=client_label)
+
+    batched = {}
+    outcome = 'complete'
+    try:
+        batched = parse_batch_answers(client_pool.run(generate_batch, is_cancelled=is_cancelled), ai_players)
+        if len(batched) < len(ai_players):
+            outcome = 'partial'
+    except ValueError as e:
+        outcome = 'invalid'
+        print(f"Invalid batch response for room {room_id}: {e}")
+    except AICancelled:
+        raise
+    except Exception as e:
+        outcome = 'failed'
+        print(f"Batch request failed for room {room_id}: {e!r}")
+    batch_stats[outcome] += 1
+    batch_stats['fallback_answers'] += len(ai_players) - len(batched)
+    ai_batch_requests.inc(outcome=outcome)
+    return batched
+
+def async_generate_ai_answers(room_id, phase_name, job_id):
+    # 💡 [추가] 선생성 작업은 승격되기 전까지 클라이언트에 진행 이벤트를 보내지 않음
+    flags = ai_jobs.get(job_id) or {'visible': True, 'cancelled': False}
+
+    def notify(event, data):
+        if flags['visible']:
+            emit_measured(event, data, to=room_id)
+
+    notify('aiProcessing', {'status': 'start'})
     
-    room = rooms.get(room_id)
-    if not room:
-        socketio.emit('aiProcessing', {'status': 'end'}, to=room_id)
+    # 💡 [수정] 프롬프트 구성에 필요한 상태만 락 안에서 읽고, LLM 호출 중에는 락을 잡지 않음
+    with room_store.lock(room_id):
+        room = room_store.get(room_id)
+    if not room or (room.ai_job or {}).get('id') != job_id:
+        notify('aiProcessing', {'status': 'end'})
+        ai_jobs.pop(job_id, None)
         return
 
     # 💡 [오류 수정] try...finally 구문으로 변경
@@ -402,146 +1477,227 @@ def async_generate_ai_answers(room_id, phase_name):
     # 프론트엔드가 무한 로딩에 빠지는 것을 방지합니다.
     try: 
         try:
-            topic = room['topic']
-            citizen_word = room['citizen_word']
-            chat_history = room['messages']
-            
-            # 💡 [추가] AI 프롬프트에 '닉네임 대조표' 추가
-            nickname_map = {
-                room['operator_id']: room.get('operator_name', '운영자'),
-                room['user_id']: room.get('user_name', '참가자'),
-            }
-            for ai in room['ai_players']:
-                nickname_map[ai['id']] = ai['name']
-
-            # 💡 [수정] 대화 기록에 닉네임 추가
-            recent_chat_history = []
-            for msg in chat_history[-20:]: # 20개로 늘림
-                sender_name = nickname_map.get(msg.get('sender'), msg.get('sender_name', 'Unknown'))
-                recent_chat_history.append({
-                    "sender_name": sender_name,
-                    "text": msg.get('text')
-                })
-            recent_chat_history_json = json.dumps(recent_chat_history, ensure_ascii=False)
-            
-            phase_rules = "" 
+            # 💡 [수정] 고정 규칙/성격은 캐시된 system 메시지로, 대화 기록은 턴당 한 번만 직렬화
+            turn_context = build_turn_context(room, phase_name)
             
-            if '진술' in phase_name:
-                phase_rules = f"""
-                (역할: {phase_name})
-                게임 주제: {topic}
-                당신이 받은 단어: {citizen_word}
-                최근 대화 내용(이전 진술과 중복을 피하기 위해 참고하세요):
-                {recent_chat_history_json}
-
-                당신은 라이어 게임의 참가자이며, **제시어({citizen_word})를 알고 있는 일반 시민 역할**입니다.
-                당신의 목표는 라이어가 아님을 증명하고, 라이어를 찾아내는 것입니다.
-                
-                💡 핵심 규칙:
-                1. **제시어 직접 언급 금지:** "{citizen_word}" 단어를 절대 말하지 마세요.
-                2. **모호성 유지 (가장 중요):** 라이어가 유추하기 어렵도록, **"이것은... 입니다"** 같은 직접적인 정의 대신, **"...을(를) 떠올리게 하네요"** 또는 **"...와(과) 관련이 있죠"** 처럼 매우 간접적이고 모호한 방식으로 힌트를 주세요.
-                3. **중복 금지:** 다른 참가자(대화 내용 참고)가 이미 말한 힌트나, 1차 진술 때 자신이 했던 말과 겹치는 힌트는 절대 말하지 마세요.
-                4. **창의성:** 다른 AI들도 동시에 답변을 생성중입니다. 가장 뻔한 힌트(예: 사과 -> '빨갛다', '과일이다')는 반드시 피하고, 창의적인 힌트를 1개만 말하세요.
-                5. **답변 형식:** 이모티콘 없이, 당신의 성격에 맞는 1개의 문장으로 답변을 생성하세요.
-                """
-            
-            elif '토론' in phase_name:
-                phase_rules = f"""
-                (역할: {phase_name})
-                게임 주제: {topic}
-                당신이 받은 단어: {citizen_word}
-                
-                💡 참가자 명단 (ID와 닉네임):
-                {json.dumps(nickname_map, ensure_ascii=False)}
-
-                💡 최근 대화 내용:
-                {recent_chat_history_json}
-                
-                당신은 제시어를 아는 '시민'입니다. 이 단계의 목표는 라이어를 찾는 것입니다.
-                대화 내용을 보고, 참가자 명단에서 **닉네임**을 사용해 가장 의심스러운 사람 1명을 지목하거나 이유를 말하세요.
-
-                💡 핵심 규칙:
-                1. **'토론'의 목적:** 제시어({citizen_word})를 설명하지 마세요.
-                2. **닉네임 사용:** ID(ai_1, user_id 등)가 아닌, **반드시 참가자 명단의 '닉네임'을 사용**하여 의심하세요.
-                3. **제시어 언급 금지:** "{citizen_word}" 단어를 절대 말하지 마세요.
-                4. **답변 형식:** 이모티콘 없이, 당신의 성격에 맞는 1개의 문장으로 답변을 생성하세요.
-                
-                (예시: "{nickname_map.get(room['operator_id'], '운영자')} 님의 아까 발언이 좀 애매했던 것 같아요.")
-                (예시: "{nickname_map.get(room['user_id'], '참가자')} 님이 제시어랑 좀 거리가 먼 이야기를 하신 것 같습니다.")
-                """
-            
-            ai_players = room['ai_players']
+            ai_players = room.ai_players
             
+            # 💡 [추가] 진행 상황 (몇 명의 AI가 준비되었는지만 알림 - 누가 무슨 말을 하는지는 공개하지 않음)
+            progress = {'ready': 0, 'streaming': 0, 'total': len(ai_players)}
+
             # 💡 [수정] generate_answer가 ai_player 객체를 받도록 수정
-            def generate_answer(client, ai_player, full_prompt):
-                ai_id = ai_player['id']
-                ai_name = ai_player['name'] # 💡 [추가]
+            # 💡 [수정] 키는 ClientPool이 시도마다 골라서 넘겨줌 (client_index -1: 로컬 대체 클라이언트)
+            # 오류/시간 초과는 풀이 키 상태에 반영할 수 있도록 그대로 올려보냄
+            # 스트리밍 모드에서는 시도마다 토큰을 buffer에 모으며, 모든 시도가 실패하면 가장 긴 부분 답변을 사용
+            partials = {ai_player.id: [] for ai_player in ai_players}
+            streaming_started = set()
+
+            def generate_answer(client_index, client, should_stop, ai_player, messages):
+                client_label = str(client_index) if client_index >= 0 else 'fallback'
+                buffer = []
+                partials[ai_player.id].append(buffer)
+                ai_requests.inc(client=client_label)
+                started = time.perf_counter()
                 try:
-                    response = client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[{"role": "user", "content": full_prompt}],
-                        max_tokens=100
-                    )
-                    response_text = response.choices[0].message.content.strip()
+                    if AI_STREAMING:
+                        stream, headers = create_completion(
+                            client,
+                            model="gpt-4o-mini",
+                            messages=messages,
+                            max_tokens=100,
+                            timeout=AI_REQUEST_TIMEOUT,
+                            stream=True,
+                            extra_body={"stream_options": {"include_usage": True}}
+                        )
+                        client_pool.observe_headers(client_index, headers)
+                        for chunk in stream:
+                            if getattr(chunk, 'usage', None):
+                                record_token_usage(client_index, chunk.usage)
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if not delta:
+                                continue
+                            if should_stop():
+                                raise AICancelled("job replaced or hedge settled")
+                            if ai_player.id not in streaming_started:
+                                streaming_started.add(ai_player.id)
+                                progress['streaming'] += 1
+                                notify('aiProgress', dict(progress))
+                            buffer.append(delta)
+                        response_text = ''.join(buffer).strip()
+                    else:
+                        response, headers = create_completion(
+                            client,
+                            model="gpt-4o-mini",
+                            messages=messages,
+                            max_tokens=100,
+                            timeout=AI_REQUEST_TIMEOUT
+                        )
+                        client_pool.observe_headers(client_index, headers)
+                        record_token_usage(client_index, getattr(response, 'usage', None))
+                        response_text = response.choices[0].message.content.strip()
                     return {
-                        'sender': ai_id,
+                        'sender': ai_player.id,
                         'sender_type': 'ai',
-                        'sender_name': ai_name, # 💡 [수정]
+                        'sender_name': ai_player.name, # 💡 [수정]
                         'text': response_text
                     }
-                except Exception as e:
-                    print(f"Error for AI {ai_id}: {e}")
-                    return {
-                        'sender': ai_id,
+                except AICancelled:
+                    raise
+                except Exception:
+                    ai_errors.inc(client=client_label)
+                    raise
+                finally:
+                    ai_request_seconds.observe(time.perf_counter() - started, client=client_label)
+
+            def on_answer(i, answer, error):
+                progress['ready'] += 1
+                notify('aiProgress', dict(progress))
+
+            notify('aiProgress', dict(progress))
+
+            # 💡 [추가] 배치 모드: 요청 1번으로 받은 발언을 먼저 채우고, 빠진 AI만 아래 개별 요청으로 생성
+            batched = {}
+            if AI_BATCH and len(ai_players) > 1:
+                batched = request_batch_answers(room_id, ai_players, phase_name, turn_context, 100, lambda: flags['cancelled'])
+                if batched:
+                    progress['ready'] += len(batched)
+                    notify('aiProgress', dict(progress))
+
+            # 💡 [수정] 공유 스케줄러 위의 클라이언트 풀로 AI별 동시 요청 (키 고정 X)
+            pending_players = [ai_player for ai_player in ai_players if ai_player.id not in batched]
+            requests = [
+                partial(generate_answer, ai_player=ai_player, messages=build_messages(ai_player, phase_name, turn_context))
+                for ai_player in pending_players
+            ]
+
+            outcomes = dict(zip(
+                (ai_player.id for ai_player in pending_players),
+                client_pool.run_all(requests, is_cancelled=lambda: flags['cancelled'], on_result=on_answer, limit=AI_ROOM_PARALLEL),
+            ))
+            for ai_player in ai_players:
+                if ai_player.id in batched:
+                    outcomes[ai_player.id] = ({
+                        'sender': ai_player.id,
                         'sender_type': 'ai',
-                        'sender_name': ai_name, # 💡 [수정]
-                        'text': f"(AI {ai_name} 답변 생성 오류)" # 💡 [수정]
-                    }
+                        'sender_name': ai_player.name,
+                        'text': batched[ai_player.id],
+                    }, None)
 
-            # 4개의 AI 클라이언트로 동시에 답변 생성 요청
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                futures = []
-                for i in range(len(ai_players)):
-                    ai_player = ai_players[i]
-                    personality = ai_player['personality']
-                    
-                    full_prompt = f"""
-                    당신은 라이어 게임에 참가한 AI 참가자입니다.
-                    당신의 이름: {ai_player['name']}
-                    당신의 성격: {personality}
-                    
-                    당신의 성격에 맞게 답변을 조절하세요. (예: 소심하면 '...같아요', 직설적이면 '확실합니다.')
-                    
-                    ---
-                    
-                    {phase_rules}
-                    """
-                    
-                    futures.append(
-                        # 💡 [수정] ai_player 객체 전체 전달
-                        executor.submit(generate_answer, clients[i], ai_player, full_prompt)
-                    )
-                
-                results = [future.result() for future in concurrent.futures.as_completed(futures)]
+            results = []
+            for ai_player in ai_players:
+                answer, error = outcomes[ai_player.id]
+                if error is not None:
+                    print(f"Error for AI {ai_player.id}: {error!r}")
+                    partial_text = max((''.join(buffer).strip() for buffer in partials[ai_player.id]), key=len, default='')
+                    answer = {
+                        'sender': ai_player.id,
+                        'sender_type': 'ai',
+                        'sender_name': ai_player.name, # 💡 [수정]
+                        'text': partial_text or f"(AI {ai_player.name} 답변 생성 오류)" # 💡 [수정]
+                    }
+                results.append(answer)
             
-            room['ai_answers'] = results
+            # 💡 [수정] 호출 동안 바뀌었을 수 있으므로 최신 상태를 다시 읽어서 저장 (취소된 작업은 폐기)
+            store_ai_answers(room_id, job_id, None if flags['cancelled'] else results)
 
         except Exception as e:
             print(f"Error during AI processing: {e}")
-            room['messages'].append({
-                'id': f"msg_system_ai_error",
-                'sender': 'system', 
-                'sender_name': '시스템', # 💡 [추가]
-                'text': f"AI 응답 생성 중 오류가 발생했습니다: {e}",
-                'timestamp': datetime.now().isoformat()
-            })
-            emit_room_state(room_id) # 오류 상태 전파
+            with room_store.lock(room_id):
+                latest = room_store.get(room_id)
+                if latest is not None and flags['visible']:
+                    add_messages(latest, Message.system(f"AI 응답 생성 중 오류가 발생했습니다: {e}"))
+                    commit_room(latest) # 오류 상태 전파
+            # 보류 중인 운영자 진술이 멈추지 않도록 오류 답변으로라도 공개
+            store_ai_answers(room_id, job_id, None)
         
     finally:
         # 💡 [오류 수정]
         # AI 응답이 성공하든, 위에서 'except'로 잡히든,
         # 'finally'는 항상 실행되어 프론트엔드의 로딩 상태를 'end'로 변경합니다.
-        socketio.emit('aiProcessing', {'status': 'end'}, to=room_id)
+        notify('aiProcessing', {'status': 'end'})
+        ai_jobs.pop(job_id, None)
+
+
+def async_generate_ai_votes(room_id, round_id):
+    # 💡 [추가] 아직 투표하지 않은 AI 전원의 표를 한 번에 생성 (배치 모드면 요청 1번, 아니면 AI별 동시 요청)
+    # round_id(= 투표 마감 시각)가 바뀌었거나 투표가 끝났으면 결과를 버림
+    with room_store.lock(room_id):
+        room = room_store.get(room_id)
+    if room is None or room.turn != 'voting' or room.vote_deadline != round_id:
+        return
+
+    phase_name = PHASES[min(room.phase, len(PHASES) - 1)]
+    names = voter_names(room)
+    ai_players = [ai for ai in room.ai_players if ai.id not in room.votes]
+    is_cancelled = lambda: not room_store.exists(room_id)
+
+    def vote_answer(client_index, client, should_stop, ai_player, messages):
+        client_label = str(client_index) if client_index >= 0 else 'fallback'
+        ai_requests.inc(client=client_label)
+        started = time.perf_counter()
+        try:
+            response, headers = create_completion(
+                client,
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=20,
+                timeout=AI_REQUEST_TIMEOUT
+            )
+            client_pool.observe_headers(client_index, headers)
+            record_token_usage(client_index, getattr(response, 'usage', None))
+            return response.choices[0].message.content
+        except Exception:
+            ai_errors.inc(client=client_label)
+            raise
+        finally:
+            ai_request_seconds.observe(time.perf_counter() - started, client=client_label)
+
+    answers = {}
+    try:
+        turn_context = build_turn_context(room, phase_name)
+        if AI_BATCH and len(ai_players) > 1:
+            answers = request_batch_answers(room_id, ai_players, phase_name, turn_context, 20, is_cancelled)
+        pending_players = [ai_player for ai_player in ai_players if ai_player.id not in answers]
+        requests = [
+            partial(vote_answer, ai_player=ai_player, messages=build_messages(ai_player, phase_name, turn_context))
+            for ai_player in pending_players
+        ]
+        for ai_player, (text, error) in zip(pending_players, client_pool.run_all(requests, is_cancelled=is_cancelled, limit=AI_ROOM_PARALLEL)):
+            if error is not None:
+                print(f"Error for AI vote {ai_player.id}: {error!r}")
+            else:
+                answers[ai_player.id] = text
+    except Exception as e:
+        print(f"Error during AI voting for room {room_id}: {e!r}")
+
+    # 닉네임을 못 찾은 표(오류 포함)는 무작위 대상으로 (투표가 AI 때문에 멈추지 않도록)
+    ballots = {}
+    for ai_player in ai_players:
+        target = match_vote_target(answers.get(ai_player.id), names, ai_player.id)
+        if target is None:
+            ai_vote_fallbacks.inc()
+            target = random.choice([candidate for candidate in names if candidate != ai_player.id])
+        ballots[ai_player.id] = target
+
+    with room_store.lock(room_id):
+        room = room_store.get(room_id)
+        if room is None or room.turn != 'voting' or room.vote_deadline != round_id:
+            return
+        changed = {}
+        for voter, target in ballots.items():
+            if voter in room.votes:
+                continue
+            try:
+                if cast_vote(room, voter, target):
+                    changed[voter] = target
+            except VoteError:
+                continue # 그 사이 나간 참가자를 지목한 표
+        publish_votes_locked(room, changed, 'ai')
+
+
+recover_rooms()
 
 
 # ---------------------
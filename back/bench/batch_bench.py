@@ -0,0 +1,105 @@
+"""
+AI 생성 방식 비교: AI별 개별 요청(fan-out) vs 배치 요청 1번 (AI_BATCH=1)
+
+같은 mock LLM 설정으로 서버를 두 번 띄워 loadtest.py와 같은 게임 흐름을 돌리고,
+지연(p50/p95)과 /debug/ai의 LLM 호출 수 / 토큰 사용량 / 예상 비용을 나란히 출력합니다.
+mock의 토큰 수는 프롬프트 글자 수 기반 근사치이므로 절대값보다 두 방식의 비율을 보세요.
+
+    cd back
+    python bench/batch_bench.py --pairs 20 --latency fixed:300 --char-latency 5 --out batch_results.json
+
+필요 패키지: python-socketio[client]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadtest import Recorder, run_pair, spawn_server, summarize  # noqa: E402
+
+MODES = {'fanout': '0', 'batch': '1'}
+
+
+def run_mode(mode, args):
+    process, url = spawn_server(args.port, {
+        'MOCK_LLM_LATENCY': args.latency,
+        'MOCK_LLM_CHAR_LATENCY': str(args.char_latency),
+        'MOCK_LLM_BAD_JSON_RATE': str(args.bad_json_rate),
+        'AI_BATCH': MODES[mode],
+    })
+    try:
+        recorder = Recorder()
+        threads = [threading.Thread(target=run_pair, args=(i, url, recorder, args.timeout), daemon=True) for i in range(args.pairs)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        with urllib.request.urlopen(f"{url}/debug/ai", timeout=10) as response:
+            debug = json.load(response)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    result = summarize(recorder, elapsed, args.pairs, None, None)
+    usage = {
+        key: sum(client[key] for client in debug['tokens'])
+        for key in ('calls', 'prompt_tokens', 'cached_tokens', 'completion_tokens')
+    }
+    turns = result['operator_reveal_latency']['count'] or 1
+    cost = (usage['prompt_tokens'] * args.input_price + usage['completion_tokens'] * args.output_price) / 1_000_000
+    return {
+        'room_update_latency': result['room_update_latency'],
+        'operator_reveal_latency': result['operator_reveal_latency'],
+        'completed_pairs': result['completed_pairs'],
+        'error_count': result['error_count'],
+        'llm_calls': usage['calls'],
+        'llm_calls_per_turn': usage['calls'] / turns,
+        'prompt_tokens_per_turn': usage['prompt_tokens'] / turns,
+        'completion_tokens_per_turn': usage['completion_tokens'] / turns,
+        'cost_usd': cost,
+        'cost_usd_per_turn': cost / turns,
+        'pool': {key: debug['pool'][key] for key in ('hedges', 'failovers', 'fallbacks')},
+        'batch': debug.get('batch'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-AI fan-out with batched AI generation")
+    parser.add_argument('--pairs', type=int, default=20)
+    parser.add_argument('--port', type=int, default=5057)
+    parser.add_argument('--latency', default='fixed:300', help="MOCK_LLM_LATENCY (요청당 기본 지연)")
+    parser.add_argument('--char-latency', type=float, default=5.0, help="MOCK_LLM_CHAR_LATENCY (출력 글자당 ms)")
+    parser.add_argument('--bad-json-rate', type=float, default=0.0, help="MOCK_LLM_BAD_JSON_RATE (배치 응답 파싱 실패율)")
+    parser.add_argument('--input-price', type=float, default=0.15, help="입력 100만 토큰당 USD (gpt-4o-mini)")
+    parser.add_argument('--output-price', type=float, default=0.60, help="출력 100만 토큰당 USD (gpt-4o-mini)")
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--out', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args) for mode in MODES}
+    fanout, batch = results['fanout'], results['batch']
+    results['ratio'] = {
+        key: batch[key] / fanout[key] if fanout[key] else None
+        for key in ('llm_calls_per_turn', 'prompt_tokens_per_turn', 'completion_tokens_per_turn', 'cost_usd_per_turn')
+    }
+    results['ratio']['reveal_p95'] = (
+        batch['operator_reveal_latency']['p95_ms'] / fanout['operator_reveal_latency']['p95_ms']
+        if fanout['operator_reveal_latency']['p95_ms'] and batch['operator_reveal_latency']['p95_ms'] else None
+    )
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+"""
+Socket.IO 게임 흐름 부하 테스트
+
+방 N개(--pairs)에서 운영자가 create_room → 시민 --citizens명이 join_room → 발언 순서대로
+(시민들, 운영자) send_message 를 모든 PHASES가 끝날 때까지 반복합니다. 기본으로 mock LLM 백엔드를 쓰는 서버를 직접 띄웁니다.
+
+    cd back
+    python bench/loadtest.py --pairs 50 --out bench_results.json
+    python bench/loadtest.py --pairs 20 --citizens 5 --ais 6             # 사람 6명 + AI 6명인 방
+    python bench/loadtest.py --url http://localhost:5000 --pairs 20   # 이미 떠 있는 서버 대상
+
+필요 패키지: python-socketio[client]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import socketio
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TURN_PHASES = 4 # '1차 진술' ~ '2차 토론' (마지막 '투표'는 턴 없음)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def speaker(state):
+    # 지금 발언할 차례인 플레이어 ID (서버 turns.py와 같은 규칙)
+    order = state.get('turn_order') or []
+    index = state.get('turn_index', 0)
+    return order[index] if state.get('turn') == 'speaking' and index < len(order) else None
+
+
+def payload_size(payload):
+    return len(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+class Recorder:
+    """모든 클라이언트가 공유하는 측정값 (스레드 안전)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = 0
+        self.bytes_by_event = {}
+        self.latencies = {'user': [], 'operator': []}
+        self.errors = []
+        self.completed_pairs = 0
+
+    def event(self, name, payload, count_bytes):
+        with self.lock:
+            self.events += 1
+            if count_bytes:
+                self.bytes_by_event.setdefault(name, []).append(payload_size(payload))
+
+    def latency(self, role, seconds):
+        with self.lock:
+            self.latencies[role].append(seconds)
+
+    def error(self, message):
+        with self.lock:
+            self.errors.append(message)
+
+
+class GameClient:
+    """roomState / roomPatch 를 받아 로컬 상태를 유지하는 클라이언트"""
+
+    def __init__(self, url, user_id, recorder, count_bytes):
+        self.user_id = user_id
+        self.recorder = recorder
+        self.state = None
+        self.cond = threading.Condition()
+        self.sio = socketio.Client(reconnection=False)
+
+        @self.sio.on('roomState')
+        def on_state(data):
+            recorder.event('roomState', data, count_bytes)
+            with self.cond:
+                self.state = data
+                self.cond.notify_all()
+
+        @self.sio.on('roomPatch')
+        def on_patch(patch):
+            recorder.event('roomPatch', patch, count_bytes)
+            with self.cond:
+                if self.state is None or patch['seq'] != self.state.get('seq', 0) + 1:
+                    self.sio.emit('request_sync', {'roomId': patch['roomId']})
+                    return
+                self.state.update(patch['changes'])
+                self.state['messages'] = self.state['messages'] + patch['messages']
+                self.state['seq'] = patch['seq']
+                self.cond.notify_all()
+
+        @self.sio.on('*')
+        def on_other(event, data):
+            recorder.event(event, data, False)
+
+        @self.sio.on('error')
+        def on_error(data):
+            recorder.error(f"{user_id}: {data}")
+
+        self.sio.connect(url, transports=['websocket'])
+
+    def wait_for(self, predicate, timeout):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while self.state is None or not predicate(self.state):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+            return True
+
+    def emit(self, event, data):
+        self.sio.emit(event, data)
+
+    def close(self):
+        self.sio.disconnect()
+
+
+def open_room(index, url, recorder, timeout, prefix="bench", citizens=1, ai_players=None):
+    # 운영자가 방을 만들고 시민들이 들어와 게임이 시작될 때까지 → (operator, [participant, ...], room_id)
+    # 정원 = 시민 수 + 1 이므로 마지막 시민이 들어오면 서버가 바로 게임을 시작함
+    operator = GameClient(url, f"{prefix}-op-{index}", recorder, count_bytes=True)
+    participants = []
+    try:
+        request = {'userId': operator.user_id, 'isOperator': True, 'maxPlayers': citizens + 1}
+        if ai_players is not None:
+            request['aiPlayers'] = ai_players
+        operator.emit('create_room', request)
+        if not operator.wait_for(lambda s: s.get('id'), timeout):
+            raise TimeoutError("create_room")
+        room_id = operator.state['id']
+
+        for i in range(citizens):
+            participant = GameClient(url, f"{prefix}-user-{index}-{i}", recorder, count_bytes=False)
+            participants.append(participant)
+            participant.emit('join_room', {'roomId': room_id, 'userId': participant.user_id})
+            if not participant.wait_for(lambda s: any(h['id'] == participant.user_id for h in s.get('humans', ())), timeout):
+                raise TimeoutError(f"join_room {i}")
+        if not operator.wait_for(lambda s: s.get('turn') == 'speaking', timeout):
+            raise TimeoutError("game start")
+        return operator, participants, room_id
+    except Exception:
+        close_clients(*participants, operator)
+        raise
+
+
+def play_turns(index, operator, participants, room_id, recorder, timeout):
+    # '1차 진술' ~ '2차 토론'을 끝까지 (끝나면 '투표' 페이즈). 페이즈마다 시민들이 순서대로, 마지막에 운영자
+    by_id = {participant.user_id: participant for participant in participants}
+    first_phase = operator.state['phase']
+    for turn in range(TURN_PHASES):
+        # 이전 페이즈의 turn 값으로 먼저 보내지 않도록 페이즈까지 같이 확인
+        phase = first_phase + turn
+        for _ in participants:
+            if not operator.wait_for(lambda s: s.get('phase') == phase and speaker(s) in by_id, timeout):
+                raise TimeoutError(f"user turn {turn}")
+            participant = by_id[speaker(operator.state)]
+            text = f"user-{index}-{turn}-{participant.user_id}"
+            started = time.monotonic()
+            participant.emit('send_message', {'roomId': room_id, 'userId': participant.user_id, 'text': text})
+            if not operator.wait_for(lambda s: any(m.get('text') == text for m in s['messages']), timeout):
+                raise TimeoutError(f"user message {turn}")
+            recorder.latency('user', time.monotonic() - started)
+
+        if not operator.wait_for(lambda s: speaker(s) == operator.user_id, timeout):
+            raise TimeoutError(f"operator turn {turn}")
+        started = time.monotonic()
+        operator.emit('send_message', {'roomId': room_id, 'userId': operator.user_id, 'text': f"op-{index}-{turn}"})
+        if not operator.wait_for(lambda s: s.get('phase', 0) > phase, timeout):
+            raise TimeoutError(f"reveal {turn}")
+        recorder.latency('operator', time.monotonic() - started)
+
+
+def close_clients(*clients):
+    for client in clients:
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+def run_pair(index, url, recorder, timeout, citizens=1, ai_players=None):
+    operator, participants = None, []
+    try:
+        operator, participants, room_id = open_room(index, url, recorder, timeout, citizens=citizens, ai_players=ai_players)
+        play_turns(index, operator, participants, room_id, recorder, timeout)
+        with recorder.lock:
+            recorder.completed_pairs += 1
+    except Exception as e:
+        recorder.error(f"pair {index}: {e!r}")
+    finally:
+        close_clients(*participants, operator)
+
+
+def rss_bytes(pid):
+    # 리눅스 /proc 기준 상주 메모리
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def spawn_server(port, env_overrides):
+    env = dict(os.environ)
+    env.setdefault('LLM_BACKEND', 'mock')
+    # 이전 실행에서 남은 방을 복구하지 않도록 저널은 끔 (필요하면 env_overrides로 지정)
+    env.setdefault('JOURNAL_DIR', 'none')
+    # 서버가 cwd=back/에서 돌므로 메시지 보관소도 끔 (소스 트리에 message_archive/가 쌓이지 않도록)
+    env.setdefault('MESSAGE_ARCHIVE', 'none')
+    env.update(env_overrides)
+    process = subprocess.Popen(
+        [sys.executable, '-c', f"import api; api.socketio.run(api.app, host='127.0.0.1', port={port})"],
+        cwd=BACK_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            probe = socketio.Client(reconnection=False)
+            probe.connect(url, transports=['websocket'])
+            probe.disconnect()
+            return process, url
+        except Exception:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+
+def summarize(recorder, elapsed, pairs, rss_before, rss_peak):
+    def latency_summary(values):
+        return {
+            'count': len(values),
+            'p50_ms': percentile(values, 50) and percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) and percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) and percentile(values, 99) * 1000,
+        }
+
+    all_latencies = recorder.latencies['user'] + recorder.latencies['operator']
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'pairs': pairs,
+        'completed_pairs': recorder.completed_pairs,
+        'elapsed_s': elapsed,
+        'events': recorder.events,
+        'events_per_sec': recorder.events / elapsed if elapsed else None,
+        'room_update_latency': latency_summary(all_latencies),
+        'user_message_latency': latency_summary(recorder.latencies['user']),
+        'operator_reveal_latency': latency_summary(recorder.latencies['operator']),
+        'bytes_per_broadcast': {
+            name: {'count': len(sizes), 'mean': statistics.mean(sizes), 'max': max(sizes)}
+            for name, sizes in recorder.bytes_by_event.items()
+        },
+        'memory_per_room_bytes': (rss_peak - rss_before) / pairs if rss_before and rss_peak and pairs else None,
+        'errors': recorder.errors[:20],
+        'error_count': len(recorder.errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Liar Game Socket.IO load test")
+    parser.add_argument('--pairs', type=int, default=20, help="동시에 진행할 방 수")
+    parser.add_argument('--citizens', type=int, default=1, help="방마다 시민(사람) 수")
+    parser.add_argument('--ais', type=int, help="방마다 AI 수 (없으면 서버 기본값)")
+    parser.add_argument('--url', help="이미 실행 중인 서버 주소 (없으면 mock LLM 서버를 직접 띄움)")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--latency', default='fixed:50', help="MOCK_LLM_LATENCY (직접 띄울 때)")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--out', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = spawn_server(args.port, {'MOCK_LLM_LATENCY': args.latency})
+
+    rss_before = rss_bytes(process.pid) if process else None
+    rss_peak = rss_before
+    recorder = Recorder()
+    threads = [
+        threading.Thread(target=run_pair, args=(i, url, recorder, args.timeout, args.citizens, args.ais), daemon=True)
+        for i in range(args.pairs)
+    ]
+
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        if process:
+            rss = rss_bytes(process.pid)
+            if rss and (rss_peak is None or rss > rss_peak):
+                rss_peak = rss
+        time.sleep(0.05)
+    elapsed = time.monotonic() - started
+
+    if process:
+        process.terminate()
+        process.wait(timeout=10)
+
+    result = summarize(recorder, elapsed, args.pairs, rss_before, rss_peak)
+    result.update(citizens=args.citizens, ai_players=args.ais)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
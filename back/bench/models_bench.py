@@ -0,0 +1,179 @@
+"""
+방 데이터 모델 벤치마크: 기존 dict 그래프 vs models.Room (슬롯 데이터클래스)
+
+방 하나에 메시지 N개를 채운 뒤
+  - 방 하나당 메모리 (tracemalloc, 방 R개 평균)
+  - 전체 스냅샷('roomState') 직렬화 시간 (json / orjson)
+  - 메시지 하나 생성 시간 (isoformat 문자열 2개 vs epoch ms 정수)
+을 비교합니다. server_path는 변경 전/후 서버가 실제로 쓰는 조합(dict+json → model+wire_json)입니다.
+
+    cd back
+    python bench/models_bench.py --rooms 500 --messages 50 --out models_bench.json
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Room, Player, Seat, Message, orjson, wire_json  # noqa: E402
+
+PHASES = ['1차 진술', '1차 토론', '2차 진술', '2차 토론', '투표']
+PERSONALITY = "매우 논리적이고 분석적이며, 발언의 모순점을 지적하는 성격"
+TEXT = "음, 어릴 때 기억이 떠오르네요. 그건 주말에 자주 보게 되는 것 같아요."
+
+
+def make_dict_room(index, message_count):
+    # 변경 전 api.py가 만들던 방 dict 모양 그대로
+    messages = []
+    for i in range(message_count):
+        messages.append({
+            'id': f"msg_{datetime.now().isoformat()}_{1000 + i}",
+            'sender': f"ai_{i % 4 + 1}",
+            'sender_type': 'ai',
+            'sender_name': f"동물 {i % 4}",
+            'text': f"{TEXT} {i}",
+            'timestamp': datetime.now().isoformat(),
+        })
+    return {
+        "id": f"R{index:05d}",
+        "topic": "음식",
+        "liar_word": "사과",
+        "citizen_word": "바나나",
+        "operator_id": f"op-{index}",
+        "operator_sid": f"sid-op-{index}",
+        "operator_name": "날랜 사자",
+        "user_id": f"user-{index}",
+        "user_sid": f"sid-user-{index}",
+        "user_name": "교활한 여우",
+        "ai_players": [
+            {"id": f"ai_{i+1}", "name": f"동물 {i}", "isLiar": False, "personality": PERSONALITY}
+            for i in range(4)
+        ],
+        "messages": messages,
+        "message_count": message_count,
+        "seq": 0,
+        "phase": 2,
+        "turn": "user",
+        "discussion_turns": 0,
+        "ai_answers": [],
+        "votes": {},
+        "phases_config": PHASES,
+        "available_names": ["느긋한 하마", "줄무늬 얼룩말", "강철 코뿔소"],
+    }
+
+
+def make_dict_message(i):
+    return {
+        'id': f"msg_{datetime.now().isoformat()}_{1000 + i}",
+        'sender': 'ai_1',
+        'sender_type': 'ai',
+        'sender_name': '동물 1',
+        'text': TEXT,
+        'timestamp': datetime.now().isoformat(),
+    }
+
+
+def dict_snapshot(room):
+    return {k: v for k, v in room.items() if not k.startswith('_')}
+
+
+def make_model_room(index, message_count):
+    room = Room(
+        id=f"R{index:05d}",
+        topic="음식",
+        liar_word="사과",
+        citizen_word="바나나",
+        operator_id=f"op-{index}",
+        ai_players=[Player(f"ai_{i+1}", f"동물 {i}", PERSONALITY) for i in range(4)],
+        phases_config=PHASES,
+        available_names=["느긋한 하마", "줄무늬 얼룩말", "강철 코뿔소"],
+        phase=2,
+    )
+    for seat in (Seat(f"op-{index}", "날랜 사자", f"sid-op-{index}"), Seat(f"user-{index}", "교활한 여우", f"sid-user-{index}")):
+        room.add_seat(seat)
+    for i in range(message_count):
+        message = Message.create(f"ai_{i % 4 + 1}", f"동물 {i % 4}", f"{TEXT} {i}", 'ai')
+        message.id = i
+        room.messages.append(message)
+    room.message_count = message_count
+    return room
+
+
+def memory_per_room(factory, rooms, message_count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [factory(i, message_count) for i in range(rooms)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del kept
+    return total / rooms
+
+
+def time_per_call(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Room model memory / serialization benchmark")
+    parser.add_argument('--rooms', type=int, default=500)
+    parser.add_argument('--messages', type=int, default=50, help="방 하나당 메시지 수 (message_log 창 크기)")
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--out', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    dict_room = make_dict_room(0, args.messages)
+    model_room = make_model_room(0, args.messages)
+
+    def encode_json(payload):
+        return json.dumps(payload, separators=(',', ':'))
+
+    serialize = {
+        'dict+json': time_per_call(lambda: encode_json(dict_snapshot(dict_room)), args.repeat),
+        'model+json': time_per_call(lambda: encode_json(model_room.to_wire()), args.repeat),
+    }
+    sizes = {
+        'dict': len(encode_json(dict_snapshot(dict_room)).encode('utf-8')),
+        'model': len(encode_json(model_room.to_wire()).encode('utf-8')),
+    }
+    serialize['server_path_before'] = serialize['dict+json']
+    serialize['server_path_after'] = time_per_call(lambda: wire_json.dumps(model_room.to_wire()), args.repeat)
+    if orjson is not None:
+        serialize['dict+orjson'] = time_per_call(lambda: orjson.dumps(dict_snapshot(dict_room)), args.repeat)
+        serialize['model+orjson'] = time_per_call(lambda: orjson.dumps(model_room.to_wire()), args.repeat)
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'rooms': args.rooms,
+        'messages_per_room': args.messages,
+        'memory_per_room_bytes': {
+            'dict': memory_per_room(make_dict_room, args.rooms, args.messages),
+            'model': memory_per_room(make_model_room, args.rooms, args.messages),
+        },
+        'snapshot_bytes': sizes,
+        'snapshot_serialize_us': {name: seconds * 1e6 for name, seconds in serialize.items()},
+        'message_create_us': {
+            'dict': time_per_call(lambda: make_dict_message(1), args.repeat * 10) * 1e6,
+            'model': time_per_call(lambda: Message.create('ai_1', '동물 1', TEXT, 'ai'), args.repeat * 10) * 1e6,
+        },
+        'orjson': orjson is not None,
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+기록된 게임 리플레이 (성능 회귀 테스트)
+
+이벤트 저널(JOURNAL_DIR, JOURNAL_RETAIN=1로 보관된 세그먼트 포함)에서 게임마다 방 인원(시민/AI 수)과 사람(시민들/운영자)이 보낸 메시지 순서를 꺼내,
+mock LLM 서버를 직접 띄우고 같은 순서로 다시 보냅니다. LLM 지연/시드와 GAME_SEED를 고정하므로
+같은 기록 + 같은 코드면 같은 부하가 걸리고, 결과 JSON은 loadtest.py와 같은 형식입니다.
+
+    cd back
+    python bench/replay.py --journal journal --out replay_results.json
+    python bench/replay.py --journal journal --repeat 5 --compare replay_baseline.json --tolerance 0.2
+
+--compare를 주면 기준 결과보다 p95 지연이 tolerance 이상 나빠졌을 때 종료 코드 1로 끝납니다.
+
+필요 패키지: python-socketio[client]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from journal import read_all_events  # noqa: E402
+from loadtest import Recorder, close_clients, open_room, rss_bytes, speaker, spawn_server, summarize  # noqa: E402
+
+HUMAN_ROLES = ('user', 'operator')
+
+
+def load_games(directory, min_messages=2):
+    # 방 ID -> {'citizens': 시민 수, 'ai_players': AI 수, 'script': [(역할, 보낸 사람 ID, 텍스트), ...] (기록 순서)}
+    games = {}
+    for event in read_all_events(directory):
+        if event['type'] == 'room_created':
+            games[event['room']] = {'ai_players': len(event['fields'].get('ai_players', ())) or None, 'script': []}
+        game = games.get(event['room'])
+        if game is None:
+            continue
+        for message in event['messages']:
+            if message.get('sender_type') in HUMAN_ROLES:
+                game['script'].append((message['sender_type'], message['sender'], message['text']))
+    for game in games.values():
+        # 시민은 처음 발언한 순서 = 입장 순서 (페이즈마다 입장 순서대로 발언)
+        game['citizens'] = list(dict.fromkeys(sender for role, sender, _ in game['script'] if role == 'user'))
+    return {room_id: game for room_id, game in games.items() if len(game['script']) >= min_messages}
+
+
+def replay_game(index, game, url, recorder, timeout):
+    operator, participants = None, []
+    try:
+        operator, participants, room_id = open_room(
+            index, url, recorder, timeout, prefix="replay",
+            citizens=max(1, len(game['citizens'])), ai_players=game['ai_players'],
+        )
+        # 기록의 시민 ID -> 같은 순서로 입장한 재생 클라이언트
+        clients = dict(zip(game['citizens'], participants))
+
+        phase = operator.state['phase']
+        for step, (role, sender, text) in enumerate(game['script']):
+            if role == 'user':
+                participant = clients[sender]
+                current_phase = phase
+                if not operator.wait_for(lambda s: s.get('phase') == current_phase and speaker(s) == participant.user_id, timeout):
+                    raise TimeoutError(f"user turn {step}")
+                # 기록에는 같은 문장이 여러 번 나올 수 있으므로 개수로 비교
+                seen = sum(m.get('text') == text for m in operator.state['messages'])
+                started = time.monotonic()
+                participant.emit('send_message', {'roomId': room_id, 'userId': participant.user_id, 'text': text})
+                if not operator.wait_for(lambda s: sum(m.get('text') == text for m in s['messages']) > seen, timeout):
+                    raise TimeoutError(f"user message {step}")
+                recorder.latency('user', time.monotonic() - started)
+            else:
+                if not operator.wait_for(lambda s: speaker(s) == operator.user_id, timeout):
+                    raise TimeoutError(f"operator turn {step}")
+                current_phase = phase
+                started = time.monotonic()
+                operator.emit('send_message', {'roomId': room_id, 'userId': operator.user_id, 'text': text})
+                if not operator.wait_for(lambda s: s.get('phase', 0) > current_phase, timeout):
+                    raise TimeoutError(f"reveal {step}")
+                recorder.latency('operator', time.monotonic() - started)
+                phase += 1
+
+        with recorder.lock:
+            recorder.completed_pairs += 1
+    except Exception as e:
+        recorder.error(f"game {index}: {e!r}")
+    finally:
+        close_clients(*participants, operator)
+
+
+def regressions(result, baseline, tolerance):
+    failed = []
+    for key in ('room_update_latency', 'user_message_latency', 'operator_reveal_latency'):
+        before = (baseline.get(key) or {}).get('p95_ms')
+        after = (result.get(key) or {}).get('p95_ms')
+        if before and after and after > before * (1 + tolerance):
+            failed.append(f"{key}.p95_ms {before:.1f} -> {after:.1f}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Liar Game sessions")
+    parser.add_argument('--journal', default='journal', help="JOURNAL_DIR (archive/ 포함)")
+    parser.add_argument('--url', help="이미 실행 중인 서버 주소 (없으면 mock LLM 서버를 직접 띄움)")
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--latency', default='fixed:50', help="MOCK_LLM_LATENCY (직접 띄울 때)")
+    parser.add_argument('--seed', type=int, default=0, help="GAME_SEED / MOCK_LLM_SEED")
+    parser.add_argument('--repeat', type=int, default=1, help="기록된 게임들을 몇 번 겹쳐서 동시에 재생할지")
+    parser.add_argument('--limit', type=int, help="재생할 게임 수 상한")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--out', help="결과 JSON 경로")
+    parser.add_argument('--compare', help="기준 결과 JSON (p95 회귀 검사)")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    games = list(load_games(args.journal).values())[:args.limit]
+    if not games:
+        print(f"No recorded games in {args.journal}")
+        sys.exit(2)
+    scripts = games * args.repeat
+
+    process = None
+    url = args.url
+    if url is None:
+        # 재생 중인 서버의 저널은 임시 디렉터리로 (입력 기록과 섞이지 않도록)
+        process, url = spawn_server(args.port, {
+            'MOCK_LLM_LATENCY': args.latency,
+            'MOCK_LLM_SEED': str(args.seed),
+            'GAME_SEED': str(args.seed),
+            'JOURNAL_DIR': tempfile.mkdtemp(prefix="replay-journal-"),
+        })
+
+    rss_before = rss_bytes(process.pid) if process else None
+    rss_peak = rss_before
+    recorder = Recorder()
+    threads = [
+        threading.Thread(target=replay_game, args=(i, game, url, recorder, args.timeout), daemon=True)
+        for i, game in enumerate(scripts)
+    ]
+
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        if process:
+            rss = rss_bytes(process.pid)
+            if rss and (rss_peak is None or rss > rss_peak):
+                rss_peak = rss
+        time.sleep(0.05)
+    elapsed = time.monotonic() - started
+
+    if process:
+        process.terminate()
+        process.wait(timeout=10)
+
+    result = summarize(recorder, elapsed, len(scripts), rss_before, rss_peak)
+    result['games'] = len(games)
+    result['replayed_messages'] = sum(len(game['script']) for game in scripts)
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            failed = regressions(result, json.load(f), args.tolerance)
+        result['regressions'] = failed
+        exit_code = 1 if failed else 0
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
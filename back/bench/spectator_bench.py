@@ -0,0 +1,258 @@
+"""
+관전 방송 벤치마크
+
+1) micro: 방 하나에 관전자 V명을 붙이고 업데이트(메시지 + 차례 넘기기) U번을 흘리며
+     - per_viewer : 변경마다 관전자별로 제시어를 뺀 전체 상태를 직렬화 (관전자 수만큼 인코딩)
+     - shared     : SpectatorHub tick=0, 변경마다 공유 패치 하나를 한 번만 인코딩
+     - tick       : SpectatorHub tick>0, tick 한 번에 --burst개씩 모인 변경을 패치 하나로
+   직렬화 시간 / 인코딩한 바이트 / 프레임 수 / 관전자에게 나간 바이트를 비교합니다.
+2) e2e: mock LLM 서버를 띄워 게임 하나에 관전자 S명을 붙이고 끝까지 진행
+     - 참가자 메시지 → 관전자 도착 지연 (SPECTATOR_TICK 포함), 관전자당 받은 프레임 수/바이트
+
+    cd back
+    python bench/spectator_bench.py micro --viewers 1,100,1000,10000 --updates 200
+    python bench/spectator_bench.py e2e --spectators 200 --tick 0.2 --out spectator_bench.json
+
+필요 패키지: python-socketio[client] (e2e)
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from message_log import append_messages, create_message_archive  # noqa: E402
+from models import Room, Player, Seat, Message, now_ms, wire_json  # noqa: E402
+from spectators import SpectatorHub, spectator_fields  # noqa: E402
+from turns import start_turns, advance_turn  # noqa: E402
+
+PHASES = ['1차 진술', '1차 토론', '2차 진술', '2차 토론', '투표']
+TEXT = "음, 어릴 때 기억이 떠오르네요. 그건 주말에 자주 보게 되는 것 같아요."
+WINDOW = 50
+archive = create_message_archive("none")
+
+
+def make_room(humans, ai_players):
+    room = Room(
+        id="SPEC01", topic="음식", liar_word="사과", citizen_word="바나나", operator_id="op",
+        ai_players=[Player(f"ai_{i}", f"동물 {i}", "성격") for i in range(1, ai_players + 1)],
+        phases_config=PHASES, available_names=[], max_humans=humans,
+    )
+    room.add_seat(Seat("op", "북극곰"))
+    for i in range(1, humans):
+        room.add_seat(Seat(f"user-{i}", f"판다 {i}"))
+    start_turns(room)
+    append_messages(room, [Message.system("--- 게임 시작 ---")], archive, WINDOW)
+    return room
+
+
+def update(room, i):
+    # 참가자 발언 하나 (메시지 + 차례 넘기기). 운영자 차례까지 가면 다음 페이즈처럼 처음부터
+    speaker = room.turn_order[room.turn_index]
+    append_messages(room, [Message.create(speaker, room.player_name(speaker), f"{TEXT} {i}", 'user')], archive, WINDOW)
+    if advance_turn(room) is None or room.turn_index == len(room.turn_order) - 1:
+        start_turns(room)
+    room.updated_at = now_ms()
+
+
+class Counter:
+    def __init__(self, viewers):
+        self.viewers = viewers
+        self.frames = 0
+        self.frame_bytes = 0
+
+    def emit(self, event, frame, to):
+        self.frames += 1
+        self.frame_bytes += len(frame)
+
+
+def run_per_viewer(viewers, updates, humans, ai_players):
+    room = make_room(humans, ai_players)
+    encoded = 0
+    started = time.perf_counter()
+    for i in range(updates):
+        update(room, i)
+        for _ in range(viewers):
+            state = spectator_fields(room)
+            state['messages'] = [message.to_wire() for message in room.messages]
+            encoded += len(wire_json.dumpb(state))
+    elapsed = time.perf_counter() - started
+    return {'serialize_s': elapsed, 'encoded_bytes': encoded, 'frames': updates * viewers, 'delivered_bytes': encoded}
+
+
+def run_hub(viewers, updates, humans, ai_players, tick, burst):
+    room = make_room(humans, ai_players)
+    counter = Counter(viewers)
+    hub = SpectatorHub(lambda room_id: room, counter.emit, lambda name: None, tick=tick)
+    hub._started = True # 백그라운드 tick 대신 flush_due()를 직접 호출
+    for v in range(viewers):
+        hub.join(f"viewer-{v}", room)
+    started = time.perf_counter()
+    for i in range(updates):
+        update(room, i)
+        hub.changed(room)
+        if tick > 0 and (i + 1) % burst == 0:
+            hub.flush_due()
+    hub.flush_due()
+    elapsed = time.perf_counter() - started
+    return {
+        'serialize_s': elapsed,
+        'encoded_bytes': counter.frame_bytes,
+        'frames': counter.frames,
+        'delivered_bytes': counter.frame_bytes * viewers,
+        'coalesced': hub.stats['coalesced'],
+    }
+
+
+def run_micro(args):
+    results = []
+    for viewers in (int(v) for v in args.viewers.split(',')):
+        row = {'viewers': viewers, 'updates': args.updates}
+        # 관전자별 직렬화는 관전자 수에 비례하므로 너무 크면 건너뜀
+        if viewers * args.updates <= args.max_per_viewer_encodes:
+            row['per_viewer'] = run_per_viewer(viewers, args.updates, args.humans, args.ais)
+        row['shared'] = run_hub(viewers, args.updates, args.humans, args.ais, 0, 1)
+        row['tick'] = run_hub(viewers, args.updates, args.humans, args.ais, args.tick, args.burst)
+        results.append(row)
+    return results
+
+
+class Spectator:
+    """spectatorState / spectatorPatch (UTF-8 JSON bytes)를 받아 메시지 도착 시각을 기록"""
+
+    def __init__(self, url, room_id, recorder):
+        import socketio
+
+        self.recorder = recorder
+        self.seen = {}
+        self.ready = threading.Event()
+        self.sio = socketio.Client(reconnection=False)
+
+        @self.sio.on('spectatorState')
+        def on_state(frame):
+            self.received(frame, json.loads(frame)['messages'])
+            self.ready.set()
+
+        @self.sio.on('spectatorPatch')
+        def on_patch(frame):
+            self.received(frame, json.loads(frame)['messages'])
+
+        self.sio.connect(url, transports=['websocket'])
+        self.sio.emit('spectate', {'roomId': room_id})
+
+    def received(self, frame, messages):
+        arrived = time.monotonic()
+        with self.recorder.lock:
+            self.recorder.spectator_frames += 1
+            self.recorder.spectator_bytes += len(frame)
+            if b'liar_word' in frame or b'citizen_word' in frame:
+                self.recorder.leaks += 1
+        for message in messages:
+            self.seen.setdefault(message['text'], arrived)
+
+    def close(self):
+        self.sio.disconnect()
+
+
+def run_e2e(args):
+    from loadtest import TURN_PHASES, Recorder, close_clients, open_room, percentile, spawn_server, speaker
+
+    process, url = spawn_server(args.port, {'MOCK_LLM_LATENCY': args.latency, 'SPECTATOR_TICK': str(args.tick)})
+    recorder = Recorder()
+    recorder.spectator_frames = recorder.spectator_bytes = recorder.leaks = 0
+    operator, participants, spectators = None, [], []
+    sent = {}
+    try:
+        operator, participants, room_id = open_room(0, url, recorder, args.timeout, prefix="spec", citizens=args.citizens)
+        spectators = [Spectator(url, room_id, recorder) for _ in range(args.spectators)]
+        for spectator in spectators:
+            if not spectator.ready.wait(args.timeout):
+                raise TimeoutError("spectate")
+
+        # 발언 순서대로 게임 끝까지 (loadtest.play_turns와 같은 흐름 + 보낸 시각 기록)
+        by_id = {p.user_id: p for p in participants}
+        by_id[operator.user_id] = operator
+        first_phase = operator.state['phase']
+        for turn in range(TURN_PHASES):
+            phase = first_phase + turn
+            for _ in range(len(participants) + 1):
+                if not operator.wait_for(lambda s: s.get('phase') == phase and speaker(s) in by_id, args.timeout):
+                    raise TimeoutError(f"turn {turn}")
+                client = by_id[speaker(operator.state)]
+                text = f"spec-{turn}-{client.user_id}"
+                sent[text] = time.monotonic()
+                client.emit('send_message', {'roomId': room_id, 'userId': client.user_id, 'text': text})
+                if client is operator:
+                    break
+                if not operator.wait_for(lambda s: any(m.get('text') == text for m in s['messages']), args.timeout):
+                    raise TimeoutError(f"message {turn}")
+            if not operator.wait_for(lambda s: s.get('phase', 0) > phase, args.timeout):
+                raise TimeoutError(f"reveal {turn}")
+        time.sleep(max(0.5, args.tick * 3)) # 마지막 tick까지 받기
+    except Exception as e:
+        recorder.error(f"e2e: {e!r}")
+    finally:
+        close_clients(*spectators, *participants, operator)
+        process.terminate()
+        process.wait(timeout=10)
+
+    latencies = [
+        spectator.seen[text] - started
+        for spectator in spectators for text, started in sent.items() if text in spectator.seen
+    ]
+    expected = len(sent) * len(spectators)
+
+    def ms(value):
+        return value and value * 1000
+
+    return {
+        'spectators': args.spectators,
+        'tick': args.tick,
+        'messages': len(sent),
+        'delivered': f"{len(latencies)}/{expected}",
+        'latency_p50_ms': ms(percentile(latencies, 50)),
+        'latency_p95_ms': ms(percentile(latencies, 95)),
+        'latency_p99_ms': ms(percentile(latencies, 99)),
+        'frames_per_spectator': recorder.spectator_frames / max(1, len(spectators)),
+        'bytes_per_frame': recorder.spectator_bytes / max(1, recorder.spectator_frames),
+        'secret_leaks': recorder.leaks,
+        'errors': recorder.errors[:20],
+        'error_count': len(recorder.errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spectator broadcast benchmark")
+    sub = parser.add_subparsers(dest='mode', required=True)
+    micro = sub.add_parser('micro')
+    micro.add_argument('--viewers', default='1,100,1000,10000', help="관전자 수 (쉼표로 구분)")
+    micro.add_argument('--updates', type=int, default=200)
+    micro.add_argument('--burst', type=int, default=5, help="tick 한 번 사이에 들어오는 변경 수")
+    micro.add_argument('--humans', type=int, default=4)
+    micro.add_argument('--ais', type=int, default=4)
+    micro.add_argument('--max-per-viewer-encodes', type=int, default=2_000_000)
+    e2e = sub.add_parser('e2e')
+    e2e.add_argument('--spectators', type=int, default=200)
+    e2e.add_argument('--citizens', type=int, default=2)
+    e2e.add_argument('--port', type=int, default=5059)
+    e2e.add_argument('--latency', default='fixed:50', help="MOCK_LLM_LATENCY")
+    e2e.add_argument('--timeout', type=float, default=60.0)
+    for p in (micro, e2e):
+        p.add_argument('--tick', type=float, default=0.2, help="SPECTATOR_TICK")
+        p.add_argument('--out', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    result = run_micro(args) if args.mode == 'micro' else run_e2e(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
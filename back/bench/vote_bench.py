@@ -0,0 +1,193 @@
+"""
+투표 벤치마크
+
+1) micro: 방 R개에서 표를 V개씩 넣으며
+     - 표 하나 반영 시간: voting.cast_vote (득표 수 ±1) vs 매번 전체 다시 세기
+     - 표 하나당 전송 크기: 'voteUpdate' vs 방 전체 스냅샷('roomState')
+2) e2e: mock LLM 서버를 띄워 게임 N개를 투표 단계까지 진행한 뒤, 모든 방에서 동시에 투표
+     - 참가자 표 → 'voteUpdate' 도착 지연, 운영자 표(마지막 표) → 결과 패치 도착 지연
+     - 이벤트별 전송 크기
+
+    cd back
+    python bench/vote_bench.py micro --rooms 2000 --votes 20
+    python bench/vote_bench.py e2e --pairs 50 --out vote_bench.json
+
+필요 패키지: python-socketio[client] (e2e)
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import Room, Player, Seat, wire_json  # noqa: E402
+from voting import cast_vote, start_vote, vote_update, voter_names  # noqa: E402
+
+PHASES = ['1차 진술', '1차 토론', '2차 진술', '2차 토론', '투표']
+
+
+def make_room(index):
+    room = Room(
+        id=f"R{index:05d}", topic="음식", liar_word="사과", citizen_word="바나나",
+        operator_id=f"op-{index}",
+        ai_players=[Player(f"ai_{i}", f"동물 {i}", "성격") for i in range(1, 5)],
+        phases_config=PHASES, available_names=[], phase=4,
+    )
+    for seat in (Seat(f"op-{index}", "북극곰"), Seat(f"user-{index}", "판다")):
+        room.add_seat(seat)
+    start_vote(room, 0)
+    return room
+
+
+def recount_vote(room, voter, target):
+    # 비교용: 표를 넣을 때마다 전체 다시 세기
+    room.votes[voter] = target
+    room.vote_tally = dict(Counter(room.votes.values()))
+
+
+def run_micro(args):
+    rng = random.Random(0)
+    results = {}
+    for name, apply in (('incremental', lambda room, v, t, names: cast_vote(room, v, t, names)),
+                        ('recount', lambda room, v, t, names: recount_vote(room, v, t))):
+        rooms = [make_room(i) for i in range(args.rooms)]
+        names = [voter_names(room) for room in rooms]
+        ballots = []
+        for i, room in enumerate(rooms):
+            ids = list(names[i])
+            for _ in range(args.votes):
+                voter = rng.choice(ids)
+                ballots.append((i, voter, rng.choice([t for t in ids if t != voter])))
+        started = time.perf_counter()
+        for i, voter, target in ballots:
+            apply(rooms[i], voter, target, names[i])
+        elapsed = time.perf_counter() - started
+        results[name] = {'votes': len(ballots), 'us_per_vote': elapsed / len(ballots) * 1e6}
+
+    room = rooms[0]
+    results['bytes_per_vote'] = {
+        'voteUpdate': len(wire_json.dumps(vote_update(room, {room.citizens()[0].id: room.operator_id}))),
+        'roomState': len(wire_json.dumps(room.to_wire())),
+    }
+    return results
+
+
+def vote_game(index, url, recorder, timeout, latencies):
+    from loadtest import close_clients, open_room, play_turns
+
+    operator, participants = None, []
+    updates = []
+    try:
+        operator, participants, room_id = open_room(index, url, recorder, timeout, prefix="vote")
+        participant = participants[0]
+        arrived = threading.Event()
+
+        def on_vote_update(data):
+            recorder.event('voteUpdate', data, True)
+            updates.append(data)
+            if participant.user_id in data['votes']:
+                arrived.set()
+        operator.sio.on('voteUpdate', on_vote_update)
+
+        play_turns(index, operator, participants, room_id, recorder, timeout)
+        if not operator.wait_for(lambda s: s.get('turn') == 'voting', timeout):
+            raise TimeoutError("voting")
+        # AI 표가 먼저 들어오도록 잠깐 기다림 (참가자/운영자 표가 마지막)
+        deadline = time.monotonic() + timeout
+        while not updates and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started = time.monotonic()
+        participant.emit('cast_vote', {'roomId': room_id, 'userId': participant.user_id, 'target': operator.user_id})
+        if not arrived.wait(timeout):
+            raise TimeoutError("voteUpdate")
+        latencies['vote_update'].append(time.monotonic() - started)
+
+        started = time.monotonic()
+        operator.emit('cast_vote', {'roomId': room_id, 'userId': operator.user_id, 'target': participant.user_id})
+        if not operator.wait_for(lambda s: s.get('turn') == 'ended', timeout):
+            raise TimeoutError("vote result")
+        latencies['vote_close'].append(time.monotonic() - started)
+        with recorder.lock:
+            recorder.completed_pairs += 1
+    except Exception as e:
+        recorder.error(f"game {index}: {e!r}")
+    finally:
+        close_clients(*participants, operator)
+
+
+def run_e2e(args):
+    from loadtest import Recorder, percentile, spawn_server
+
+    process, url = spawn_server(args.port, {'MOCK_LLM_LATENCY': args.latency, 'VOTE_TIMEOUT': str(args.vote_timeout)})
+    recorder = Recorder()
+    latencies = {'vote_update': [], 'vote_close': []}
+    try:
+        threads = [
+            threading.Thread(target=vote_game, args=(i, url, recorder, args.timeout, latencies), daemon=True)
+            for i in range(args.pairs)
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    def summary(values):
+        return {
+            'count': len(values),
+            'p50_ms': percentile(values, 50) and percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) and percentile(values, 95) * 1000,
+        }
+
+    return {
+        'pairs': args.pairs,
+        'completed_pairs': recorder.completed_pairs,
+        'elapsed_s': elapsed,
+        'vote_update_latency': summary(latencies['vote_update']),
+        'vote_close_latency': summary(latencies['vote_close']),
+        'bytes_per_event': {
+            name: {'count': len(sizes), 'mean': sum(sizes) / len(sizes), 'max': max(sizes)}
+            for name, sizes in recorder.bytes_by_event.items()
+        },
+        'errors': recorder.errors[:20],
+        'error_count': len(recorder.errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voting benchmark")
+    sub = parser.add_subparsers(dest='mode', required=True)
+    micro = sub.add_parser('micro')
+    micro.add_argument('--rooms', type=int, default=2000)
+    micro.add_argument('--votes', type=int, default=20, help="방마다 넣을 표 수 (다시 투표 포함)")
+    e2e = sub.add_parser('e2e')
+    e2e.add_argument('--pairs', type=int, default=50)
+    e2e.add_argument('--port', type=int, default=5058)
+    e2e.add_argument('--latency', default='fixed:50', help="MOCK_LLM_LATENCY")
+    e2e.add_argument('--vote-timeout', type=float, default=120.0)
+    e2e.add_argument('--timeout', type=float, default=60.0)
+    for p in (micro, e2e):
+        p.add_argument('--out', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    result = run_micro(args) if args.mode == 'micro' else run_e2e(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+제시어 뱅크 벤치마크: 기존 categories dict 방식 vs word_bank.WordBank
+
+주제 T개 × 주제당 단어 W개짜리 가상 데이터를 만들어 크기별로
+  - 색인 생성 시간 / 메모리 (tracemalloc)
+  - 방 하나 만들 때 단어 짝 뽑기 시간 (난이도별, 최근 짝 피하기 포함)
+을 잽니다. 뽑기 시간이 데이터 크기와 관계없이 평평하면 정상입니다.
+
+    cd back
+    python bench/word_bank_bench.py --sizes 100,10000,100000 --picks 20000 --out word_bank_bench.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_bank import DIFFICULTIES, WordBank  # noqa: E402
+
+TAGS_PER_TOPIC = 50
+
+
+def make_entries(total_words, topics):
+    rng = random.Random(0)
+    per_topic = max(2, total_words // topics)
+    entries = []
+    for t in range(topics):
+        for w in range(per_topic):
+            tier = rng.choices((1, 2, 3), weights=(5, 3, 2))[0]
+            tags = tuple(f"tag{rng.randrange(TAGS_PER_TOPIC)}" for _ in range(2))
+            entries.append((f"topic{t}", f"word{t}_{w}", tier, tags))
+    return entries
+
+
+def legacy_pick(categories):
+    # 변경 전 get_game_words()
+    topic = random.choice(list(categories.keys()))
+    words = random.sample(categories[topic], 2)
+    return topic, words[0], words[1]
+
+
+def time_per_call(fn, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def bench_size(total_words, topics, picks, recent_size):
+    entries = make_entries(total_words, topics)
+
+    categories = {}
+    for topic, word, _, _ in entries:
+        categories.setdefault(topic, []).append(word)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    bank = WordBank(entries, recent_size=recent_size)
+    build_s = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    result = {
+        'words': len(bank),
+        'topics': len(bank.topics),
+        'build_s': build_s,
+        'index_bytes': memory,
+        'legacy_pick_us': time_per_call(lambda: legacy_pick(categories), picks),
+    }
+    for difficulty in DIFFICULTIES:
+        result[f'{difficulty}_pick_us'] = time_per_call(lambda: bank.pick(difficulty), picks)
+    result['stats'] = bank.snapshot()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Word bank benchmark")
+    parser.add_argument('--sizes', default='100,10000,100000', help="전체 단어 수 (쉼표로 구분)")
+    parser.add_argument('--topics', type=int, default=40)
+    parser.add_argument('--picks', type=int, default=20000)
+    parser.add_argument('--recent', type=int, default=256)
+    parser.add_argument('--out', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = [
+        bench_size(int(size), min(args.topics, max(1, int(size) // 10)), args.picks, args.recent)
+        for size in args.sizes.split(',')
+    ]
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
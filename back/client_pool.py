@@ -0,0 +1,363 @@
+import re
+import time
+from collections import deque
+
+import eventlet
+from eventlet.queue import LightQueue, Empty
+
+from ai_scheduler import AIQueueFull, AICancelled
+
+
+# ---------------------
+# LLM 클라이언트 풀 (상태 추적 / 헤지 요청 / 서킷 브레이커)
+# ---------------------
+# AI 플레이어 i를 clients[i]에 고정하지 않고, 요청마다 가장 상태가 좋은 키로 보냅니다.
+# - 키마다 최근 지연(EWMA, p95), 오류율, 연속 실패 수, 레이트 리밋 헤더(남은 요청 수, 리셋 시각)를 기록
+# - 점수 = 예상 지연 x (1 + 진행 중 요청 / 키별 동시 호출 수) / (1 - 오류율) → 가장 낮은 키 선택
+# - 호출이 그 키의 p95를 넘기면 다른 키로 한 번 더 보내(헤지) 먼저 끝난 답을 사용
+# - 실패하면 아직 안 써 본 키로 재시도 (failover)
+# - 연속 실패/오류율이 기준을 넘으면 서킷을 열어 cooldown 동안 제외 → 이후 요청 하나로 시험(half-open)
+# - 쓸 수 있는 키가 없거나 모두 실패하면 로컬 대체 클라이언트(fallback)로 답변
+#
+# 실제 호출은 AIScheduler의 키별 대기열/워커에서 실행되므로 키별 동시 호출 상한은 그대로 지켜집니다.
+#
+#   pool = ClientPool(clients, ai_scheduler, fallback=MockLLMClient())
+#   answer = pool.run(lambda index, client, should_stop: ...)
+#   # index: 키 번호 (대체 클라이언트는 -1), should_stop(): 다른 시도가 이미 끝났거나 작업이 취소됨
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+_DURATION_PART = re.compile(r"([\d.]+)(ms|s|m|h)")
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_duration(value):
+    # "20ms", "1s", "6m0s", "0.5" → 초 (해석 불가면 None)
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _error_status(error):
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+
+def _error_headers(error):
+    return getattr(getattr(error, 'response', None), 'headers', None)
+
+
+def create_completion(client, **kwargs):
+    # OpenAI SDK면 응답 헤더(레이트 리밋)도 함께 받음 → (응답, 헤더 또는 None)
+    raw_api = getattr(client.chat.completions, 'with_raw_response', None)
+    if raw_api is None:
+        return client.chat.completions.create(**kwargs), None
+    raw = raw_api.create(**kwargs)
+    return raw.parse(), raw.headers
+
+
+class ClientHealth:
+    __slots__ = (
+        'latencies', 'outcomes', 'ewma', 'consecutive_failures', 'state', 'opened_at', 'probing',
+        'blocked_until', 'remaining_requests', 'remaining_tokens', 'in_flight', 'stats',
+    )
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window) # 성공한 호출의 실행 시간 (초)
+        self.outcomes = deque(maxlen=window) # True: 성공 / False: 실패
+        self.ewma = None
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False # half-open 시험 요청 진행 중
+        self.blocked_until = 0.0 # 레이트 리밋 (429 / 남은 요청 0) 해제 시각
+        self.remaining_requests = None
+        self.remaining_tokens = None
+        self.in_flight = 0 # 이 풀이 보낸 요청 중 대기 + 실행 중
+        self.stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'rate_limited': 0, 'circuit_opened': 0}
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def p95(self):
+        return percentile(self.latencies, 0.95)
+
+
+class ClientPool:
+    def __init__(self, clients, scheduler, fallback=None, window=100, ewma_alpha=0.2,
+                 hedge_delay=2.0, hedge_min_delay=0.2, hedge_min_samples=10, max_hedges=1,
+                 failure_threshold=5, error_rate_threshold=0.5, cooldown=30.0, rate_limit_backoff=5.0):
+        self.clients = clients
+        self.scheduler = scheduler
+        self.fallback = fallback
+        self.ewma_alpha = ewma_alpha
+        self.hedge_delay_default = hedge_delay # p95를 계산할 표본이 모이기 전 헤지 대기 시간
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.max_hedges = max_hedges
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown = cooldown
+        self.rate_limit_backoff = rate_limit_backoff
+        self._health = [ClientHealth(window) for _ in clients]
+        self.stats = {'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'failovers': 0, 'fallbacks': 0, 'queue_full': 0}
+
+    # --- 키 선택 ---
+    def _available(self, index, now):
+        health = self._health[index]
+        if health.blocked_until > now:
+            return False
+        if health.state == OPEN:
+            if now - health.opened_at < self.cooldown:
+                return False
+            health.state = HALF_OPEN
+        if health.state == HALF_OPEN:
+            return not health.probing
+        return True
+
+    def _score(self, index):
+        health = self._health[index]
+        # 아직 호출해 본 적 없는 키는 0 → 한 번씩은 먼저 써 봄
+        latency = health.ewma if health.ewma is not None else 0.0
+        load = 1.0 + health.in_flight / max(1, self.scheduler.concurrency_per_client)
+        return latency * load / max(0.1, 1.0 - health.error_rate()), health.in_flight
+
+    def rank(self, exclude=()):
+        now = time.monotonic()
+        candidates = [i for i in range(len(self.clients)) if i not in exclude and self._available(i, now)]
+        return sorted(candidates, key=self._score)
+
+    def hedge_delay(self, index):
+        # 그 키의 p95 → 표본이 부족하면 모든 키를 합친 p95 → 그것도 없으면 기본값
+        latencies = self._health[index].latencies
+        if len(latencies) < self.hedge_min_samples:
+            latencies = [latency for health in self._health for latency in health.latencies]
+        if len(latencies) < self.hedge_min_samples:
+            return self.hedge_delay_default
+        return max(self.hedge_min_delay, percentile(latencies, 0.95))
+
+    # --- 상태 기록 ---
+    def observe_headers(self, index, headers):
+        if index < 0 or not headers:
+            return
+        health = self._health[index]
+        remaining = headers.get('x-ratelimit-remaining-requests')
+        if remaining is not None:
+            health.remaining_requests = int(remaining)
+            if health.remaining_requests <= 0:
+                reset = parse_duration(headers.get('x-ratelimit-reset-requests'))
+                health.blocked_until = time.monotonic() + (reset if reset is not None else self.rate_limit_backoff)
+        remaining_tokens = headers.get('x-ratelimit-remaining-tokens')
+        if remaining_tokens is not None:
+            health.remaining_tokens = int(remaining_tokens)
+
+    def _record_success(self, index, latency):
+        health = self._health[index]
+        health.stats['succeeded'] += 1
+        health.latencies.append(latency)
+        health.outcomes.append(True)
+        health.ewma = latency if health.ewma is None else health.ewma + self.ewma_alpha * (latency - health.ewma)
+        health.consecutive_failures = 0
+        if health.state != CLOSED:
+            print(f"LLM client {index}: circuit closed")
+        health.state = CLOSED
+
+    def _record_failure(self, index, error):
+        health = self._health[index]
+        if _error_status(error) == 429:
+            # 레이트 리밋은 키 고장이 아니므로 서킷 대신 리셋 시각까지만 제외
+            headers = _error_headers(error) or {}
+            backoff = parse_duration(headers.get('retry-after')) or parse_duration(headers.get('x-ratelimit-reset-requests'))
+            health.blocked_until = time.monotonic() + (backoff or self.rate_limit_backoff)
+            health.stats['rate_limited'] += 1
+            return
+        health.stats['failed'] += 1
+        health.outcomes.append(False)
+        health.consecutive_failures += 1
+        too_many = health.consecutive_failures >= self.failure_threshold
+        too_often = len(health.outcomes) >= self.hedge_min_samples and health.error_rate() >= self.error_rate_threshold
+        if health.state == HALF_OPEN or too_many or too_often:
+            if health.state != OPEN:
+                health.stats['circuit_opened'] += 1
+                print(f"LLM client {index}: circuit opened ({error!r})")
+            health.state = OPEN
+            health.opened_at = time.monotonic()
+
+    # --- 실행 ---
+    def _launch(self, fn, tried, results, stopped):
+        # 아직 안 써 본 키 중 가장 좋은 키로 요청 하나를 보냄 → 키 번호 (보낼 키가 없으면 None)
+        ranked = self.rank(exclude=tried)
+        if not ranked:
+            return None
+        index = ranked[0]
+        tried.add(index)
+        health = self._health[index]
+        health.in_flight += 1
+        health.stats['requests'] += 1
+        if health.state == HALF_OPEN:
+            health.probing = True
+        client = self.clients[index]
+
+        def attempt():
+            started = time.monotonic()
+            result = fn(index, client, stopped)
+            return result, time.monotonic() - started
+
+        try:
+            done = self.scheduler.submit(index, attempt, is_cancelled=stopped)
+        except AIQueueFull as e:
+            self.stats['queue_full'] += 1
+            self._settle(index)
+            results.put((index, None, e))
+            return index
+        eventlet.spawn_n(self._forward, index, done, results)
+        return index
+
+    def _forward(self, index, done, results):
+        # 시도 하나의 결과를 키 상태에 반영 (헤지에서 진 시도도 끝까지 기록) → run()에 전달
+        try:
+            result, latency = done.wait()
+        except AICancelled as e:
+            outcome = (index, None, e)
+        except Exception as e:
+            self._record_failure(index, e)
+            outcome = (index, None, e)
+        else:
+            self._record_success(index, latency)
+            outcome = (index, result, None)
+        self._settle(index)
+        results.put(outcome)
+
+    def _settle(self, index):
+        health = self._health[index]
+        health.in_flight -= 1
+        health.probing = False
+
+    def _record_slow(self, index, elapsed):
+        # 아직 안 끝난 호출이 elapsed초를 넘김 → 최소한 그만큼은 느린 키로 보고 점수에 바로 반영
+        health = self._health[index]
+        health.ewma = max(health.ewma or 0.0, elapsed)
+
+    def run(self, fn, is_cancelled=None):
+        self.stats['requests'] += 1
+        settled = [False]
+
+        def stopped():
+            return settled[0] or (is_cancelled is not None and is_cancelled())
+
+        results = LightQueue()
+        tried = set()
+        current = self._launch(fn, tried, results, stopped)
+        if current is None:
+            return self._run_fallback(fn, stopped, None)
+        pending, hedges, last_error = 1, 0, None
+        hedged_indexes = set()
+        launched_at = time.monotonic()
+        while pending:
+            timeout = None
+            if hedges < self.max_hedges:
+                # 헤지 기준(p95)은 기다리는 동안에도 다른 요청 결과로 바뀌므로 hedge_min_delay마다 다시 계산
+                elapsed = time.monotonic() - launched_at
+                delay = self.hedge_delay(current)
+                timeout = min(max(0.0, delay - elapsed), self.hedge_min_delay)
+            try:
+                index, value, error = results.get(timeout=timeout)
+            except Empty:
+                elapsed = time.monotonic() - launched_at
+                if elapsed < self.hedge_delay(current):
+                    continue
+                # 느린 호출 → 다른 키로 한 번 더 (먼저 끝난 쪽 사용)
+                self._record_slow(current, elapsed)
+                hedges += 1
+                hedged = self._launch(fn, tried, results, stopped)
+                if hedged is not None:
+                    self.stats['hedges'] += 1
+                    hedged_indexes.add(hedged)
+                    pending += 1
+                    current = hedged
+                    launched_at = time.monotonic()
+                continue
+
+            pending -= 1
+            if error is None:
+                settled[0] = True
+                if index in hedged_indexes:
+                    self.stats['hedge_wins'] += 1
+                return value
+            if isinstance(error, AICancelled) or (is_cancelled is not None and is_cancelled()):
+                settled[0] = True
+                raise error if isinstance(error, AICancelled) else AICancelled("job replaced")
+            last_error = error
+            # 다른 시도가 아직 진행 중이어도 바로 다음 키로 (느린 시도를 기다리지 않음)
+            retry = self._launch(fn, tried, results, stopped)
+            if retry is not None:
+                self.stats['failovers'] += 1
+                pending += 1
+                current = retry
+                launched_at = time.monotonic()
+
+        settled[0] = True
+        return self._run_fallback(fn, stopped, last_error)
+
+    def _run_fallback(self, fn, stopped, last_error):
+        if self.fallback is None:
+            raise last_error or RuntimeError("no healthy LLM client")
+        self.stats['fallbacks'] += 1
+        return fn(-1, self.fallback, lambda: False)
+
+    def run_all(self, fns, is_cancelled=None, on_result=None, limit=None):
+        # fns를 동시에 실행 → 같은 순서의 [(result, error), ...]. on_result(i, result, error)는 하나 끝날 때마다
+        # limit: 동시에 실행할 최대 개수 (AI가 많은 방 하나가 공유 대기열을 한꺼번에 채우지 않도록)
+        results = [None] * len(fns)
+
+        def one(i, fn):
+            try:
+                results[i] = (self.run(fn, is_cancelled), None)
+            except Exception as e:
+                results[i] = (None, e)
+            if on_result is not None:
+                on_result(i, *results[i])
+
+        pool = eventlet.GreenPool(max(1, min(limit or len(fns), len(fns))))
+        for i, fn in enumerate(fns):
+            pool.spawn_n(one, i, fn)
+        pool.waitall()
+        return results
+
+    def snapshot(self):
+        now = time.monotonic()
+        clients = []
+        for index, health in enumerate(self._health):
+            p95 = health.p95()
+            clients.append({
+                'client': index,
+                'state': health.state,
+                'ewma_latency': health.ewma,
+                'p95_latency': p95,
+                'error_rate': health.error_rate(),
+                'in_flight': health.in_flight,
+                'rate_limited_for': max(0.0, health.blocked_until - now),
+                'remaining_requests': health.remaining_requests,
+                'remaining_tokens': health.remaining_tokens,
+                **health.stats,
+            })
+        return {'fallback': self.fallback is not None, **self.stats, 'clients': clients}
@@ -0,0 +1,318 @@
+import json
+import os
+import re
+import threading
+import time
+
+import eventlet
+from eventlet import tpool
+
+from models import Room, wire_json, now_ms
+
+
+# ---------------------
+# 게임 이벤트 저널 (크래시 복구 / 기록 분석)
+# ---------------------
+# 방 상태가 바뀔 때마다 "바뀐 필드 + 새 메시지"를 한 줄짜리 이벤트로 추가만 하는 로그입니다.
+# - record()는 메모리 버퍼에 줄을 붙이기만 하고, 전용 green thread가 flush_interval마다
+#   모아서 write + fsync 합니다 (group commit). 따라서 최대 flush_interval 만큼의 이벤트는 유실될 수 있습니다.
+# - 로그는 세그먼트 파일(events-<번호>.jsonl)로 나뉘고, 세그먼트가 커지거나 snapshot_interval이 지나면
+#   새 세그먼트로 넘기면서 살아 있는 모든 방의 스냅샷(snapshot-<번호>.json)을 남기고 이전 세그먼트는 정리합니다.
+#   (retain=True면 지우지 않고 archive/ 로 옮겨 두어 bench/replay.py 같은 오프라인 분석에 씁니다.
+#    archive/는 정리하지 않으므로 기본은 retain=False, 리플레이용 기록을 모을 때만 켭니다)
+# - 시작 시 가장 최근 스냅샷 + 그 뒤 세그먼트를 순서대로 적용해 방을 다시 만듭니다.
+#   방마다 journal_version(이벤트 번호)을 두어, 스냅샷에 이미 반영된 이벤트는 건너뜁니다.
+#
+# 이벤트 한 줄: {'v': 방별 번호, 'room': 방 ID, 'type': 종류, 'ts': epoch ms, 'fields': {...}, 'messages': [...]}
+#   type: room_created | player_joined | player_left | game_started | message | phase_advanced
+#         | vote_cast | vote_closed | ai_answers_committed | state | room_deleted
+# 프로세스 하나(메모리 저장소)를 기준으로 합니다. Redis 저장소는 방 상태가 이미 Redis에 남으므로 쓰지 않습니다.
+
+# 복구에 필요 없는 (프로세스/연결에 묶인) 필드
+TRANSIENT_FIELDS = frozenset({
+    'messages', 'sync', 'ai_job', 'prefetch', 'patch_log', 'updated_at', 'journal_version',
+})
+JOURNAL_FIELDS = tuple(name for name in Room.__slots__ if name not in TRANSIENT_FIELDS)
+
+_SEGMENT = re.compile(r"^events-(\d+)\.jsonl$")
+_SNAPSHOT = re.compile(r"^snapshot-(\d+)\.json$")
+
+
+def _field_value(room, name):
+    if name == 'ai_players':
+        return [player.to_state() for player in room.ai_players]
+    if name == 'humans':
+        return [seat.to_state() for seat in room.humans.values()]
+    return getattr(room, name)
+
+
+def _copy_value(value):
+    # 필드 값 사본 (제자리에서 바뀌는 list/dict도 다음 비교 때 차이가 보이도록). 값은 JSON 기본 타입뿐
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy_value(item) for item in value)
+    return value
+
+
+def room_state(room):
+    # 스냅샷용 방 상태 (Room.from_state로 되돌릴 수 있는 형태)
+    state = {name: _field_value(room, name) for name in JOURNAL_FIELDS}
+    state['messages'] = [message.to_wire() for message in room.messages]
+    state['journal_version'] = room.journal_version
+    return state
+
+
+def apply_event(rooms, event, window):
+    # rooms: room_id -> 상태 dict. 이미 반영된 이벤트(v <= journal_version)는 무시
+    room_id = event['room']
+    if event['type'] == 'room_deleted':
+        rooms.pop(room_id, None)
+        return
+    state = rooms.get(room_id)
+    if state is None:
+        if 'id' not in event['fields']:
+            return # 생성 기록이 앞 세그먼트와 함께 지워진 방 (이미 삭제됨)
+        state = rooms[room_id] = {'messages': [], 'journal_version': 0}
+    if event['v'] <= state['journal_version']:
+        return
+    state.update(event['fields'])
+    state['messages'].extend(event['messages'])
+    del state['messages'][:-window]
+    state['journal_version'] = event['v']
+
+
+def archive_dir(directory):
+    path = os.path.join(directory, "archive")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _numbered(directory, pattern):
+    found = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(found)
+
+
+def read_events(path):
+    # 세그먼트의 이벤트 (마지막 줄이 쓰다 만 줄이면 거기서 멈춤)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+def read_all_events(directory):
+    # 보관된 세그먼트까지 포함한 전체 이벤트 (오래된 순) - 오프라인 분석용
+    segments = _numbered(archive_dir(directory), _SEGMENT) + _numbered(directory, _SEGMENT)
+    for _, path in sorted(segments):
+        yield from read_events(path)
+
+
+def read_journal(directory):
+    # (최근 스냅샷 방 상태 목록, 그 뒤 이벤트들) - 복구와 오프라인 도구가 함께 사용
+    rooms, start = [], 0
+    snapshots = _numbered(directory, _SNAPSHOT)
+    if snapshots:
+        start, path = snapshots[-1]
+        with open(path, encoding='utf-8') as f:
+            rooms = json.load(f)['rooms']
+
+    def events():
+        for number, path in _numbered(directory, _SEGMENT):
+            if number >= start:
+                yield from read_events(path)
+    return rooms, events()
+
+
+class EventJournal:
+    def __init__(self, directory, flush_interval=0.05, segment_bytes=4 * 1024 * 1024, snapshot_interval=300.0, retain=False):
+        self.directory = directory
+        self.retain = retain
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_source = None # 스냅샷 시점에 살아 있는 방들을 (각자 락 안에서) 돌려주는 함수
+        os.makedirs(directory, exist_ok=True)
+        self._shadows = {} # room_id -> {'fields': {필드: 마지막으로 기록한 값의 사본}, 'message_count': 기록한 메시지 수}
+        self._buffer = []
+        self._io_lock = threading.Lock()
+        segments = _numbered(directory, _SEGMENT) + _numbered(directory, _SNAPSHOT)
+        # 이전 프로세스가 쓰다 만 세그먼트에 이어 쓰지 않고 항상 새 세그먼트에서 시작
+        self._segment = max((number for number, _ in segments), default=0) + 1
+        self._fd = self._open_segment(self._segment)
+        self._segment_size = 0
+        self._last_checkpoint = time.monotonic()
+        self._events_since_checkpoint = 0
+        self._started = False
+        self.stats = {'events': 0, 'bytes': 0, 'flushes': 0, 'checkpoints': 0, 'recovered_rooms': 0, 'replayed_events': 0}
+
+    def _open_segment(self, number):
+        path = os.path.join(self.directory, f"events-{number:08d}.jsonl")
+        return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        self._started = True
+        eventlet.spawn(self._run)
+
+    # --- 기록 (방 락 안에서 호출) ---
+    def record(self, room, event_type):
+        shadow = self._shadows.get(room.id)
+        if shadow is None:
+            shadow = self._shadows[room.id] = {'fields': {}, 'message_count': room.message_count - len(room.messages)}
+        # 💡 [수정] 필드마다 직렬화해 비교하지 않고 값으로 비교 → 바뀐 필드만 이벤트에 넣어 한 번 인코딩
+        recorded = shadow['fields']
+        fields = {}
+        for name in JOURNAL_FIELDS:
+            value = _field_value(room, name)
+            if name not in recorded or recorded[name] != value:
+                recorded[name] = _copy_value(value)
+                fields[name] = value
+        new_count = room.message_count - shadow['message_count']
+        messages = [message.to_wire() for message in room.messages[-new_count:]] if new_count > 0 else []
+        if not fields and not messages:
+            return
+        shadow['message_count'] = room.message_count
+        room.journal_version += 1
+        self._append({
+            'v': room.journal_version,
+            'room': room.id,
+            'type': event_type,
+            'ts': now_ms(),
+            'fields': fields,
+            'messages': messages,
+        })
+
+    def record_deleted(self, room):
+        room.journal_version += 1
+        self._shadows.pop(room.id, None)
+        self._append({'v': room.journal_version, 'room': room.id, 'type': 'room_deleted', 'ts': now_ms(), 'fields': {}, 'messages': []})
+
+    def adopt(self, room):
+        # 복구한 방의 현재 상태를 '이미 기록된 상태'로 등록 (다음 이벤트부터 차이만 기록)
+        self._shadows[room.id] = {
+            'fields': {name: _copy_value(_field_value(room, name)) for name in JOURNAL_FIELDS},
+            'message_count': room.message_count,
+        }
+
+    def _append(self, event):
+        self._ensure_started()
+        self._buffer.append(wire_json.dumps(event) + "\n")
+        self.stats['events'] += 1
+        self._events_since_checkpoint += 1
+
+    # --- 디스크 쓰기 ---
+    @staticmethod
+    def _write_and_sync(fd, data):
+        os.write(fd, data)
+        os.fsync(fd)
+
+    def flush(self):
+        # 버퍼를 현재 세그먼트에 쓰고 fsync (fsync는 OS 스레드에서 실행해 이벤트 루프를 막지 않음)
+        with self._io_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        data = "".join(lines).encode('utf-8')
+        tpool.execute(self._write_and_sync, self._fd, data)
+        self._segment_size += len(data)
+        self.stats['bytes'] += len(data)
+        self.stats['flushes'] += 1
+
+    def checkpoint(self):
+        # 새 세그먼트로 넘긴 뒤 모든 방의 스냅샷을 남기고, 스냅샷 이전 세그먼트/스냅샷은 삭제
+        if self.snapshot_source is None:
+            return
+        with self._io_lock:
+            self._flush_locked()
+            old_fd = self._fd
+            self._segment += 1
+            self._fd = self._open_segment(self._segment)
+            self._segment_size = 0
+            self._events_since_checkpoint = 0
+            self._last_checkpoint = time.monotonic()
+            os.close(old_fd)
+
+            # 넘긴 뒤에 읽으므로, 새 세그먼트의 이벤트 중 스냅샷에 이미 들어간 것은 복구 때 버전으로 걸러짐
+            states = [room_state(room) for room in self.snapshot_source()]
+            path = os.path.join(self.directory, f"snapshot-{self._segment:08d}.json")
+            data = wire_json.dumps({'segment': self._segment, 'created_at': now_ms(), 'rooms': states}).encode('utf-8')
+            tpool.execute(self._write_file, path, data)
+
+            for number, old_path in _numbered(self.directory, _SNAPSHOT):
+                if number < self._segment:
+                    os.remove(old_path)
+            for number, old_path in _numbered(self.directory, _SEGMENT):
+                if number >= self._segment:
+                    continue
+                if self.retain:
+                    os.replace(old_path, os.path.join(archive_dir(self.directory), os.path.basename(old_path)))
+                else:
+                    os.remove(old_path)
+        self.stats['checkpoints'] += 1
+
+    @staticmethod
+    def _write_file(path, data):
+        # 임시 파일 → fsync → rename (쓰다 만 스냅샷이 남지 않도록)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _run(self):
+        while True:
+            eventlet.sleep(self.flush_interval)
+            try:
+                self.flush()
+                due = time.monotonic() - self._last_checkpoint >= self.snapshot_interval
+                if self._segment_size >= self.segment_bytes or (due and self._events_since_checkpoint):
+                    self.checkpoint()
+            except Exception as e:
+                print(f"Journal write failed: {e}")
+
+    # --- 복구 ---
+    def recover(self, window):
+        # 최근 스냅샷 + 이후 이벤트 → Room 목록
+        snapshot_rooms, events = read_journal(self.directory)
+        rooms = {state['id']: state for state in snapshot_rooms}
+        for event in events:
+            apply_event(rooms, event, window)
+            self.stats['replayed_events'] += 1
+        recovered = [Room.from_state(state) for state in rooms.values()]
+        self.stats['recovered_rooms'] = len(recovered)
+        return recovered
+
+    def snapshot(self):
+        return {
+            'directory': self.directory,
+            'segment': self._segment,
+            'segment_bytes': self._segment_size,
+            'buffered': len(self._buffer),
+            'tracked_rooms': len(self._shadows),
+            **self.stats,
+        }
+
+
+def create_event_journal(spec, **kwargs):
+    # JOURNAL_DIR: 디렉터리 경로 (기본 journal), none이면 사용 안 함
+    spec = spec if spec is not None else "journal"
+    if spec in ("", "none"):
+        return None
+    return EventJournal(spec, **kwargs)
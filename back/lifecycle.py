@@ -0,0 +1,116 @@
+import heapq
+import time
+
+import eventlet
+from eventlet.event import Event
+
+
+# ---------------------
+# 방 수명 관리 (유휴 방 정리)
+# ---------------------
+# 방마다 "마지막 활동 + 상태별 TTL" 마감 시각을 최소 힙에 넣어 두고,
+# 가장 이른 마감까지만 잠들었다가 깨어나 만료된 방만 꺼냅니다. (전체 방을 훑지 않음)
+# - touch(room_id, state): 활동이 있을 때마다 호출. 이전 항목은 세대 번호로 무효화 (지연 삭제)
+# - 만료 시 on_expire(room_id)를 호출. 실제 삭제 여부는 호출 측이 방 상태를 다시 확인해 결정합니다.
+#   (다른 워커에서 활동이 있었을 수 있으므로, 아직이면 touch로 다시 예약)
+# 상태: 'waiting'(참가자 없음) | 'in_progress' | 'finished'(투표 마감 후)
+# schedule_at()으로 TTL과 무관한 마감 시각을 직접 걸 수도 있습니다 (예: ('vote', 방 ID) 키의 투표 마감 타이머).
+class LifecycleScheduler:
+    def __init__(self, ttls, on_expire, seed=None, max_sleep=5.0):
+        self.ttls = dict(ttls)
+        self.on_expire = on_expire
+        self.seed = seed # 시작 시 이미 저장소에 있는 방 ID 목록을 돌려주는 함수 (재시작/다른 워커가 만든 방)
+        self.max_sleep = max_sleep
+        self._heap = [] # (deadline, generation, room_id)
+        self._entries = {} # room_id -> (generation, deadline, state)
+        self._generation = 0
+        self._wakeup = None
+        self._started = False
+        self.stats = {'scheduled': 0, 'expired': 0, 'reaped': {state: 0 for state in self.ttls}}
+
+    def _ensure_started(self):
+        # 첫 예약 때 green thread를 띄움 (import 시점에 허브를 건드리지 않기 위함)
+        if self._started:
+            return
+        self._started = True
+        if self.seed is not None:
+            # 마지막 활동 시각을 모르므로 가장 짧은 TTL 뒤에 한 번 확인 (on_expire가 실제 상태로 다시 예약)
+            shortest = min(self.ttls, key=self.ttls.get)
+            for room_id in self.seed():
+                self._schedule(room_id, shortest, time.time() + self.ttls[shortest])
+        eventlet.spawn(self._run)
+
+    def touch(self, room_id, state, last_active=None):
+        # last_active: 마지막 활동 시각 (epoch 초, 없으면 지금)
+        self._ensure_started()
+        deadline = (last_active if last_active is not None else time.time()) + self.ttls[state]
+        self._schedule(room_id, state, deadline)
+
+    def schedule_at(self, key, state, deadline):
+        # deadline: epoch 초. 만료되면 on_expire(key, state)
+        self._ensure_started()
+        self._schedule(key, state, deadline)
+
+    def remove(self, room_id):
+        self._entries.pop(room_id, None)
+
+    def _schedule(self, room_id, state, deadline):
+        current = self._entries.get(room_id)
+        if current is not None and current[1] == deadline and current[2] == state:
+            return
+        self._generation += 1
+        self._entries[room_id] = (self._generation, deadline, state)
+        heapq.heappush(self._heap, (deadline, self._generation, room_id))
+        self.stats['scheduled'] += 1
+        self._compact()
+        # 새 마감이 지금 기다리는 것보다 이르면 깨움
+        wakeup = self._wakeup
+        if wakeup is not None and not wakeup.ready() and self._heap[0][1] == self._generation:
+            wakeup.send()
+
+    def _compact(self):
+        # 무효화된 항목이 너무 많이 쌓이면 살아 있는 항목만으로 다시 만듦
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            self._heap = [(deadline, generation, room_id) for room_id, (generation, deadline, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_expired(self, now):
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, generation, room_id = heapq.heappop(self._heap)
+            entry = self._entries.get(room_id)
+            if entry is None or entry[0] != generation:
+                continue # touch/remove로 무효화된 항목
+            del self._entries[room_id]
+            expired.append((room_id, entry[2]))
+        return expired
+
+    def _run(self):
+        while True:
+            for room_id, state in self._pop_expired(time.time()):
+                self.stats['expired'] += 1
+                try:
+                    self.on_expire(room_id, state)
+                except Exception as e:
+                    print(f"Error while expiring room {room_id}: {e}")
+
+            timeout = self.max_sleep
+            if self._heap:
+                timeout = min(timeout, max(0.0, self._heap[0][0] - time.time()))
+            self._wakeup = Event()
+            try:
+                with eventlet.Timeout(timeout, False):
+                    self._wakeup.wait()
+            finally:
+                self._wakeup = None
+
+    def record_reaped(self, state):
+        self.stats['reaped'][state] = self.stats['reaped'].get(state, 0) + 1
+
+    def snapshot(self):
+        return {
+            'ttls': self.ttls,
+            'tracked_rooms': len(self._entries),
+            'heap_size': len(self._heap),
+            **self.stats,
+        }
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# ---------------------
+# LLM 백엔드
+# ---------------------
+# api.py는 OpenAI SDK와 같은 모양(client.chat.completions.create(...))으로만 호출하므로,
+# 아래 클라이언트들은 모두 그 인터페이스를 흉내 냅니다.
+#
+# 환경 변수:
+#   LLM_BACKEND=openai | mock      (기본 openai)
+#   MOCK_LLM_LATENCY=fixed:200 | uniform:100-400 | normal:300,80 | lognormal:300,0.5   (ms)
+#   MOCK_LLM_SEED=0
+#   MOCK_LLM_LATENCY_<i>, MOCK_LLM_ERROR_RATE(_<i>)   (i번째 클라이언트만 다르게: 느린 키 / 고장 난 키 재현)
+#   MOCK_LLM_CHAR_LATENCY=0        (출력 글자당 추가 지연 ms: 긴 답변(배치 JSON 등)이 더 오래 걸리는 것 재현)
+#   MOCK_LLM_BAD_JSON_RATE=0       (structured output 요청에 깨진 JSON을 돌려줄 확률: 배치 모드 대체 경로 확인용)
+#   LLM_CACHE_SIZE=0               (0이면 응답 캐시 사용 안 함)
+#   LLM_CACHE_TTL=600              (초)
+
+MOCK_ANSWERS = [
+    "음, 어릴 때 기억이 떠오르네요.",
+    "그건 주말에 자주 보게 되는 것 같아요.",
+    "가족들이랑 함께할 때 생각나요.",
+    "딱 들으면 계절 하나가 떠오르는데요.",
+    "아까 그 말씀은 조금 애매했던 것 같습니다.",
+    "저는 방금 발언하신 분이 좀 의심스러워요.",
+    "확실하진 않지만 누군가 말을 돌리는 것 같아요.",
+    "그 힌트는 너무 멀리 간 것 같은데요.",
+]
+
+
+def normalize_prompt(model, messages, max_tokens=None):
+    # 공백 차이만 있는 프롬프트는 같은 키가 되도록 정규화
+    normalized = [
+        {"role": m.get("role"), "content": re.sub(r"\s+", " ", str(m.get("content", ""))).strip()}
+        for m in messages
+    ]
+    return json.dumps([model, max_tokens, normalized], ensure_ascii=False, sort_keys=True)
+
+
+def prompt_digest(key):
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def make_completion(text, prompt_tokens=0):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=0, message=SimpleNamespace(role="assistant", content=text), finish_reason="stop")],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=len(text),
+            total_tokens=prompt_tokens + len(text),
+            prompt_tokens_details=None,
+        ),
+    )
+
+
+def make_chunks(pieces, prompt_tokens=0, include_usage=False):
+    text = ""
+    for piece in pieces:
+        text += piece
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=piece), finish_reason=None)], usage=None)
+    yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=None), finish_reason="stop")], usage=None)
+    if include_usage:
+        yield SimpleNamespace(choices=[], usage=make_completion(text, prompt_tokens).usage)
+
+
+def _schema_ids(response_format):
+    # batch_response_format()의 answers.required (AI ID 목록). structured output 요청이 아니면 None
+    try:
+        schema = response_format["json_schema"]["schema"]
+        return schema["properties"]["answers"]["required"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _wants_usage(kwargs):
+    return bool(((kwargs.get("extra_body") or {}).get("stream_options") or {}).get("include_usage"))
+
+
+class LatencyModel:
+    # 지연 분포 (ms). spec 예: "fixed:200", "uniform:100-400", "normal:300,80", "lognormal:300,0.5"
+    def __init__(self, spec="fixed:0", seed=0):
+        self.spec = spec
+        self.rng = random.Random(seed)
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in re.split(r"[-,]", params) if p] if params else []
+
+    def sample(self):
+        if self.kind == "uniform":
+            low, high = self.params
+            return self.rng.uniform(low, high)
+        if self.kind == "normal":
+            mean, stddev = self.params
+            return max(0.0, self.rng.gauss(mean, stddev))
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * self.rng.lognormvariate(0.0, sigma)
+        return self.params[0] if self.params else 0.0
+
+
+class _Completions:
+    def __init__(self, create):
+        self.create = create
+
+
+class MockLLMClient:
+    """네트워크 없이 같은 프롬프트에 항상 같은 답을 주는 로컬 클라이언트 (부하 테스트용)"""
+
+    def __init__(self, latency="fixed:0", seed=0, fixed_text=None, error_rate=0.0, bad_json_rate=0.0, char_latency=0.0):
+        self.latency = LatencyModel(latency, seed)
+        self.char_latency = char_latency
+        self.seed = seed
+        self.fixed_text = fixed_text
+        self.error_rate = error_rate
+        self.bad_json_rate = bad_json_rate
+        self.rng = random.Random(seed)
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _answer(self, key):
+        if self.fixed_text is not None:
+            return self.fixed_text
+        digest = hashlib.sha1(f"{self.seed}:{key}".encode("utf-8")).digest()
+        return MOCK_ANSWERS[digest[0] % len(MOCK_ANSWERS)]
+
+    def _create(self, model=None, messages=(), max_tokens=None, stream=False, response_format=None, **kwargs):
+        key = normalize_prompt(model, messages, max_tokens)
+        ids = _schema_ids(response_format)
+        if ids is None:
+            text = self._answer(key)
+        elif self.bad_json_rate and self.rng.random() < self.bad_json_rate:
+            text = '{"answers": {'
+        else:
+            text = json.dumps({"answers": {ai_id: self._answer(f"{key}:{ai_id}") for ai_id in ids}}, ensure_ascii=False)
+        prompt_tokens = len(key) // 2
+        delay = (self.latency.sample() + len(text) * self.char_latency) / 1000
+        if self.error_rate and self.rng.random() < self.error_rate:
+            time.sleep(delay)
+            raise RuntimeError("mock LLM error")
+        if not stream:
+            time.sleep(delay)
+            return make_completion(text, prompt_tokens)
+
+        def chunks():
+            time.sleep(delay)
+            yield from make_chunks(re.findall(r"\S+\s*", text), prompt_tokens, _wants_usage(kwargs))
+        return chunks()
+
+
+class ResponseCache:
+    """정규화한 프롬프트 → 응답 텍스트 LRU + TTL 캐시"""
+
+    def __init__(self, maxsize=1024, ttl=600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        self._entries[key] = (time.monotonic() + self.ttl, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {'size': len(self._entries), 'maxsize': self.maxsize, 'ttl': self.ttl, 'hits': self.hits, 'misses': self.misses}
+
+
+class _RawResponse:
+    # OpenAI SDK의 with_raw_response 결과처럼 parse() / headers를 제공
+    def __init__(self, parsed, headers):
+        self._parsed = parsed
+        self.headers = headers
+
+    def parse(self):
+        return self._parsed
+
+
+class CachedLLMClient:
+    """다른 클라이언트를 감싸 같은 프롬프트의 응답을 재사용"""
+
+    def __init__(self, inner, cache):
+        self.inner = inner
+        self.cache = cache
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+        # 💡 [수정] 안쪽 클라이언트가 응답 헤더를 주면 그대로 넘김 (ClientPool의 레이트 리밋 추적용).
+        # 캐시 적중은 API를 부르지 않았으므로 빈 헤더
+        if getattr(inner.chat.completions, 'with_raw_response', None) is not None:
+            self.chat.completions.with_raw_response = _Completions(self._create_raw)
+
+    def _create(self, **kwargs):
+        response, _ = self._lookup(False, **kwargs)
+        return response
+
+    def _create_raw(self, **kwargs):
+        return _RawResponse(*self._lookup(True, **kwargs))
+
+    def _lookup(self, raw, model=None, messages=(), max_tokens=None, stream=False, **kwargs):
+        # → (응답 또는 청크 반복자, 헤더 또는 None)
+        key = prompt_digest(normalize_prompt(model, messages, max_tokens))
+        cached = self.cache.get(key)
+        if cached is not None:
+            if stream:
+                return make_chunks([cached], 0, _wants_usage(kwargs)), {}
+            return make_completion(cached), {}
+
+        request = dict(model=model, messages=messages, max_tokens=max_tokens, stream=stream, **kwargs)
+        if raw:
+            raw_response = self.inner.chat.completions.with_raw_response.create(**request)
+            response, headers = raw_response.parse(), raw_response.headers
+        else:
+            response, headers = self.inner.chat.completions.create(**request), None
+        if not stream:
+            self.cache.put(key, response.choices[0].message.content)
+            return response, headers
+
+        def passthrough():
+            pieces = []
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    pieces.append(chunk.choices[0].delta.content)
+                yield chunk
+            self.cache.put(key, "".join(pieces))
+        return passthrough(), headers
+
+
+def create_response_cache():
+    size = int(os.getenv("LLM_CACHE_SIZE", "0"))
+    if size <= 0:
+        return None
+    return ResponseCache(maxsize=size, ttl=float(os.getenv("LLM_CACHE_TTL", "600")))
+
+
+def create_fallback_client():
+    # 💡 [추가] 모든 키가 고장/레이트 리밋일 때 쓰는 로컬 대체 클라이언트 (지연 없이 평범한 답변)
+    return MockLLMClient(seed=int(os.getenv("MOCK_LLM_SEED", "0")))
+
+
+def create_llm_clients(count, cache=None):
+    # 💡 [수정] 초기화에 실패한 키는 더미로 채우지 않고 제외 (남은 키가 없으면 ClientPool이 대체 클라이언트 사용)
+    backend = os.getenv("LLM_BACKEND", "openai").lower()
+    clients = []
+    for i in range(1, count + 1):
+        if backend == "mock":
+            client = MockLLMClient(
+                latency=os.getenv(f"MOCK_LLM_LATENCY_{i}") or os.getenv("MOCK_LLM_LATENCY", "fixed:0"),
+                seed=int(os.getenv("MOCK_LLM_SEED", "0")) + i,
+                error_rate=float(os.getenv(f"MOCK_LLM_ERROR_RATE_{i}") or os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+                bad_json_rate=float(os.getenv("MOCK_LLM_BAD_JSON_RATE", "0")),
+                char_latency=float(os.getenv("MOCK_LLM_CHAR_LATENCY", "0")),
+            )
+        else:
+            try:
+                from openai import OpenAI
+                client = OpenAI(api_key=os.getenv(f"GPT_API_KEY_{i}"))
+            except Exception as e:
+                print(f"Error initializing OpenAI client {i}: {e}")
+                continue
+        if cache is not None:
+            client = CachedLLMClient(client, cache)
+        clients.append(client)
+    print(f"LLM backend: {backend} x{len(clients)}" + (" (cached)" if cache is not None else ""))
+    return clients
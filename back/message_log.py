@@ -0,0 +1,220 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+# ---------------------
+# 방 메시지 기록 (고정 크기 창 + 디스크 보관)
+# ---------------------
+# room.messages에는 최근 window개만 남기고, 밀려나는 메시지는 보관소(archive)에 append 합니다.
+# - room.message_count: 지금까지 방에 추가된 전체 메시지 수 (단조 증가)
+#   → 새 메시지의 id = 추가 직전의 message_count, 창의 첫 메시지 번호 = message_count - len(messages)
+# - 방이 끝나면(삭제) 창에 남은 메시지도 보관소로 옮겨 게임 전체 기록이 디스크에 남습니다.
+# - 스크롤백은 read_messages(before, limit)로 (창 + 보관소) 구간을 잘라서 돌려줍니다.
+#
+# 보관소 선택 (MESSAGE_ARCHIVE):
+#   jsonl:<디렉터리>    게임마다 <game_id>.jsonl 한 줄에 메시지 하나 (기본 jsonl:message_archive)
+#                      최근 게임들의 (메시지 번호 -> 바이트 위치) 색인을 메모리에 두고 읽을 위치로 바로 seek
+#   sqlite:<파일 경로>  (game_id, idx) 기본 키 테이블 하나
+#   none               밀려난 메시지는 버림
+# 보관소에는 Message.to_wire() 형태(dict)로 저장되고, 읽을 때도 dict로 돌려줍니다.
+# 💡 [수정] 보관소 키는 방 ID가 아니라 room.game_id (방 ID 6자리는 방이 없어지면 다시 쓰이므로
+# 방 ID로 묶으면 이전 게임 기록이 섞이거나 덮어써짐)
+
+
+class MessageArchive:
+    def append(self, game_id, start_index, messages):
+        # messages[0]의 전체 번호가 start_index
+        raise NotImplementedError
+
+    def read(self, game_id, start, end):
+        # 번호가 [start, end) 인 메시지 (오래된 순)
+        raise NotImplementedError
+
+
+class NullMessageArchive(MessageArchive):
+    def append(self, game_id, start_index, messages):
+        pass
+
+    def read(self, game_id, start, end):
+        return []
+
+
+class JsonlMessageArchive(MessageArchive):
+    def __init__(self, directory, indexed_games=256):
+        self.directory = directory
+        self.indexed_games = indexed_games
+        # 💡 [추가] game_id -> {'offsets': {메시지 번호: 줄 시작 바이트 위치}, 'size': 색인한 바이트 수} (최근 게임만, LRU)
+        # 쓸 때 함께 색인하고, 색인에 없는 부분(재시작 전 / 다른 워커가 쓴 줄)은 읽을 때 한 번만 훑어서 채움
+        self._index = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, game_id):
+        # 게임 ID는 uuid hex지만, 경로 조작은 막아 둠
+        safe_id = "".join(c for c in str(game_id) if c.isalnum())
+        return os.path.join(self.directory, f"{safe_id}.jsonl")
+
+    def _game_index(self, game_id):
+        index = self._index.get(game_id)
+        if index is None:
+            index = self._index[game_id] = {'offsets': {}, 'size': 0}
+            if len(self._index) > self.indexed_games:
+                self._index.popitem(last=False)
+        else:
+            self._index.move_to_end(game_id)
+        return index
+
+    def append(self, game_id, start_index, messages):
+        if not messages:
+            return
+        lines = [
+            (json.dumps({'i': start_index + offset, 'm': message.to_wire()}, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+            for offset, message in enumerate(messages)
+        ]
+        data = b"".join(lines)
+        # O_APPEND 한 번의 write → 여러 워커가 같은 방에 써도 줄이 섞이지 않음 (방 락 안에서 호출됨)
+        with open(self._path(game_id), "ab") as f:
+            f.write(data)
+            end = f.tell()
+        index = self._game_index(game_id)
+        position = end - len(data)
+        if index['size'] != position:
+            return # 색인 뒤에 다른 줄이 있음 → 다음 read에서 이어서 색인
+        for offset, line in enumerate(lines):
+            index['offsets'].setdefault(start_index + offset, position)
+            position += len(line)
+        index['size'] = end
+
+    def _catch_up(self, f, index):
+        # 색인한 위치 이후의 줄을 색인 (쓰다 만 마지막 줄은 다음에)
+        if os.fstat(f.fileno()).st_size < index['size']:
+            index['offsets'].clear()
+            index['size'] = 0
+        position = index['size']
+        f.seek(position)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            index['offsets'].setdefault(json.loads(line)['i'], position)
+            position += len(line)
+        index['size'] = position
+
+    def read(self, game_id, start, end):
+        if end <= start:
+            return []
+        try:
+            f = open(self._path(game_id), "rb")
+        except FileNotFoundError:
+            return []
+        messages = []
+        with f:
+            index = self._game_index(game_id)
+            self._catch_up(f, index)
+            offsets = index['offsets']
+            position = offsets.get(start)
+            if position is None:
+                found = [number for number in offsets if start <= number < end]
+                if not found:
+                    return []
+                position = offsets[min(found)]
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                if record['i'] >= end:
+                    break
+                if record['i'] >= start:
+                    messages.append(record['m'])
+        return messages
+
+
+class SqliteMessageArchive(MessageArchive):
+    def __init__(self, path):
+        self.path = path
+        # green thread마다 연결을 만들지 않도록 연결 하나를 락으로 공유
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS game_messages ("
+            " game_id TEXT NOT NULL, idx INTEGER NOT NULL, body TEXT NOT NULL,"
+            " PRIMARY KEY (game_id, idx))"
+        )
+        self._conn.commit()
+
+    def append(self, game_id, start_index, messages):
+        if not messages:
+            return
+        rows = [
+            (game_id, start_index + offset, json.dumps(message.to_wire(), ensure_ascii=False, separators=(',', ':')))
+            for offset, message in enumerate(messages)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO game_messages (game_id, idx, body) VALUES (?, ?, ?)", rows)
+
+    def read(self, game_id, start, end):
+        if end <= start:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body FROM game_messages WHERE game_id = ? AND idx >= ? AND idx < ? ORDER BY idx",
+                (game_id, start, end),
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+
+def create_message_archive(spec):
+    spec = spec or "jsonl:message_archive"
+    kind, _, target = spec.partition(":")
+    if kind == "none":
+        return NullMessageArchive()
+    if kind == "sqlite":
+        return SqliteMessageArchive(target or "message_archive.db")
+    if kind == "jsonl":
+        return JsonlMessageArchive(target or "message_archive")
+    raise ValueError(f"Unsupported MESSAGE_ARCHIVE: {spec}")
+
+
+# ---------------------
+# 방 단위 도우미 (방 락 안에서 호출)
+# ---------------------
+def window_start(room):
+    return room.message_count - len(room.messages)
+
+
+def append_messages(room, messages, archive, window):
+    # 새 메시지에 번호(id)를 매겨 창에 추가하고, 창을 넘친 오래된 메시지는 보관소로 보냄
+    for message in messages:
+        message.id = room.message_count
+        room.message_count += 1
+        room.messages.append(message)
+    overflow = len(room.messages) - window
+    if overflow > 0:
+        archive.append(room.game_id, window_start(room), room.messages[:overflow])
+        del room.messages[:overflow]
+
+
+def messages_since(room, count):
+    # 전체 번호 count 이후에 추가된 메시지 (창에 남아 있는 범위까지만)
+    new_count = room.message_count - count
+    if new_count <= 0:
+        return []
+    return room.messages[-new_count:]
+
+
+def archive_room(room, archive):
+    # 게임 종료 시 창에 남은 메시지까지 보관
+    archive.append(room.game_id, window_start(room), room.messages)
+
+
+def read_messages(room, archive, before, limit):
+    # 전체 번호 before 직전까지 최대 limit개 → (wire 형태 메시지 목록, 첫 메시지 번호)
+    before = max(0, min(before, room.message_count))
+    start = max(0, before - limit)
+    first_live = window_start(room)
+    archived = archive.read(room.game_id, start, min(before, first_live))
+    live = room.messages[max(0, start - first_live):max(0, before - first_live)]
+    return archived + [message.to_wire() for message in live], start
@@ -0,0 +1,243 @@
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+
+try:
+    import orjson  # 선택 의존성: 있으면 직렬화가 훨씬 빠름
+except ImportError:
+    orjson = None
+
+
+# ---------------------
+# 게임 데이터 모델
+# ---------------------
+# 방/플레이어/메시지를 __slots__ 데이터클래스로 표현합니다. (dict보다 객체당 메모리가 작고 키 문자열을 반복 저장하지 않음)
+# - Message.id: 방 안에서 1씩 증가하는 정수 (= 방 전체 메시지 중 순번, message_log의 번호와 같음)
+# - Message.ts: epoch 밀리초 정수 (isoformat 문자열 생성 비용 없음)
+# - to_wire(): 클라이언트로 보내는 필드만 골라 기본 타입(dict/list/str/int)으로 변환 → orjson/json 어느 쪽으로도 직렬화 가능
+# - to_state()/from_state(): 서버 내부 필드까지 포함한 저장용 변환 (Redis 저장소)
+# - 사람 참가자는 Room.humans (플레이어 ID -> Seat, 입장 순서 유지)에 둡니다. 운영자(라이어)도 자리 하나이며
+#   operator_id로 가리킵니다. ID로 찾기/입장/퇴장이 모두 O(1)이라 인원이 늘어도 자리 관리 비용이 커지지 않습니다.
+
+
+def now_ms():
+    return time.time_ns() // 1_000_000
+
+
+@dataclass(slots=True)
+class Message:
+    id: int
+    sender: str
+    sender_name: str
+    text: str
+    ts: int
+    sender_type: str = None # 'user' | 'operator' | 'ai' | None(시스템)
+
+    @classmethod
+    def create(cls, sender, sender_name, text, sender_type=None):
+        # id는 방에 추가될 때 정해짐 (message_log.append_messages)
+        return cls(0, sender, sender_name, text, now_ms(), sender_type)
+
+    @classmethod
+    def system(cls, text):
+        return cls.create('system', '시스템', text)
+
+    def to_wire(self):
+        return {
+            'id': self.id,
+            'sender': self.sender,
+            'sender_type': self.sender_type,
+            'sender_name': self.sender_name,
+            'text': self.text,
+            'timestamp': self.ts,
+        }
+
+    @classmethod
+    def from_wire(cls, data):
+        return cls(data['id'], data['sender'], data['sender_name'], data['text'], data['timestamp'], data.get('sender_type'))
+
+
+@dataclass(slots=True)
+class Player:
+    id: str
+    name: str
+    personality: str = None
+    is_liar: bool = False
+
+    def to_wire(self):
+        # 성격(프롬프트용)은 클라이언트에 보내지 않음
+        return {'id': self.id, 'name': self.name, 'isLiar': self.is_liar}
+
+    def to_state(self):
+        return {'id': self.id, 'name': self.name, 'personality': self.personality, 'isLiar': self.is_liar}
+
+    @classmethod
+    def from_state(cls, data):
+        return cls(data['id'], data['name'], data.get('personality'), data.get('isLiar', False))
+
+
+@dataclass(slots=True)
+class Seat:
+    # 사람 참가자 자리 (연결 sid / 재접속 토큰은 서버 내부 값이라 전송하지 않음)
+    id: str
+    name: str
+    sid: str = None
+    token: str = None
+
+    def to_wire(self):
+        return {'id': self.id, 'name': self.name}
+
+    def to_state(self):
+        return {'id': self.id, 'name': self.name, 'sid': self.sid, 'token': self.token}
+
+    @classmethod
+    def from_state(cls, data):
+        return cls(data['id'], data['name'], data.get('sid'), data.get('token'))
+
+
+# 클라이언트에 보내는 방 필드 (messages/seq 제외). 패치는 이 필드들만 비교합니다.
+WIRE_FIELDS = (
+    'id', 'topic', 'liar_word', 'citizen_word',
+    'operator_id', 'humans', 'max_humans',
+    'ai_players', 'message_count', 'phase', 'turn', 'turn_order', 'turn_index', 'votes', 'phases_config',
+    'vote_tally', 'vote_deadline', 'vote_result',
+)
+
+
+@dataclass(slots=True)
+class Room:
+    id: str
+    topic: str
+    liar_word: str
+    citizen_word: str
+    operator_id: str
+    ai_players: list
+    phases_config: list
+    available_names: list
+    humans: dict = field(default_factory=dict) # 플레이어 ID -> Seat (운영자 포함, 입장 순서)
+    max_humans: int = 2 # 운영자 포함 사람 정원
+    messages: list = field(default_factory=list) # 최근 창만 (message_log 참고)
+    message_count: int = 0
+    seq: int = 0
+    phase: int = 0
+    turn: str = 'waiting' # 'waiting' | 'speaking' | 'reveal' | 'voting' | 'ended' (turns.py)
+    turn_order: list = field(default_factory=list) # 이번 페이즈 발언 순서 (사람 ID, 운영자가 마지막)
+    turn_index: int = 0 # turn_order에서 지금 발언할 차례
+    ai_answers: list = field(default_factory=list) # 공개 전 AI 진술 (클라이언트에 보내지 않음)
+    votes: dict = field(default_factory=dict) # 투표자 ID -> 지목한 ID (voting.py)
+    vote_tally: dict = field(default_factory=dict) # 지목된 ID -> 득표 수
+    vote_deadline: int = 0 # 투표 마감 시각 (epoch ms)
+    vote_result: dict = None # 마감 후 결과
+    seat_numbers: dict = field(default_factory=dict) # 플레이어 ID -> 입장 순번 (관전 화면용 별칭, 나가도 유지)
+    # --- 서버 내부 상태 (전송하지 않음) ---
+    game_id: str = field(default_factory=lambda: uuid.uuid4().hex) # 게임마다 고유 ID (방 ID는 재사용되므로 메시지 보관소 키로 사용)
+    updated_at: int = 0 # 마지막으로 상태가 전파된 시각 (epoch ms, 유휴 방 정리용)
+    patch_log: list = field(default_factory=list) # 최근 roomPatch (재접속 시 놓친 패치 재전송용)
+    journal_version: int = 0 # 이 방에 대해 저널에 기록한 마지막 이벤트 번호 (journal.py)
+    sync: dict = None
+    ai_job: dict = None
+    prefetch: dict = None
+    pending_statement: dict = None
+
+    @property
+    def operator(self):
+        return self.humans.get(self.operator_id)
+
+    def add_seat(self, seat):
+        self.humans[seat.id] = seat
+        self.seat_numbers.setdefault(seat.id, len(self.seat_numbers) + 1)
+
+    def citizens(self):
+        # 운영자를 뺀 사람 참가자 (입장 순서)
+        return [seat for seat in self.humans.values() if seat.id != self.operator_id]
+
+    def player_name(self, player_id):
+        # 사람/AI 닉네임 (없는 ID면 None). 사람은 dict 조회, AI는 방마다 정해진 소수라 순회
+        seat = self.humans.get(player_id)
+        if seat is not None:
+            return seat.name
+        for ai in self.ai_players:
+            if ai.id == player_id:
+                return ai.name
+        return None
+
+    def player_count(self):
+        return len(self.humans) + len(self.ai_players)
+
+    def public_fields(self):
+        # WIRE_FIELDS 값을 기본 타입으로 (패치 비교용으로도 사용하므로 매번 새 객체)
+        return {
+            'id': self.id,
+            'topic': self.topic,
+            'liar_word': self.liar_word,
+            'citizen_word': self.citizen_word,
+            'operator_id': self.operator_id,
+            'humans': [seat.to_wire() for seat in self.humans.values()],
+            'max_humans': self.max_humans,
+            'ai_players': [player.to_wire() for player in self.ai_players],
+            'message_count': self.message_count,
+            'phase': self.phase,
+            'turn': self.turn,
+            'turn_order': list(self.turn_order),
+            'turn_index': self.turn_index,
+            'votes': dict(self.votes),
+            'phases_config': self.phases_config,
+            'vote_tally': dict(self.vote_tally),
+            'vote_deadline': self.vote_deadline,
+            'vote_result': self.vote_result,
+        }
+
+    def to_wire(self):
+        snapshot = self.public_fields()
+        snapshot['seq'] = self.seq
+        snapshot['messages'] = [message.to_wire() for message in self.messages]
+        return snapshot
+
+    def to_state(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state['ai_players'] = [player.to_state() for player in self.ai_players]
+        state['humans'] = [seat.to_state() for seat in self.humans.values()]
+        state['messages'] = [message.to_wire() for message in self.messages]
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        state = dict(state)
+        state['ai_players'] = [Player.from_state(p) for p in state['ai_players']]
+        state['humans'] = {seat.id: seat for seat in map(Seat.from_state, state.get('humans', ()))}
+        state['messages'] = [Message.from_wire(m) for m in state['messages']]
+        return cls(**state)
+
+
+# ---------------------
+# 직렬화
+# ---------------------
+# Socket.IO(json=wire_json)와 Redis 저장소가 같이 씁니다. orjson이 없으면 표준 json으로 대체.
+class wire_json:
+    @staticmethod
+    def dumps(obj, **kwargs):
+        if orjson is not None:
+            return orjson.dumps(obj).decode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def dumpb(obj):
+        # UTF-8 bytes 그대로 (한 번 인코딩해 여러 연결에 같은 바이트를 보낼 때)
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def loads(data, **kwargs):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+def encode_room(room):
+    return wire_json.dumps(room.to_state())
+
+
+def decode_room(raw):
+    return Room.from_state(wire_json.loads(raw))
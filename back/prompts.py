@@ -0,0 +1,178 @@
+import json
+from functools import lru_cache
+
+
+# ---------------------
+# AI 프롬프트 구성
+# ---------------------
+# 프롬프트는 [system: 고정 규칙 + 성격] + [user: 이번 턴 정보] 두 메시지로 나눕니다.
+# - system 메시지에는 방/턴마다 바뀌는 값(주제, 단어, 닉네임, 대화 기록)을 넣지 않으므로
+#   같은 페이즈·성격이면 모든 방에서 글자 하나까지 동일 → 제공자 측 prefix 캐시가 적중합니다.
+# - 이번 턴 정보(대화 기록 JSON 등)는 턴마다 한 번만 만들어 방의 AI 전원이 같이 씁니다.
+
+PERSONA_TEMPLATE = """당신은 라이어 게임에 참가한 AI 참가자입니다.
+당신의 성격: {personality}
+당신의 성격에 맞게 답변을 조절하세요. (예: 소심하면 '...같아요', 직설적이면 '확실합니다.')"""
+
+STATEMENT_RULES = """(역할: {phase_name})
+당신은 라이어 게임의 참가자이며, **제시어(아래 '당신이 받은 단어')를 알고 있는 일반 시민 역할**입니다.
+당신의 목표는 라이어가 아님을 증명하고, 라이어를 찾아내는 것입니다.
+
+💡 핵심 규칙:
+1. **제시어 직접 언급 금지:** 당신이 받은 단어를 절대 말하지 마세요.
+2. **모호성 유지 (가장 중요):** 라이어가 유추하기 어렵도록, **"이것은... 입니다"** 같은 직접적인 정의 대신, **"...을(를) 떠올리게 하네요"** 또는 **"...와(과) 관련이 있죠"** 처럼 매우 간접적이고 모호한 방식으로 힌트를 주세요.
+3. **중복 금지:** 다른 참가자(대화 내용 참고)가 이미 말한 힌트나, 1차 진술 때 자신이 했던 말과 겹치는 힌트는 절대 말하지 마세요.
+4. **창의성:** 다른 AI들도 동시에 답변을 생성중입니다. 가장 뻔한 힌트(예: 사과 -> '빨갛다', '과일이다')는 반드시 피하고, 창의적인 힌트를 1개만 말하세요.
+5. **답변 형식:** 이모티콘 없이, 당신의 성격에 맞는 1개의 문장으로 답변을 생성하세요."""
+
+DISCUSSION_RULES = """(역할: {phase_name})
+당신은 제시어를 아는 '시민'입니다. 이 단계의 목표는 라이어를 찾는 것입니다.
+대화 내용을 보고, 참가자 명단에서 **닉네임**을 사용해 가장 의심스러운 사람 1명을 지목하거나 이유를 말하세요.
+
+💡 핵심 규칙:
+1. **'토론'의 목적:** 제시어(당신이 받은 단어)를 설명하지 마세요.
+2. **닉네임 사용:** ID(ai_1, user_id 등)가 아닌, **반드시 참가자 명단의 '닉네임'을 사용**하여 의심하세요.
+3. **제시어 언급 금지:** 당신이 받은 단어를 절대 말하지 마세요.
+4. **답변 형식:** 이모티콘 없이, 당신의 성격에 맞는 1개의 문장으로 답변을 생성하세요.
+
+(예시: "○○ 님의 아까 발언이 좀 애매했던 것 같아요.")
+(예시: "○○ 님이 제시어랑 좀 거리가 먼 이야기를 하신 것 같습니다.")"""
+
+VOTE_RULES = """(역할: {phase_name})
+당신은 제시어를 아는 '시민'입니다. 지금까지의 대화를 보고 라이어로 가장 의심되는 사람에게 투표하세요.
+
+💡 핵심 규칙:
+1. **한 명만:** 참가자 명단의 **닉네임 1개만** 답하세요. 자기 자신은 고를 수 없습니다.
+2. **답변 형식:** 이유나 다른 말 없이 닉네임만 출력하세요."""
+
+
+def phase_rules_template(phase_name):
+    if '진술' in phase_name:
+        return STATEMENT_RULES
+    if '토론' in phase_name:
+        return DISCUSSION_RULES
+    if '투표' in phase_name:
+        return VOTE_RULES
+    return ""
+
+
+@lru_cache(maxsize=256)
+def build_system_prompt(personality, phase_name):
+    # 성격 × 페이즈 조합마다 한 번만 만들어 재사용 (고정 prefix)
+    rules = phase_rules_template(phase_name).format(phase_name=phase_name)
+    return f"{rules}\n\n---\n\n{PERSONA_TEMPLATE.format(personality=personality)}"
+
+
+def build_nickname_map(room):
+    nickname_map = {seat.id: seat.name for seat in room.humans.values()}
+    for ai in room.ai_players:
+        nickname_map[ai.id] = ai.name
+    return nickname_map
+
+
+def build_turn_context(room, phase_name, history_limit=20):
+    # 이번 턴에 모든 AI가 공유하는 정보 (대화 기록 직렬화는 턴당 1회)
+    nickname_map = build_nickname_map(room)
+    recent_chat_history = [
+        {
+            "sender_name": nickname_map.get(msg.sender, msg.sender_name or 'Unknown'),
+            "text": msg.text,
+        }
+        for msg in room.messages[-history_limit:]
+    ]
+    lines = [
+        f"게임 주제: {room.topic}",
+        f"당신이 받은 단어: {room.citizen_word}",
+    ]
+    if '토론' in phase_name or '투표' in phase_name:
+        lines.append("참가자 명단 (닉네임): " + json.dumps(sorted(set(nickname_map.values())), ensure_ascii=False))
+    lines.append("최근 대화 내용: " + json.dumps(recent_chat_history, ensure_ascii=False, separators=(',', ':')))
+    return "\n".join(lines)
+
+
+def build_messages(ai_player, phase_name, turn_context):
+    return [
+        {"role": "system", "content": build_system_prompt(ai_player.personality, phase_name)},
+        {"role": "user", "content": f"당신의 이름: {ai_player.name}\n{turn_context}"},
+    ]
+
+
+# ---------------------
+# 배치 프롬프트 (AI 전원을 요청 1번으로)
+# ---------------------
+# AI들의 프롬프트는 이름/성격만 다르고 규칙과 대화 기록이 같으므로, 공통 부분을 한 번만 보내고
+# 참가자 목록과 함께 AI ID별 발언을 JSON 하나로 받습니다 (입력 토큰 약 1/N).
+# 응답은 parse_batch_answers()로 검증하고, 빠지거나 잘못된 AI만 개별 요청으로 다시 만듭니다.
+
+BATCH_TEMPLATE = """당신은 라이어 게임에 참가한 AI 참가자 여러 명의 발언을 한 번에 작성합니다.
+아래 규칙의 '당신'은 각 참가자를 가리키며, 참가자마다 규칙을 따로 지키는 독립된 발언 1개씩을 만드세요.
+참가자끼리 같은 힌트나 같은 표현을 쓰지 말고, 각자의 성격에 맞는 말투로 쓰세요.
+
+{rules}
+
+---
+
+응답 형식: {{"answers": {{"<참가자 ID>": "<발언>", ...}}}} 형태의 JSON 객체만 출력하세요."""
+
+BATCH_MAX_ANSWER_LENGTH = 200
+
+
+@lru_cache(maxsize=16)
+def build_batch_system_prompt(phase_name):
+    # 페이즈마다 고정 (참가자 목록은 user 메시지로 보내 prefix 캐시 유지)
+    rules = phase_rules_template(phase_name).format(phase_name=phase_name)
+    return BATCH_TEMPLATE.format(rules=rules)
+
+
+def build_batch_messages(ai_players, phase_name, turn_context):
+    roster = [{"id": ai.id, "name": ai.name, "personality": ai.personality} for ai in ai_players]
+    return [
+        {"role": "system", "content": build_batch_system_prompt(phase_name)},
+        {"role": "user", "content": "참가자 목록: " + json.dumps(roster, ensure_ascii=False, separators=(',', ':')) + f"\n{turn_context}"},
+    ]
+
+
+def batch_response_format(ai_players):
+    # OpenAI structured output (strict json_schema): AI ID마다 문자열 1개
+    ids = [ai.id for ai in ai_players]
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "ai_statements",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "answers": {
+                        "type": "object",
+                        "properties": {ai_id: {"type": "string"} for ai_id in ids},
+                        "required": ids,
+                        "additionalProperties": False,
+                    },
+                },
+                "required": ["answers"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def parse_batch_answers(text, ai_players):
+    # → {ai_id: 발언}. 형식이 아예 틀리면 ValueError, 일부 AI만 비었거나 이상하면 그 AI만 빠짐
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"batch response is not JSON: {e}") from None
+    answers = data.get("answers") if isinstance(data, dict) else None
+    if not isinstance(answers, dict):
+        raise ValueError("batch response has no 'answers' object")
+
+    parsed = {}
+    for ai in ai_players:
+        answer = answers.get(ai.id)
+        if not isinstance(answer, str):
+            continue
+        answer = answer.strip()
+        if answer and len(answer) <= BATCH_MAX_ANSWER_LENGTH:
+            parsed[ai.id] = answer
+    return parsed
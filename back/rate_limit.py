@@ -0,0 +1,88 @@
+import time
+
+
+# ---------------------
+# 요청 속도 제한 (토큰 버킷)
+# ---------------------
+# 키(sid, 방 ID 등)마다 버킷 하나: 최대 burst개까지 모아 두고 초당 rate개씩 다시 채웁니다.
+# 버킷은 [남은 토큰, 마지막 갱신 시각] 리스트 하나라서 키당 메모리가 작고,
+# 채우기는 allow() 호출 때 경과 시간으로 계산하므로 타이머가 필요 없습니다.
+#
+#   limiter = RateLimiter(rate=5, burst=10)
+#   allowed, retry_after = limiter.allow(request.sid)
+#
+# 프로세스 단위 상태입니다. 여러 워커를 띄우면 sid 기준 제한은 그대로(sticky),
+# 방 기준 제한은 워커마다 따로 계산됩니다.
+class RateLimiter:
+    def __init__(self, rate, burst, max_keys=100000):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self._buckets = {} # key -> [tokens, updated]
+        self.stats = {'allowed': 0, 'limited': 0, 'pruned': 0}
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def allow(self, key, cost=1.0):
+        # → (허용 여부, 다시 시도할 수 있을 때까지 초)
+        if not self.enabled:
+            return True, 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            bucket = self._buckets[key] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            self.stats['allowed'] += 1
+            return True, 0.0
+        self.stats['limited'] += 1
+        return False, (cost - bucket[0]) / self.rate
+
+    def forget(self, key):
+        # 연결 종료 / 방 삭제 시 버킷 정리
+        self._buckets.pop(key, None)
+
+    def _prune(self, now):
+        # 이미 가득 찼을 버킷(= 한동안 안 쓴 키)은 지워도 동작이 같음
+        idle_after = self.burst / self.rate
+        stale = [key for key, (_, updated) in self._buckets.items() if now - updated >= idle_after]
+        for key in stale:
+            del self._buckets[key]
+        self.stats['pruned'] += len(stale)
+
+    def snapshot(self):
+        return {'rate': self.rate, 'burst': self.burst, 'keys': len(self._buckets), **self.stats}
+
+
+# ---------------------
+# 전역 부하 제어 (admission control)
+# ---------------------
+# AI 대기열이 차오르면 새로 생기는 AI 작업을 중요도 순으로 거절합니다.
+#   'prefetch' (선생성) / 'room' (새 방 = 곧 AI 작업 발생) : load >= soft 이면 거절
+#   'turn' (진행 중인 게임의 유저 턴)                      : load >= hard 이면 거절
+# load_fn()은 0.0(비어 있음) ~ 1.0(가득 참) 사이 값을 돌려줍니다.
+class AdmissionController:
+    THRESHOLDS = {'prefetch': 'soft', 'room': 'soft', 'turn': 'hard'}
+
+    def __init__(self, load_fn, soft=0.5, hard=0.9):
+        self.load_fn = load_fn
+        self.soft = soft
+        self.hard = hard
+        self.stats = {kind: {'admitted': 0, 'rejected': 0} for kind in self.THRESHOLDS}
+
+    def admit(self, kind):
+        limit = getattr(self, self.THRESHOLDS[kind])
+        admitted = self.load_fn() < limit
+        self.stats[kind]['admitted' if admitted else 'rejected'] += 1
+        return admitted
+
+    def snapshot(self):
+        return {'load': self.load_fn(), 'soft': self.soft, 'hard': self.hard, **self.stats}
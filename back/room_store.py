@@ -0,0 +1,230 @@
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from models import encode_room, decode_room
+
+
+# ---------------------
+# 룸 저장소 인터페이스
+# ---------------------
+# api.py의 핸들러는 이 인터페이스를 통해서만 방 상태를 읽고 씁니다.
+# - get()은 방 객체(models.Room)를 돌려주고, 수정 후에는 반드시 save()로 저장해야 합니다.
+#   (메모리 백엔드에서는 같은 객체라 save가 사실상 no-op이지만, Redis 백엔드에서는 직렬화됩니다.)
+# - 읽기-수정-쓰기 구간은 lock(room_id)으로 감싸 여러 워커 간 경합을 막습니다.
+class RoomStore:
+    def get(self, room_id):
+        raise NotImplementedError
+
+    def create(self, room):
+        # 같은 ID가 이미 있으면 False (ID 충돌 시 재시도용)
+        raise NotImplementedError
+
+    def save(self, room):
+        raise NotImplementedError
+
+    def delete(self, room_id):
+        raise NotImplementedError
+
+    def exists(self, room_id):
+        return self.get(room_id) is not None
+
+    def room_ids(self):
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def lock(self, room_id):
+        raise NotImplementedError
+
+    # --- 세션 역색인 (sid -> (room_id, player_id)) ---
+    def bind_session(self, sid, room_id, player_id):
+        raise NotImplementedError
+
+    def unbind_session(self, sid):
+        raise NotImplementedError
+
+    def get_session(self, sid):
+        raise NotImplementedError
+
+    def sessions(self):
+        # (sid, (room_id, player_id)) 목록 - 점검용
+        raise NotImplementedError
+
+
+class InMemoryRoomStore(RoomStore):
+    def __init__(self):
+        self._rooms = {}
+        self._sessions = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def get(self, room_id):
+        return self._rooms.get(room_id)
+
+    def create(self, room):
+        if room.id in self._rooms:
+            return False
+        self._rooms[room.id] = room
+        return True
+
+    def save(self, room):
+        self._rooms[room.id] = room
+
+    def delete(self, room_id):
+        self._rooms.pop(room_id, None)
+        with self._locks_guard:
+            self._locks.pop(room_id, None)
+
+    def exists(self, room_id):
+        return room_id in self._rooms
+
+    def room_ids(self):
+        return list(self._rooms.keys())
+
+    def count(self):
+        return len(self._rooms)
+
+    def lock(self, room_id):
+        # eventlet.monkey_patch 이후에는 green lock으로 동작
+        with self._locks_guard:
+            lock = self._locks.get(room_id)
+            if lock is None:
+                lock = self._locks[room_id] = threading.RLock()
+        return lock
+
+    def bind_session(self, sid, room_id, player_id):
+        self._sessions[sid] = (room_id, player_id)
+
+    def unbind_session(self, sid):
+        if sid is not None:
+            self._sessions.pop(sid, None)
+
+    def get_session(self, sid):
+        return self._sessions.get(sid)
+
+    def sessions(self):
+        return list(self._sessions.items())
+
+
+class RedisRoomStore(RoomStore):
+    # 방 하나 = JSON 문자열 키 하나. 여러 워커가 같은 Redis를 공유합니다.
+    # redis-py / fakeredis 클라이언트 모두 사용 가능 (client 인자로 주입)
+    def __init__(self, client, prefix="liar:", lock_timeout=30, lock_wait=10):
+        self.client = client
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis  # 선택 의존성: Redis 백엔드를 쓸 때만 필요
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _room_key(self, room_id):
+        return f"{self.prefix}room:{room_id}"
+
+    @property
+    def _index_key(self):
+        return f"{self.prefix}rooms"
+
+    @property
+    def _sessions_key(self):
+        return f"{self.prefix}sessions"
+
+    def get(self, room_id):
+        if room_id is None:
+            return None
+        raw = self.client.get(self._room_key(room_id))
+        if raw is None:
+            return None
+        return decode_room(raw)
+
+    def create(self, room):
+        created = self.client.set(self._room_key(room.id), encode_room(room), nx=True)
+        if created:
+            self.client.sadd(self._index_key, room.id)
+        return bool(created)
+
+    def save(self, room):
+        pipe = self.client.pipeline()
+        pipe.set(self._room_key(room.id), encode_room(room))
+        pipe.sadd(self._index_key, room.id)
+        pipe.execute()
+
+    def delete(self, room_id):
+        pipe = self.client.pipeline()
+        pipe.delete(self._room_key(room_id))
+        pipe.srem(self._index_key, room_id)
+        pipe.execute()
+
+    def exists(self, room_id):
+        return room_id is not None and bool(self.client.exists(self._room_key(room_id)))
+
+    def room_ids(self):
+        return [rid.decode() if isinstance(rid, bytes) else rid for rid in self.client.smembers(self._index_key)]
+
+    def count(self):
+        return self.client.scard(self._index_key)
+
+    @contextmanager
+    def lock(self, room_id):
+        # SET NX PX + 토큰 비교 해제 (Lua 스크립트 없이 동작하므로 fakeredis에서도 사용 가능)
+        key = f"{self.prefix}lock:{room_id}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_wait
+        while not self.client.set(key, token, nx=True, px=int(self.lock_timeout * 1000)):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"room lock timeout: {room_id}")
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            self._release_lock(key, token)
+
+    def _release_lock(self, key, token):
+        # 내 토큰일 때만 삭제 (만료 후 다른 워커가 잡은 락을 지우지 않도록)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.get(key)
+                if current is not None and (current.decode() if isinstance(current, bytes) else current) == token:
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.execute()
+            except Exception as e:  # WatchError 등: 이미 다른 워커가 가져간 락
+                print(f"Warning: failed to release room lock {key}: {e}")
+
+    def bind_session(self, sid, room_id, player_id):
+        self.client.hset(self._sessions_key, sid, json.dumps([room_id, player_id]))
+
+    def unbind_session(self, sid):
+        if sid is not None:
+            self.client.hdel(self._sessions_key, sid)
+
+    def get_session(self, sid):
+        raw = self.client.hget(self._sessions_key, sid)
+        if raw is None:
+            return None
+        room_id, player_id = json.loads(raw)
+        return room_id, player_id
+
+    def sessions(self):
+        result = []
+        for sid, raw in self.client.hgetall(self._sessions_key).items():
+            if isinstance(sid, bytes):
+                sid = sid.decode()
+            room_id, player_id = json.loads(raw)
+            result.append((sid, (room_id, player_id)))
+        return result
+
+
+def create_room_store(url=None):
+    # ROOM_STORE_URL이 redis:// 로 시작하면 Redis, 아니면 프로세스 메모리
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        print(f"Using Redis room store: {url}")
+        return RedisRoomStore.from_url(url)
+    return InMemoryRoomStore()
@@ -0,0 +1,223 @@
+import uuid
+
+import eventlet
+
+from message_log import messages_since
+from models import wire_json
+
+
+# ---------------------
+# 관전 (읽기 전용 방송)
+# ---------------------
+# 관전자는 방의 Socket.IO 룸(room.id)이 아니라 워커별 관전 채널('spectate:<방 ID>:<워커>')에 들어갑니다.
+# 참가자용 'roomState'/'roomPatch'에는 제시어가 들어 있으므로 관전자에게는 보내지 않고,
+# 방마다 관전용 그림자 상태(shadow)를 따로 두어 제시어를 뺀 패치를 만듭니다.
+# - 변경 한 번당 패치 하나를 만들어 JSON을 한 번만 인코딩하고(bytes), 채널로 한 번 보냅니다.
+#   Socket.IO는 바이너리 첨부로 보내므로 관전자 수와 관계없이 모두 같은 바이트를 받습니다. (관전자별 직렬화 없음)
+# - tick > 0 이면 그동안의 변경을 모아 tick마다 패치 하나로 보냅니다. (0이면 변경마다 바로)
+# - 다른 워커에서 바뀐 방은 room.updated_at으로 감지합니다 (tick 또는 poll_interval마다 확인).
+# 관전 패치 순번(seq)은 참가자용과 별개이며, 건너뛰면 클라이언트가 'request_sync'로 스냅샷을 다시 받습니다.
+# 관전 상태는 이 워커 메모리에만 있습니다. (재시작하면 관전자가 'spectate'로 다시 들어옴)
+# 사람 참가자 ID(= 클라이언트가 보내는 userId)는 관전자에게 보내지 않고 입장 순번 별칭('p1', 'p2', ...)으로 바꿉니다.
+# (room.seat_numbers: 나간 참가자도 번호가 남아 있어 지난 메시지/표의 별칭이 바뀌지 않음. AI ID는 그대로)
+SPECTATOR_HIDDEN = ('liar_word', 'citizen_word')
+
+
+def player_alias(room):
+    # → 플레이어 ID를 관전용 별칭으로 바꾸는 함수 (번호 없는 사람 ID는 '?'로)
+    numbers = room.seat_numbers
+    ai_ids = {ai.id for ai in room.ai_players}
+
+    def alias(player_id):
+        if player_id is None or player_id in ai_ids:
+            return player_id
+        number = numbers.get(player_id)
+        return f"p{number}" if number is not None else '?'
+    return alias
+
+
+def spectator_fields(room):
+    fields = room.public_fields()
+    for name in SPECTATOR_HIDDEN:
+        fields.pop(name, None)
+    alias = player_alias(room)
+    fields['operator_id'] = alias(fields['operator_id'])
+    fields['humans'] = [dict(human, id=alias(human['id'])) for human in fields['humans']]
+    fields['turn_order'] = [alias(player_id) for player_id in fields['turn_order']]
+    fields['votes'] = {alias(voter): alias(target) for voter, target in fields['votes'].items()}
+    fields['vote_tally'] = {alias(target): count for target, count in fields['vote_tally'].items()}
+    if fields['vote_result'] is not None:
+        result = fields['vote_result']
+        fields['vote_result'] = dict(result, target=alias(result['target']), liar=alias(result['liar']))
+    return fields
+
+
+def spectator_messages(room, messages):
+    # wire 형태 메시지 목록의 보낸 사람 ID를 별칭으로 (스크롤백으로 읽은 보관 메시지에도 사용)
+    alias = player_alias(room)
+    return [dict(message, sender=alias(message['sender'])) if message.get('sender_type') else message for message in messages]
+
+
+class SpectatorStream:
+    __slots__ = ('viewers', 'seq', 'shadow', 'sent_messages', 'seen_at')
+
+    def __init__(self, room):
+        self.viewers = set()
+        self.seq = 0
+        self.shadow = spectator_fields(room)
+        self.sent_messages = room.message_count
+        self.seen_at = room.updated_at
+
+
+class SpectatorHub:
+    def __init__(self, load_room, emit, close_channel, tick=0.2, poll_interval=1.0):
+        self.load_room = load_room # 방 ID -> Room | None (락 없이 읽음: 관전용이라 한 tick 늦어도 됨)
+        self.emit = emit # (event, payload, to) -> 전송
+        self.close_channel = close_channel # 채널 이름 -> Socket.IO 룸 정리
+        self.tick = tick
+        self.poll_interval = poll_interval
+        self.node = uuid.uuid4().hex[:8]
+        self._streams = {} # 방 ID -> SpectatorStream
+        self._viewers = {} # sid -> 방 ID
+        self._dirty = set()
+        self._started = False
+        self.stats = {'joined': 0, 'frames': 0, 'frame_bytes': 0, 'deliveries': 0, 'coalesced': 0, 'snapshots': 0}
+
+    def channel(self, room_id):
+        return f"spectate:{room_id}:{self.node}"
+
+    def room_of(self, sid):
+        return self._viewers.get(sid)
+
+    def viewer_count(self):
+        return len(self._viewers)
+
+    def _ensure_started(self):
+        # 첫 관전자가 들어올 때 green thread를 띄움
+        if self._started:
+            return
+        self._started = True
+        eventlet.spawn(self._run)
+
+    def join(self, sid, room):
+        # → 새 관전자에게 보낼 스냅샷(bytes). 호출 측이 sid를 channel()에 넣고 'spectatorState'로 보냄
+        self._ensure_started()
+        self.leave(sid)
+        stream = self._streams.get(room.id)
+        if stream is None:
+            stream = self._streams[room.id] = SpectatorStream(room)
+        frame = self.state_frame(room)
+        stream.viewers.add(sid)
+        self._viewers[sid] = room.id
+        self.stats['joined'] += 1
+        return frame
+
+    def leave(self, sid):
+        room_id = self._viewers.pop(sid, None)
+        stream = self._streams.get(room_id)
+        if stream is not None:
+            stream.viewers.discard(sid)
+            if not stream.viewers:
+                del self._streams[room_id]
+                self._dirty.discard(room_id)
+        return room_id
+
+    def state_frame(self, room):
+        # 밀린 변경을 먼저 보내 shadow를 현재 상태에 맞춘 뒤, 그 순번의 전체 상태를 만듦
+        stream = self._streams[room.id]
+        self._flush(room, stream)
+        state = spectator_fields(room)
+        state['seq'] = stream.seq
+        state['messages'] = spectator_messages(room, [message.to_wire() for message in room.messages])
+        self.stats['snapshots'] += 1
+        return wire_json.dumpb(state)
+
+    def changed(self, room):
+        # 방 상태가 바뀔 때마다 호출 (락 안). 관전자가 없으면 아무것도 하지 않음
+        stream = self._streams.get(room.id)
+        if stream is None:
+            return
+        if self.tick <= 0:
+            self._flush(room, stream)
+        elif room.id in self._dirty:
+            self.stats['coalesced'] += 1
+        else:
+            self._dirty.add(room.id)
+
+    def closed(self, room_id, reason, room=None):
+        # 방이 없어짐 → (room이 있으면 밀린 변경을 먼저 보내고) 이 워커의 관전자에게 알리고 정리
+        stream = self._streams.pop(room_id, None)
+        self._dirty.discard(room_id)
+        if stream is None:
+            return
+        if room is not None:
+            self._flush(room, stream)
+        for sid in stream.viewers:
+            self._viewers.pop(sid, None)
+        self.emit('roomClosed', {'roomId': room_id, 'reason': reason}, self.channel(room_id))
+        self.close_channel(self.channel(room_id))
+
+    def _flush(self, room, stream):
+        stream.seen_at = room.updated_at
+        if room.message_count - stream.sent_messages > len(room.messages):
+            # 창 밖으로 밀려난 메시지가 있음 → 패치 대신 스냅샷
+            stream.shadow = spectator_fields(room)
+            stream.sent_messages = room.message_count
+            stream.seq += 1
+            messages = spectator_messages(room, [message.to_wire() for message in room.messages])
+            state = dict(stream.shadow, seq=stream.seq, messages=messages)
+            self._send('spectatorState', wire_json.dumpb(state), room.id, stream)
+            return
+
+        shadow = stream.shadow
+        current = spectator_fields(room)
+        changes = {key: value for key, value in current.items() if shadow.get(key) != value}
+        new_messages = messages_since(room, stream.sent_messages)
+        if not changes and not new_messages:
+            return
+        shadow.update(changes)
+        stream.sent_messages = room.message_count
+        stream.seq += 1
+        frame = wire_json.dumpb({
+            'roomId': room.id,
+            'seq': stream.seq,
+            'changes': changes,
+            'messages': spectator_messages(room, [message.to_wire() for message in new_messages]),
+        })
+        self._send('spectatorPatch', frame, room.id, stream)
+
+    def _send(self, event, frame, room_id, stream):
+        self.stats['frames'] += 1
+        self.stats['frame_bytes'] += len(frame)
+        self.stats['deliveries'] += len(stream.viewers)
+        self.emit(event, frame, self.channel(room_id))
+
+    def flush_due(self):
+        # tick마다: 이 워커에서 바뀐 방(dirty) + 다른 워커에서 바뀐 방(updated_at)의 모인 변경을 보냄
+        dirty, self._dirty = self._dirty, set()
+        for room_id in list(self._streams):
+            try:
+                room = self.load_room(room_id)
+                stream = self._streams.get(room_id)
+                if stream is None:
+                    continue # 불러오는 사이에 관전자가 모두 나감
+                if room is None:
+                    self.closed(room_id, 'deleted')
+                elif room_id in dirty or room.updated_at != stream.seen_at:
+                    self._flush(room, stream)
+            except Exception as e:
+                print(f"Error while broadcasting to spectators of {room_id}: {e}")
+
+    def _run(self):
+        while True:
+            eventlet.sleep(self.tick if self.tick > 0 else self.poll_interval)
+            self.flush_due()
+
+    def snapshot(self):
+        return {
+            'tick': self.tick,
+            'rooms': len(self._streams),
+            'viewers': len(self._viewers),
+            'dirty': len(self._dirty),
+            **self.stats,
+        }
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import time
+
+from flask import Flask, Response, request, jsonify
+
+# ---------------------
+# 로컬 테스트용 OpenAI 호환 서버 (chat.completions만 지원)
+# ---------------------
+# 실행:
+#   python tools/mock_openai_server.py
+# 게임 서버를 이 서버에 연결:
+#   OPENAI_BASE_URL=http://localhost:8001/v1 GPT_API_KEY_1=mock ... AI_STREAMING=1 python api.py
+#
+# MOCK_FIRST_TOKEN_MS: 첫 토큰까지 지연, MOCK_TOKEN_MS: 토큰 간 지연
+# 같은 프롬프트에는 항상 같은 답변을 돌려줍니다.
+
+app = Flask(__name__)
+
+FIRST_TOKEN_MS = int(os.getenv("MOCK_FIRST_TOKEN_MS", "300"))
+TOKEN_MS = int(os.getenv("MOCK_TOKEN_MS", "30"))
+
+ANSWERS = [
+    "음, 어릴 때 기억이 떠오르네요.",
+    "그건 주말에 자주 보게 되는 것 같아요.",
+    "가족들이랑 함께할 때 생각나요.",
+    "딱 들으면 계절 하나가 떠오르는데요.",
+    "아까 그 말씀은 조금 애매했던 것 같습니다.",
+    "저는 방금 발언하신 분이 좀 의심스러워요.",
+]
+
+
+def pick_answer(messages):
+    prompt = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha1(prompt.encode("utf-8")).digest()
+    return ANSWERS[digest[0] % len(ANSWERS)]
+
+
+def completion_id():
+    return f"chatcmpl-mock-{time.time_ns()}"
+
+
+@app.route("/v1/chat/completions", methods=["POST"])
+def chat_completions():
+    body = request.get_json(force=True)
+    model = body.get("model", "mock")
+    messages = body.get("messages", [])
+    answer = pick_answer(messages)
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 2
+    created = int(time.time())
+
+    if not body.get("stream"):
+        time.sleep((FIRST_TOKEN_MS + TOKEN_MS * len(answer)) / 1000)
+        return jsonify({
+            "id": completion_id(),
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(answer),
+                "total_tokens": prompt_tokens + len(answer),
+            },
+        })
+
+    def stream():
+        chunk_id = completion_id()
+
+        def chunk(delta, finish_reason=None):
+            payload = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        time.sleep(FIRST_TOKEN_MS / 1000)
+        yield chunk({"role": "assistant", "content": ""})
+        for char in answer:
+            yield chunk({"content": char})
+            time.sleep(TOKEN_MS / 1000)
+        yield chunk({}, finish_reason="stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(answer),
+                    "total_tokens": prompt_tokens + len(answer),
+                },
+            }
+            yield f"data: {json.dumps(usage, ensure_ascii=False)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return Response(stream(), mimetype="text/event-stream")
+
+
+if __name__ == "__main__":
+    port = int(os.getenv("MOCK_OPENAI_PORT", "8001"))
+    print(f"Mock OpenAI server on http://localhost:{port}/v1")
+    app.run(host="0.0.0.0", port=port, threaded=True)
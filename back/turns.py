@@ -0,0 +1,52 @@
+# ---------------------
+# 발언 순서 (턴 스케줄러)
+# ---------------------
+# 진술/토론 페이즈마다 사람 참가자가 한 명씩 발언하고, 운영자(라이어)는 항상 마지막에 발언합니다.
+# (운영자 진술은 AI 진술과 섞여서 공개되므로, 운영자 차례가 되면 AI 답변 생성을 시작/사용)
+#   room.turn       : 'waiting'(게임 시작 전) | 'speaking'(누군가 발언할 차례) | 'reveal'(운영자 진술 보류, AI 대기)
+#                     | 'voting' | 'ended'
+#   room.turn_order : 이번 페이즈 발언 순서 (시민 입장 순서 + 운영자)
+#   room.turn_index : 지금 발언할 사람의 위치
+# 페이즈를 시작할 때 순서를 한 번 만들고(O(사람 수)), 차례 넘기기는 인덱스만 올립니다(O(1)).
+# 클라이언트는 turn_order[turn_index]가 자기 ID인지로 자기 차례를 판단합니다.
+
+
+def start_turns(room):
+    room.turn_order = [seat.id for seat in room.citizens()] + [room.operator_id]
+    room.turn_index = 0
+    room.turn = 'speaking'
+
+
+def current_speaker(room):
+    if room.turn != 'speaking' or room.turn_index >= len(room.turn_order):
+        return None
+    return room.turn_order[room.turn_index]
+
+
+def next_speaker(room):
+    # 지금 발언자 다음 차례 (없으면 None)
+    index = room.turn_index + 1
+    return room.turn_order[index] if room.turn == 'speaking' and index < len(room.turn_order) else None
+
+
+def is_operator_turn(room):
+    return current_speaker(room) == room.operator_id
+
+
+def advance_turn(room):
+    # → 다음 발언자 ID. 운영자 다음은 없음 (운영자 진술 후 공개는 호출 측이 처리)
+    room.turn_index += 1
+    return current_speaker(room)
+
+
+def remove_from_turns(room, player_id):
+    # 나간 참가자를 순서에서 뺌 → 그 사람 차례였으면 True (차례가 다음 사람에게 넘어감)
+    try:
+        index = room.turn_order.index(player_id)
+    except ValueError:
+        return False
+    del room.turn_order[index]
+    if index < room.turn_index:
+        room.turn_index -= 1
+        return False
+    return room.turn == 'speaking' and index == room.turn_index
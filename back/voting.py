@@ -0,0 +1,134 @@
+import re
+
+# ---------------------
+# 투표
+# ---------------------
+# 투표 상태는 방(models.Room) 필드로만 관리합니다. (저장소/저널이 그대로 다룰 수 있도록)
+#   votes        : 투표한 사람 ID -> 지목한 사람 ID (마감 전에는 다시 투표해 바꿀 수 있음)
+#   vote_tally   : 지목된 사람 ID -> 득표 수. 표가 들어올 때마다 ±1만 갱신 (다시 세지 않음)
+#   vote_deadline: 마감 시각 (epoch ms). 타이머는 api.py가 수명 관리 스케줄러에 걸어 둠
+#   vote_result  : 마감 후 결과 (None이면 아직 진행 중)
+# 투표자/후보는 사람 참가자(운영자 포함) + AI 전원이며, 자기 자신은 지목할 수 없습니다.
+# 표 하나를 처리할 때 명단을 다시 만들지 않음 (투표자 수는 room.player_count(), 자격 확인은 room.player_name()).
+# 최다 득표자가 라이어(운영자)면 시민 승리, 동점이거나 다른 사람이면 라이어 승리입니다.
+
+
+class VoteError(Exception):
+    """받을 수 없는 투표 (code: not_voting | not_voter | bad_target)"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def voter_names(room):
+    # 투표자(=후보) ID -> 닉네임 (나간 참가자는 빠짐). 투표마다 한 번만 만들어 AI 표 처리에 씀
+    names = {seat.id: seat.name for seat in room.humans.values()}
+    for ai in room.ai_players:
+        names[ai.id] = ai.name
+    return names
+
+
+def start_vote(room, deadline_ms):
+    room.turn = 'voting'
+    room.votes = {}
+    room.vote_tally = {}
+    room.vote_deadline = deadline_ms
+    room.vote_result = None
+
+
+def cast_vote(room, voter_id, target_id, names=None):
+    # → 표가 바뀌었는지. 같은 대상에 다시 투표하면 False
+    if room.turn != 'voting':
+        raise VoteError('not_voting', '투표 시간이 아닙니다.')
+    def is_player(player_id):
+        return player_id in names if names is not None else room.player_name(player_id) is not None
+
+    if not is_player(voter_id):
+        raise VoteError('not_voter', '투표할 수 없는 사용자입니다.')
+    if target_id == voter_id or not is_player(target_id):
+        raise VoteError('bad_target', '지목할 수 없는 대상입니다.')
+
+    previous = room.votes.get(voter_id)
+    if previous == target_id:
+        return False
+    tally = room.vote_tally
+    if previous is not None:
+        tally[previous] -= 1
+        if not tally[previous]:
+            del tally[previous]
+    room.votes[voter_id] = target_id
+    tally[target_id] = tally.get(target_id, 0) + 1
+    return True
+
+
+def withdraw_vote(room, voter_id):
+    # 투표 중에 나간 참가자의 표 회수 (그 사람을 지목한 표는 그대로 둠)
+    target = room.votes.pop(voter_id, None)
+    if target is not None:
+        room.vote_tally[target] -= 1
+        if not room.vote_tally[target]:
+            del room.vote_tally[target]
+
+
+def all_voted(room):
+    return len(room.votes) >= room.player_count()
+
+
+def close_vote(room, reason):
+    # 투표마다 갱신한 vote_tally(표를 받은 후보만 있음)에서 최댓값을 찾으므로 투표자 수와 관계없이 후보 수만큼만 비교
+    tally = room.vote_tally
+    top = max(tally.values(), default=0)
+    leaders = [target for target, count in tally.items() if count == top]
+    target = leaders[0] if len(leaders) == 1 else None
+    room.vote_result = {
+        'target': target,
+        'count': top,
+        'tie': len(leaders) > 1,
+        'liar': room.operator_id,
+        'winner': 'citizens' if target == room.operator_id else 'liar',
+        'reason': reason, # 'complete' (전원 투표) | 'timeout'
+        'voted': len(room.votes),
+        'total': room.player_count(),
+    }
+    room.turn = 'ended'
+    return room.vote_result
+
+
+def result_message(room, names=None):
+    names = names or voter_names(room)
+    result = room.vote_result
+    liar = names.get(result['liar'], '운영자')
+    if result['target'] is None:
+        picked = "최다 득표가 동점이라 아무도 지목되지 않았습니다." if result['tie'] else "아무도 투표하지 않았습니다."
+    else:
+        picked = f"{names.get(result['target'], '알 수 없음')} 님이 {result['count']}표로 지목되었습니다."
+    winner = "시민 승리!" if result['winner'] == 'citizens' else "라이어 승리!"
+    return f"--- 투표 결과: {picked} 라이어는 {liar} 님이었습니다. {winner} ---"
+
+
+def vote_update(room, changed):
+    # 'voteUpdate' 이벤트 (방 전체 패치 대신): 이번에 들어온 표 + 득표 현황만
+    return {
+        'roomId': room.id,
+        'votes': changed,
+        'tally': dict(room.vote_tally),
+        'voted': len(room.votes),
+        'total': room.player_count(),
+    }
+
+
+_NAME_NOISE = re.compile(r"[\s\"'`.,!?~()\[\]<>:]")
+
+
+def match_vote_target(text, names, voter_id):
+    # AI 답변에서 지목한 닉네임 찾기 (가장 긴 닉네임 우선: '곰' < '북극곰'). 못 찾으면 None
+    compact = _NAME_NOISE.sub('', text or '')
+    best = None
+    for target_id, name in names.items():
+        if target_id == voter_id or not name:
+            continue
+        key = _NAME_NOISE.sub('', name)
+        if key and key in compact and (best is None or len(key) > len(best[1])):
+            best = (target_id, key)
+    return best[0] if best else None
@@ -0,0 +1,242 @@
+import json
+import os
+import random
+from collections import deque
+
+# ---------------------
+# 제시어 뱅크
+# ---------------------
+# 주제/단어 데이터를 파일에서 읽어, 방을 만들 때 (주제, 라이어 단어, 시민 단어)를 뽑습니다.
+# 로딩할 때 색인을 한 번만 만들어 두므로 뽑기는 데이터 크기와 관계없이 상수 시간입니다.
+#   - words: 모든 단어 (정수 ID = 리스트 위치)
+#   - by_topic_tier[(topic, tier)]: 주제별로 해당 등급 이하 단어 ID 리스트 (임의 원소 O(1))
+#   - by_tag[(topic, tag)]: 같은 태그를 가진 단어 ID 리스트 (비슷한 단어 짝 O(1))
+#
+# 파일 형식 (디렉터리면 안의 *.tsv / *.json 전부):
+#   .tsv  : 주제<TAB>단어[<TAB>등급[<TAB>태그1|태그2...]]   ('#'으로 시작하는 줄은 주석)
+#   .json : {"주제": ["단어", {"word": "단어", "tier": 2, "tags": ["태그"]}, ...]}
+# 등급(tier): 1 = 누구나 아는 단어 ~ 3 = 드문 단어 (기본 1)
+#
+# 난이도 (DIFFICULTIES):
+#   easy   : 1등급 단어만, 서로 다른 태그의 단어 짝 (라이어가 티 나기 쉬움)
+#   normal : 2등급까지, 짝은 무작위
+#   hard   : 3등급까지, 태그가 겹치는 비슷한 단어 짝 (시민/라이어 단어가 헷갈림)
+
+DIFFICULTIES = {
+    'easy': {'max_tier': 1, 'similar': False},
+    'normal': {'max_tier': 2, 'similar': None},
+    'hard': {'max_tier': 3, 'similar': True},
+}
+MAX_TIER = 3
+
+
+class WordBankError(Exception):
+    """제시어 데이터를 읽을 수 없거나 단어 짝을 만들 수 없음"""
+
+
+class WordBank:
+    def __init__(self, entries, recent_size=256, max_attempts=16, rng=None):
+        # entries: (주제, 단어, 등급, 태그 tuple) 반복자
+        self.rng = rng or random # 기본은 모듈 random (GAME_SEED가 그대로 적용됨)
+        self.max_attempts = max_attempts
+        self.words = []
+        self.topics = []
+        self.word_topic = [] # word id -> topic index
+        self.word_tier = []
+        self.word_tags = []
+        self.by_topic_tier = {} # (topic index, tier) -> [word id]
+        self.by_tag = {} # (topic index, tag) -> [word id]
+        self.topic_tiers = {tier: [] for tier in range(1, MAX_TIER + 1)} # 해당 등급 이하 단어가 2개 이상인 topic
+        self.skipped = 0 # 등급이 잘못되어 건너뛴 항목 수
+        self._build(entries)
+
+        # 최근에 나온 짝 (서버 단위, 크기 제한): deque로 순서, set으로 O(1) 조회
+        self.recent_size = recent_size
+        self._recent = deque()
+        self._recent_set = set()
+        self.stats = {'picked': 0, 'recent_retries': 0, 'similar_misses': 0}
+
+    def _build(self, entries):
+        topic_index = {}
+        seen = set()
+        for topic, word, tier, tags in entries:
+            if (topic, word) in seen:
+                continue
+            # 💡 [수정] 등급이 숫자가 아닌 항목 하나 때문에 서버가 뜨지 못하는 일이 없도록 건너뛰고 기록
+            try:
+                tier = min(max(int(tier), 1), MAX_TIER)
+            except (TypeError, ValueError):
+                print(f"Skipping word bank entry with bad tier: {topic}/{word} ({tier!r})")
+                self.skipped += 1
+                continue
+            seen.add((topic, word))
+            t = topic_index.get(topic)
+            if t is None:
+                t = topic_index[topic] = len(self.topics)
+                self.topics.append(topic)
+            word_id = len(self.words)
+            self.words.append(word)
+            self.word_topic.append(t)
+            self.word_tier.append(tier)
+            self.word_tags.append(frozenset(tags))
+            for max_tier in range(tier, MAX_TIER + 1):
+                self.by_topic_tier.setdefault((t, max_tier), []).append(word_id)
+            for tag in tags:
+                self.by_tag.setdefault((t, tag), []).append(word_id)
+
+        for (t, max_tier), word_ids in self.by_topic_tier.items():
+            if len(word_ids) >= 2:
+                self.topic_tiers[max_tier].append(t)
+        if not self.topic_tiers[MAX_TIER]:
+            raise WordBankError("word bank needs at least one topic with two words")
+
+    def __len__(self):
+        return len(self.words)
+
+    # ---------------------
+    # 단어 짝 유사도
+    # ---------------------
+    def _similar_partner(self, word_id, max_tier):
+        # 같은 태그 버킷에서 하나 (태그 하나 고르고 → 버킷에서 하나: O(1))
+        tags = self.word_tags[word_id]
+        if not tags:
+            return None
+        t = self.word_topic[word_id]
+        bucket = self.by_tag[(t, self.rng.choice(tuple(tags)))]
+        partner = self.rng.choice(bucket)
+        if partner == word_id or self.word_tier[partner] > max_tier:
+            return None
+        return partner
+
+    def _dissimilar_partner(self, word_id, max_tier):
+        bucket = self.by_topic_tier[(self.word_topic[word_id], max_tier)]
+        partner = self.rng.choice(bucket)
+        if partner == word_id or self.word_tags[partner] & self.word_tags[word_id]:
+            return None
+        return partner
+
+    def _random_partner(self, word_id, max_tier):
+        partner = self.rng.choice(self.by_topic_tier[(self.word_topic[word_id], max_tier)])
+        return None if partner == word_id else partner
+
+    # ---------------------
+    # 뽑기
+    # ---------------------
+    def pick(self, difficulty='normal'):
+        # → (주제, 라이어 단어, 시민 단어). 시도 횟수가 max_attempts로 묶여 있어 데이터 크기와 무관
+        settings = DIFFICULTIES.get(difficulty) or DIFFICULTIES['normal']
+        max_tier = settings['max_tier']
+        if not self.topic_tiers[max_tier]:
+            max_tier = MAX_TIER
+        fallback = None
+        for _ in range(self.max_attempts):
+            # 주제를 먼저 고른 뒤 (주제 균등) 그 주제에서 단어 2개
+            t = self.rng.choice(self.topic_tiers[max_tier])
+            citizen = self.rng.choice(self.by_topic_tier[(t, max_tier)])
+            if settings['similar'] is True:
+                liar = self._similar_partner(citizen, max_tier)
+            elif settings['similar'] is False:
+                liar = self._dissimilar_partner(citizen, max_tier)
+            else:
+                liar = self._random_partner(citizen, max_tier)
+            if liar is None:
+                if settings['similar'] is not None:
+                    self.stats['similar_misses'] += 1
+                continue
+            if self._pair_key(citizen, liar) in self._recent_set:
+                self.stats['recent_retries'] += 1
+                if fallback is None:
+                    fallback = (citizen, liar)
+                continue
+            return self._use(citizen, liar)
+
+        # 조건에 맞는 짝을 못 찾으면 (데이터가 작거나 최근 기록이 가득) 조건을 풀어서라도 게임은 시작
+        if fallback is None:
+            t = self.rng.choice(self.topic_tiers[max_tier])
+            fallback = tuple(self.rng.sample(self.by_topic_tier[(t, max_tier)], 2))
+        return self._use(*fallback)
+
+    @staticmethod
+    def _pair_key(a, b):
+        return (a, b) if a < b else (b, a)
+
+    def _use(self, citizen, liar):
+        key = self._pair_key(citizen, liar)
+        if key not in self._recent_set:
+            self._recent.append(key)
+            self._recent_set.add(key)
+            while len(self._recent) > self.recent_size:
+                self._recent_set.discard(self._recent.popleft())
+        self.stats['picked'] += 1
+        topic = self.topics[self.word_topic[citizen]]
+        return topic, self.words[liar], self.words[citizen]
+
+    def snapshot(self):
+        return {
+            'words': len(self.words),
+            'topics': len(self.topics),
+            'tags': len(self.by_tag),
+            'recent': len(self._recent),
+            'recent_size': self.recent_size,
+            'skipped': self.skipped,
+            **self.stats,
+        }
+
+
+# ---------------------
+# 데이터 파일 읽기
+# ---------------------
+def _read_tsv(path):
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            if len(fields) < 2 or not fields[0].strip() or not fields[1].strip():
+                print(f"Skipping malformed word bank line {path}:{line_no}")
+                continue
+            tier = fields[2].strip() if len(fields) > 2 and fields[2].strip() else 1
+            tags = tuple(tag.strip() for tag in fields[3].split('|') if tag.strip()) if len(fields) > 3 else ()
+            yield fields[0].strip(), fields[1].strip(), tier, tags
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    for topic, words in data.items():
+        for item in words:
+            if isinstance(item, str):
+                yield topic, item, 1, ()
+            elif isinstance(item, dict) and isinstance(item.get('word'), str) and item['word'].strip():
+                tags = item.get('tags') or ()
+                tags = tuple(str(tag) for tag in tags) if isinstance(tags, (list, tuple)) else ()
+                yield topic, item['word'].strip(), item.get('tier', 1), tags
+            else:
+                print(f"Skipping malformed word bank entry {path}: {topic} {item!r}")
+
+
+def read_word_entries(path):
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(('.tsv', '.json')):
+                yield from read_word_entries(os.path.join(path, name))
+        return
+    if path.endswith('.json'):
+        yield from _read_json(path)
+    else:
+        yield from _read_tsv(path)
+
+
+DEFAULT_WORD_BANK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "words.tsv")
+
+
+def load_word_bank(spec=None, **kwargs):
+    # spec: 파일 또는 디렉터리 경로 (여러 개는 ','로 구분). 없으면 data/words.tsv
+    paths = [p.strip() for p in (spec or DEFAULT_WORD_BANK).split(',') if p.strip()]
+    try:
+        bank = WordBank((entry for path in paths for entry in read_word_entries(path)), **kwargs)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise WordBankError(f"cannot read word bank {spec!r}: {e}") from e
+    print(f"Word bank: {len(bank)} words in {len(bank.topics)} topics ({', '.join(paths)})")
+    return bank
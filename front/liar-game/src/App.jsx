@@ -9,14 +9,32 @@ const SOCKET_SERVER_URL = "http://localhost:5000";
 let socket;
 
 // 고유 사용자 ID 생성
+// 💡 [수정] 새로고침 후에도 같은 방에 복귀할 수 있도록 탭(sessionStorage) 단위로 유지
 const generateUserId = () => {
   // eslint-disable-next-line no-undef
   const token = typeof __initial_auth_token !== 'undefined' ? __initial_auth_token : null;
-  return token || crypto.randomUUID();
+  if (token) return token;
+  const saved = sessionStorage.getItem('liarUserId');
+  if (saved) return saved;
+  const created = crypto.randomUUID();
+  sessionStorage.setItem('liarUserId', created);
+  return created;
 };
 
 const MY_UNIQUE_USER_ID = generateUserId();
 
+// 💡 [추가] 재접속 토큰 저장소 ({ roomId, role, token })
+const SESSION_KEY = 'liarSession';
+const loadSession = () => {
+  try { return JSON.parse(sessionStorage.getItem(SESSION_KEY)); } catch { return null; }
+};
+const saveSession = (session) => sessionStorage.setItem(SESSION_KEY, JSON.stringify(session));
+const clearSession = () => sessionStorage.removeItem(SESSION_KEY);
+
+// 💡 [추가] 관전 프레임은 서버가 한 번 인코딩한 UTF-8 JSON 바이트 그대로 옴
+const frameDecoder = new TextDecoder();
+const decodeFrame = (frame) => JSON.parse(frameDecoder.decode(frame));
+
 // 💡 [삭제] 닉네임 생성을 위한 동물 이름 리스트
 // const ANIMAL_NAMES = [ ... ];
 
@@ -27,8 +45,11 @@ const MY_UNIQUE_USER_ID = generateUserId();
 // --- 컴포넌트 정의 ---
 
 // 💡 [수정] 로비 화면 (디자인 유지)
-function LobbyScreen({ onJoin, onCreate }) {
+function LobbyScreen({ onJoin, onCreate, onSpectate }) {
   const [roomId, setRoomId] = useState("");
+  // 💡 [추가] 방 인원: 사람 참가자 수(운영자 포함) / AI 수 (서버 상한으로 다시 잘림)
+  const [maxPlayers, setMaxPlayers] = useState(2);
+  const [aiPlayers, setAiPlayers] = useState(4);
 
   return (
     <div className="flex flex-col items-center justify-center h-full text-white p-8">
@@ -36,9 +57,33 @@ function LobbyScreen({ onJoin, onCreate }) {
       <p className="text-xl mb-10 text-zinc-300">정보 축전 부스 에디션</p>
 
       <div className="w-full max-w-sm p-6 bg-zinc-800 rounded-2xl shadow-2xl border border-zinc-700">
+        {/* 💡 [추가] 방 인원 선택 */}
+        <div className="flex space-x-3 mb-3 text-sm text-zinc-300">
+          <label className="flex-1 flex flex-col">
+            사람 (운영자 포함)
+            <select
+              value={maxPlayers}
+              onChange={(e) => setMaxPlayers(Number(e.target.value))}
+              className="mt-1 px-3 py-2 bg-zinc-700 border border-zinc-600 rounded-lg text-white"
+            >
+              {[2, 3, 4, 5, 6, 7, 8].map(n => <option key={n} value={n}>{n}명</option>)}
+            </select>
+          </label>
+          <label className="flex-1 flex flex-col">
+            AI
+            <select
+              value={aiPlayers}
+              onChange={(e) => setAiPlayers(Number(e.target.value))}
+              className="mt-1 px-3 py-2 bg-zinc-700 border border-zinc-600 rounded-lg text-white"
+            >
+              {[1, 2, 3, 4, 5, 6, 7, 8].map(n => <option key={n} value={n}>{n}명</option>)}
+            </select>
+          </label>
+        </div>
+
         {/* 방 생성 (운영자) */}
         <button
-          onClick={onCreate}
+          onClick={() => onCreate({ maxPlayers, aiPlayers })}
                   // 💡 [수정] whitespace-nowrap 클래스 추가 (원본 유지)
           className="w-full bg-red-600 hover:bg-red-700 text-white font-bold py-3 px-4 rounded-lg text-lg shadow-lg shadow-red-500/30 transition-all duration-300 ease-in-out transform hover:scale-105 active:scale-95 mb-6 whitespace-nowrap"
         >
@@ -63,6 +108,14 @@ function LobbyScreen({ onJoin, onCreate }) {
           >
             방 참가
           </button>
+          {/* 💡 [추가] 관전 (읽기 전용, 제시어는 보이지 않음) */}
+          <button
+            onClick={() => onSpectate(roomId)}
+            disabled={roomId.length !== 6}
+            className="w-full bg-transparent border border-zinc-600 hover:bg-zinc-700 text-zinc-200 font-bold py-2 px-4 rounded-lg transition-all duration-300 disabled:opacity-50 disabled:cursor-not-allowed whitespace-nowrap"
+          >
+            관전하기
+          </button>
         </div>
       </div>
       <p className="mt-8 text-sm text-zinc-500">당신의 고유 ID: {MY_UNIQUE_USER_ID}</p>
@@ -72,7 +125,7 @@ function LobbyScreen({ onJoin, onCreate }) {
 
 // 룸 화면
 // 💡 [수정] nicknameMap 프롭 제거
-function RoomScreen({ roomState, onLeave, onSendMessage, isAILoading, isOperator }) {
+function RoomScreen({ roomState, onLeave, onSendMessage, onLoadHistory, onVote, onStartGame, isAILoading, aiProgress, isOperator, isSpectator }) {
   const { id: roomId, topic, liar_word, citizen_word, messages, phases_config, phase: phaseIndex } = roomState;
   
   // 💡 [수정] phases_config가 없을 경우 대비
@@ -95,7 +148,12 @@ function RoomScreen({ roomState, onLeave, onSendMessage, isAILoading, isOperator
         
         {/* 운영자/참가자 단어 표시 (디자인 유지) */}
         <div className="flex flex-col items-end text-right">
-          {isOperator ? (
+          {isSpectator ? (
+            <>
+              <span className="text-xs text-zinc-400">관전 중</span>
+              <span className="text-base font-medium text-zinc-300">제시어 비공개</span>
+            </>
+          ) : isOperator ? (
             <>
               <span className="text-xs text-zinc-400">내 단어 (라이어)</span>
               <span className="text-lg font-bold text-red-400">{liar_word}</span>
@@ -122,7 +180,19 @@ function RoomScreen({ roomState, onLeave, onSendMessage, isAILoading, isOperator
       <div className="p-3 bg-zinc-800 text-center">
         <span className="text-lg font-semibold text-yellow-400">{currentPhaseName}</span>
         {isAILoading && (
-          <span className="ml-3 text-sm text-zinc-400 animate-pulse">AI가 생각 중...</span>
+          <span className="ml-3 text-sm text-zinc-400 animate-pulse">
+            AI가 생각 중...{aiProgress && ` (${aiProgress.ready}/${aiProgress.total})`}
+          </span>
+        )}
+        {/* 💡 [추가] 운영자: 정원이 차기 전에 게임 시작 (시민이 1명 이상일 때) */}
+        {isOperator && roomState.turn === 'waiting' && (
+          <button
+            onClick={onStartGame}
+            disabled={(roomState.humans || []).length < 2}
+            className="ml-3 bg-red-600 hover:bg-red-700 text-sm px-3 py-1 rounded-md transition-all disabled:opacity-50 disabled:cursor-not-allowed"
+          >
+            게임 시작
+          </button>
         )}
       </div>
 
@@ -133,35 +203,50 @@ function RoomScreen({ roomState, onLeave, onSendMessage, isAILoading, isOperator
         isOperator={isOperator}
       />
 
+      {/* 💡 [추가] 투표 (투표 중 / 결과) */}
+      {(roomState.turn === 'voting' || roomState.turn === 'ended') && (
+        <VotePanel roomState={roomState} onVote={isSpectator ? null : onVote} />
+      )}
+
       {/* 채팅 메시지 */}
       <ChatMessages 
         messages={messages} 
         roomState={roomState} 
+        onLoadHistory={onLoadHistory}
         // 💡 [삭제] nicknameMap 프롭 제거
         isOperator={isOperator}
       />
 
-      {/* 하단 메시지 입력창 */}
-      <MessageBox
-        onSendMessage={onSendMessage}
-        isAILoading={isAILoading}
-        roomState={roomState}
-        isOperator={isOperator}
-      />
+      {/* 하단 메시지 입력창 (💡 [수정] 관전자는 읽기 전용) */}
+      {isSpectator ? (
+        <div className="p-4 bg-zinc-800 border-t border-zinc-700 text-center text-sm text-zinc-400 sticky bottom-0">
+          관전 중입니다. 발언과 투표는 참가자만 할 수 있습니다.
+        </div>
+      ) : (
+        <MessageBox
+          onSendMessage={onSendMessage}
+          isAILoading={isAILoading}
+          roomState={roomState}
+          isOperator={isOperator}
+        />
+      )}
     </div>
   );
 }
 
 // 💡 [수정] 참가자 목록: nicknameMap 대신 roomState에서 직접 이름 조회
 function PlayerList({ roomState, isOperator }) {
-  const { operator_id, user_id, ai_players, operator_name, user_name } = roomState;
+  const { operator_id, ai_players } = roomState;
   
-  // 모든 플레이어 병합
+  // 💡 [수정] 모든 플레이어 병합: 사람 참가자(운영자 포함, 입장 순서) + AI
   const allPlayers = [
-    { id: operator_id, name: "운영자 (라이어)", type: 'operator', nickname: operator_name || "운영자..." }, 
-    user_id ? { id: user_id, name: "참가자 (시민)", type: 'user', nickname: user_name || "참가자..." } : null,
+    ...(roomState.humans || []).map(human => ({
+      id: human.id,
+      type: human.id === operator_id ? 'operator' : 'user',
+      nickname: human.name || (human.id === operator_id ? "운영자..." : "참가자..."),
+    })),
     ...ai_players.map(ai => ({ ...ai, type: 'ai', nickname: ai.name })) // ai.name은 "AI 참가자 1" 등
-  ].filter(Boolean); // null 제거
+  ];
 
   return (
     <div className="flex justify-center space-x-2 p-2 bg-zinc-800 border-b border-zinc-700 overflow-x-auto whitespace-nowrap">
@@ -192,17 +277,85 @@ function PlayerList({ roomState, isOperator }) {
 }
 
 
+// 💡 [추가] 투표 패널: 후보(나 제외) 버튼 + 득표 수 + 남은 시간, 마감 후에는 결과
+function VotePanel({ roomState, onVote }) {
+  const { humans, ai_players, votes, vote_tally, vote_deadline, vote_result, turn } = roomState;
+  const [now, setNow] = useState(Date.now());
+
+  useEffect(() => {
+    if (turn !== 'voting') return;
+    const timer = setInterval(() => setNow(Date.now()), 1000);
+    return () => clearInterval(timer);
+  }, [turn]);
+
+  const candidates = [
+    ...(humans || []).map(human => ({ id: human.id, nickname: human.name || "참가자" })),
+    ...ai_players.map(ai => ({ id: ai.id, nickname: ai.name }))
+  ].filter(player => player.id !== MY_UNIQUE_USER_ID);
+
+  const myVote = (votes || {})[MY_UNIQUE_USER_ID];
+  const tally = vote_tally || {};
+  const voted = Object.keys(votes || {}).length;
+  const secondsLeft = Math.max(0, Math.ceil(((vote_deadline || 0) - now) / 1000));
+
+  return (
+    <div className="p-3 bg-zinc-800 border-b border-zinc-700">
+      {turn === 'voting' ? (
+        <div className="text-center text-sm text-zinc-300 mb-2">
+          라이어로 의심되는 사람을 고르세요 ({voted}명 투표 · {secondsLeft}초 남음)
+        </div>
+      ) : (
+        vote_result && (
+          <div className="text-center text-sm font-semibold mb-2">
+            <span className={vote_result.winner === 'citizens' ? 'text-blue-400' : 'text-red-400'}>
+              {vote_result.winner === 'citizens' ? '시민 승리!' : '라이어 승리!'}
+            </span>
+          </div>
+        )
+      )}
+      <div className="flex flex-wrap justify-center gap-2">
+        {candidates.map(player => (
+          <button
+            key={player.id}
+            onClick={() => onVote && onVote(player.id)}
+            disabled={turn !== 'voting' || !onVote}
+            className={`px-3 py-1 rounded-full text-sm font-medium transition-all disabled:cursor-default
+              ${myVote === player.id ? 'bg-red-600 text-white' : 'bg-zinc-600 text-zinc-200 hover:bg-zinc-500'}
+              ${vote_result && vote_result.target === player.id ? 'ring-2 ring-yellow-400' : ''}`}
+          >
+            {player.nickname} <span className="text-xs opacity-80">{tally[player.id] || 0}</span>
+          </button>
+        ))}
+      </div>
+    </div>
+  );
+}
+
+
 // 채팅 메시지 목록
 // 💡 [수정] nicknameMap 프롭 제거
-function ChatMessages({ messages, roomState, isOperator }) {
+function ChatMessages({ messages, roomState, isOperator, onLoadHistory }) {
   const messagesEndRef = useRef(null);
+  const lastMessage = messages[messages.length - 1];
 
+  // 💡 [수정] 이전 기록을 불러와 앞에 붙일 때는 스크롤하지 않음 (마지막 메시지가 바뀔 때만)
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
-  }, [messages]);
+  }, [lastMessage]);
 
   return (
     <div className="flex-1 overflow-y-auto p-4 space-y-4">
+      {/* 💡 [추가] 서버는 최근 메시지만 보내므로, 그 이전 기록은 요청해서 불러옴 */}
+      {roomState.messages_start > 0 && (
+        <div className="text-center">
+          <button
+            onClick={onLoadHistory}
+            className="text-xs text-zinc-400 hover:text-white underline"
+          >
+            이전 메시지 불러오기
+          </button>
+        </div>
+      )}
       {messages.map((msg) => {
         if (msg.sender === 'system') {
           return <SystemMessage key={msg.id} text={msg.text} />;
@@ -295,19 +448,20 @@ function MessageBox({ onSendMessage, isAILoading, roomState, isOperator }) {
 
   const isTurnBasedPhase = ['1차 진술', '1차 토론', '2차 진술', '2차 토론'].includes(phaseName);
 
-  let isMyTurn = false;
-  if (isTurnBasedPhase) {
-    if (isOperator) {
-      isMyTurn = roomState.turn === 'operator';
-    } else {
-      isMyTurn = roomState.turn === 'user';
-    }
-  }
+  // 💡 [수정] 발언 순서(turn_order)에서 지금 차례인 사람이 나인지로 판단 (운영자는 항상 마지막)
+  const turnOrder = roomState.turn_order || [];
+  const currentSpeaker = roomState.turn === 'speaking' ? turnOrder[roomState.turn_index] : null;
+  const isMyTurn = isTurnBasedPhase && currentSpeaker === MY_UNIQUE_USER_ID;
+  const speakerName = ((roomState.humans || []).find(human => human.id === currentSpeaker) || {}).name;
   
-  const isDisabled = isAILoading || !isMyTurn;
+  // 💡 [수정] 운영자는 AI 답변 생성 중에도 진술 가능 (서버가 AI 답변이 모이면 섞어서 공개)
+  const isDisabled = !isMyTurn || (isAILoading && !isOperator);
 
   let placeholder = "메시지를 입력하세요...";
-  if (isAILoading) {
+  if (roomState.turn === 'waiting') {
+    // 💡 [추가] 게임 시작 전 (방이 차거나 운영자가 시작하면 진행)
+    placeholder = `참가자를 기다리는 중 (${(roomState.humans || []).length}/${roomState.max_humans || 2})`;
+  } else if (isAILoading && !isMyTurn) {
     placeholder = "AI가 답변을 생성중입니다. 잠시만 기다려주세요...";
   } else if (isTurnBasedPhase) {
     if (isMyTurn) {
@@ -317,10 +471,14 @@ function MessageBox({ onSendMessage, isAILoading, roomState, isOperator }) {
         placeholder = "내 턴: 진술을 입력하세요...";
       }
     } else {
-      placeholder = "상대방의 턴을 기다리는 중...";
+      placeholder = speakerName ? `${speakerName} 님의 턴을 기다리는 중...` : "상대방의 턴을 기다리는 중...";
     }
+  } else if (roomState.turn === 'voting') {
+    placeholder = "투표 중입니다. 위에서 의심되는 사람을 고르세요.";
+  } else if (roomState.turn === 'ended') {
+    placeholder = "게임이 종료되었습니다.";
   } else {
-    placeholder = "투표 또는 다음 페이즈 대기 중...";
+    placeholder = "다음 페이즈 대기 중...";
   }
 
   const handleSubmit = (e) => {
@@ -371,7 +529,12 @@ export default function App() {
   const [roomState, setRoomState] = useState(null); 
   const [error, setError] = useState(null);
   const [isAILoading, setIsAILoading] = useState(false);
+  const [aiProgress, setAIProgress] = useState(null); // 💡 [추가] { ready, streaming, total }
   const [isOperator, setIsOperator] = useState(false); 
+  const [isSpectator, setIsSpectator] = useState(false); // 💡 [추가] 관전 모드 (읽기 전용)
+  // 💡 [추가] 마지막으로 적용한 방 ID/패치 순번 (roomPatch 순서 검사용)
+  const syncRef = useRef({ roomId: null, seq: 0 });
+  const spectatingRef = useRef(null); // 💡 [추가] 관전 중인 방 ID (다시 연결되면 다시 관전)
 
   // 소켓 연결
   useEffect(() => {
@@ -379,15 +542,34 @@ export default function App() {
         transports: ['websocket', 'polling'] // 💡 [추가] 안정적인 연결을 위해 polling fallback
     });
 
-    socket.on('connect', () => { setIsConnected(true); setError(null); console.log('Socket connected:', socket.id); });
-    socket.on('disconnect', () => { setIsConnected(false); setError("서버와 연결이 끊겼습니다."); setRoomState(null); console.log('Socket disconnected'); });
+    // 💡 [수정] 연결이 끊겨도 방 화면은 유지하고, 다시 연결되면 재접속 토큰으로 자리를 되찾음
+    socket.on('connect', () => {
+        setIsConnected(true); setError(null); console.log('Socket connected:', socket.id);
+        const session = loadSession();
+        if (spectatingRef.current) {
+          // 관전은 자리가 없으므로 다시 들어가 스냅샷부터 받음
+          socket.emit('spectate', { roomId: spectatingRef.current });
+        } else if (session) {
+          const sync = syncRef.current;
+          socket.emit('resume_session', {
+            roomId: session.roomId,
+            token: session.token,
+            lastSeq: sync.roomId === session.roomId ? sync.seq : null // 받은 패치가 없으면 스냅샷
+          });
+          setIsOperator(session.role === 'operator');
+        }
+    });
+    socket.on('disconnect', () => { setIsConnected(false); setError("서버와 연결이 끊겼습니다. 다시 연결하는 중..."); setIsAILoading(false); console.log('Socket disconnected'); });
     socket.on('connect_error', (err) => { setError(`서버 연결 실패: ${SOCKET_SERVER_URL} (서버가 실행 중인지 확인하세요)`); console.error('Connection error:', err.message); });
     
     // 💡 [수정] roomState 업데이트 시 AI 로딩 상태 동기화
-    socket.on('roomState', (newRoomState) => {
+    const applyRoomState = (newRoomState) => {
+        syncRef.current = { roomId: newRoomState.id, seq: newRoomState.seq || 0 };
         setRoomState(prevState => ({
           ...prevState,
-          ...newRoomState
+          ...newRoomState,
+          // 💡 [추가] 스냅샷에는 최근 메시지만 있으므로 첫 메시지의 전체 번호를 기억 (스크롤백용)
+          messages_start: (newRoomState.message_count || 0) - (newRoomState.messages || []).length
         }));
         setError(null);
         console.log('Room state updated:', newRoomState);
@@ -397,7 +579,32 @@ export default function App() {
         if (!newRoomState.messages || newRoomState.messages.length === 0) {
           setIsAILoading(false);
         }
-      });
+      };
+    
+    // 💡 [추가] 변경분만 담긴 패치 적용. 순번이 건너뛰면 전체 스냅샷을 다시 요청
+    const applyRoomPatch = (patch) => {
+        const sync = syncRef.current;
+        if (sync.roomId !== patch.roomId || patch.seq <= sync.seq) return; // 다른 방 or 이미 적용된 패치
+        if (patch.seq !== sync.seq + 1) {
+          socket.emit('request_sync', { roomId: patch.roomId });
+          return;
+        }
+        syncRef.current = { roomId: patch.roomId, seq: patch.seq };
+        setRoomState(prevState => {
+          if (!prevState) return prevState;
+          return {
+            ...prevState,
+            ...patch.changes,
+            seq: patch.seq,
+            messages: [...(prevState.messages || []), ...patch.messages]
+          };
+        });
+    };
+    socket.on('roomState', applyRoomState);
+    socket.on('roomPatch', applyRoomPatch);
+    // 💡 [추가] 관전자용 (제시어 제외, 순번은 관전 채널 기준). 모양은 roomState/roomPatch와 같음
+    socket.on('spectatorState', (frame) => applyRoomState(decodeFrame(frame)));
+    socket.on('spectatorPatch', (frame) => applyRoomPatch(decodeFrame(frame)));
     
     socket.on('error', (err) => { 
         setError(err.message); 
@@ -409,12 +616,65 @@ export default function App() {
     socket.on('aiProcessing', (data) => { 
         const loading = data.status === 'start';
         setIsAILoading(loading);
+        if (!loading) setAIProgress(null);
         setRoomState(prevState => {
             if (!prevState) return null;
             return { ...prevState, isAILoading: loading };
         });
     });
     
+    // 💡 [추가] AI 진술 준비 현황 (몇 명 준비됐는지만 전달됨)
+    socket.on('aiProgress', (data) => { setAIProgress(data); });
+
+    // 💡 [추가] 재접속 토큰 발급 / 복귀 실패
+    socket.on('session', (data) => { saveSession({ roomId: data.roomId, role: data.role, token: data.resumeToken }); });
+    socket.on('resumeFailed', (data) => {
+        clearSession();
+        syncRef.current = { roomId: null, seq: 0 };
+        setRoomState(null);
+        setIsOperator(false);
+        setError(data.message);
+    });
+
+    // 💡 [추가] 서버가 유휴 방을 정리함 (관전자는 운영자가 나가도 받음) → 로비로
+    socket.on('roomClosed', (data) => {
+        if (syncRef.current.roomId !== data.roomId) return;
+        clearSession();
+        syncRef.current = { roomId: null, seq: 0 };
+        spectatingRef.current = null;
+        setIsSpectator(false);
+        setRoomState(null);
+        setIsAILoading(false);
+        setAIProgress(null);
+        setError(data.reason === 'operator_left' ? "운영자가 나가 게임이 종료되었습니다." : "장시간 활동이 없어 방이 종료되었습니다.");
+    });
+
+    // 💡 [추가] 투표 현황 (표가 들어올 때마다 방 전체 패치 대신 이 이벤트만 옴)
+    socket.on('voteUpdate', (data) => {
+        setRoomState(prevState => {
+          if (!prevState || prevState.id !== data.roomId) return prevState;
+          return {
+            ...prevState,
+            votes: { ...(prevState.votes || {}), ...data.votes },
+            vote_tally: data.tally
+          };
+        });
+    });
+
+    // 💡 [추가] 이전 메시지 (스크롤백) 앞에 붙이기
+    socket.on('messageHistory', (data) => {
+        setRoomState(prevState => {
+          if (!prevState || prevState.id !== data.roomId) return prevState;
+          const count = prevState.messages_start - data.start;
+          if (count <= 0) return prevState;
+          return {
+            ...prevState,
+            messages_start: data.start,
+            messages: [...data.messages.slice(0, count), ...prevState.messages]
+          };
+        });
+    });
+    
     return () => { socket.disconnect(); };
   }, []); // 💡 [수정] isAILoading 의존성 추가
  
@@ -423,7 +683,7 @@ export default function App() {
 
 
   // --- 이벤트 핸들러 함수 ---
-  const handleCreateRoom = useCallback(() => {
+  const handleCreateRoom = useCallback(({ maxPlayers, aiPlayers } = {}) => {
     if (!socket || !isConnected) {
       console.error("Socket not connected yet");
       setError("서버에 연결 중입니다. 잠시 후 다시 시도해주세요.");
@@ -432,7 +692,9 @@ export default function App() {
     setIsOperator(true); 
     socket.emit('create_room', {
       userId: MY_UNIQUE_USER_ID,
-      isOperator: true
+      isOperator: true,
+      maxPlayers,
+      aiPlayers
     });
   }, [isConnected]); 
 
@@ -454,16 +716,71 @@ export default function App() {
     });
   }, [isConnected]); 
 
+  // 💡 [추가] 관전 (방 코드만 있으면 됨, 자리를 차지하지 않음)
+  const handleSpectate = useCallback((roomId) => {
+    if (!socket || !isConnected) {
+      setError("서버에 연결 중입니다. 잠시 후 다시 시도해주세요.");
+      return;
+    }
+    if (!roomId || roomId.length !== 6) {
+      setError("올바른 6자리 방 코드를 입력하세요.");
+      return;
+    }
+    spectatingRef.current = roomId;
+    setIsSpectator(true);
+    setIsOperator(false);
+    socket.emit('spectate', { roomId });
+  }, [isConnected]);
+
   const handleLeaveRoom = useCallback(() => {
     if (roomState && socket) {
-      socket.emit('leave_room', {
-           roomId: roomState.id,
-           userId: MY_UNIQUE_USER_ID
-      });
+      if (isSpectator) {
+        socket.emit('stop_spectating', { roomId: roomState.id });
+        spectatingRef.current = null;
+        setIsSpectator(false);
+      } else {
+        socket.emit('leave_room', {
+             roomId: roomState.id,
+             userId: MY_UNIQUE_USER_ID
+        });
+      }
       setRoomState(null); 
+      syncRef.current = { roomId: null, seq: 0 };
+      clearSession();
       setIsOperator(false);
       setError(null);
     }
+  }, [roomState, isSpectator]);
+
+  const handleLoadHistory = useCallback(() => {
+    if (roomState && socket) {
+      socket.emit('load_messages', {
+        roomId: roomState.id,
+        before: roomState.messages_start,
+        limit: 50
+      });
+    }
+  }, [roomState]);
+
+  // 💡 [추가] 투표 (마감 전에는 다시 눌러 바꿀 수 있음)
+  const handleVote = useCallback((target) => {
+    if (roomState && socket) {
+      socket.emit('cast_vote', {
+        roomId: roomState.id,
+        userId: MY_UNIQUE_USER_ID,
+        target
+      });
+    }
+  }, [roomState]);
+
+  // 💡 [추가] 운영자: 지금 모인 인원으로 게임 시작
+  const handleStartGame = useCallback(() => {
+    if (roomState && socket) {
+      socket.emit('start_game', {
+        roomId: roomState.id,
+        userId: MY_UNIQUE_USER_ID
+      });
+    }
   }, [roomState]);
 
   const handleSendMessage = useCallback((text) => {
@@ -502,14 +819,20 @@ export default function App() {
             roomState={roomState}
             onLeave={handleLeaveRoom}
             onSendMessage={handleSendMessage}
+            onLoadHistory={handleLoadHistory}
+            onVote={handleVote}
+            onStartGame={handleStartGame}
             isAILoading={isAILoading}
+            aiProgress={aiProgress}
             isOperator={isOperator}
+            isSpectator={isSpectator}
             // 💡 [삭제] nicknameMap 프롭 제거
           />
         ) : (
           <LobbyScreen
             onJoin={handleJoinRoom}
             onCreate={handleCreateRoom}
+            onSpectate={handleSpectate}
           />
         )}
       </div>